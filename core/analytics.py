@@ -0,0 +1,138 @@
+"""
+Storage analytics and capacity forecasting.
+
+Sizes and growth rates come from the catalog's per-folder storage totals
+and samples, which are updated whenever a backup is recorded or deleted.
+Only the free space of each destination volume is read from the file
+system, so refreshing the statistics costs the same for any number of
+backups.
+"""
+import os
+import shutil
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterable, List, Optional
+from core.backup_engine import job_folder_name
+
+
+# Days of storage samples used to estimate growth
+GROWTH_WINDOW_DAYS = 30
+
+
+def days_until_full(free_bytes: int, growth_per_day: Optional[float]) -> Optional[float]:
+    """Get the days until free space runs out, or None if usage is not growing."""
+    if not growth_per_day or growth_per_day <= 0:
+        return None
+    return free_bytes / growth_per_day
+
+
+def job_storage(job_folder: Path, window_days: int = GROWTH_WINDOW_DAYS, catalog=None) -> Dict[str, Any]:
+    """
+    Get storage statistics of a job folder.
+    
+    Args:
+        job_folder: Folder holding the job's backups
+        window_days: Days of history used to estimate growth
+        catalog: Backup catalog (defaults to the global catalog)
+    
+    Returns:
+        Dictionary with runs, logical_size, stored_size, compression_ratio
+        (None without stored data) and growth_per_day in bytes (None
+        without enough history)
+    """
+    if catalog is None:
+        from core.catalog import get_catalog
+        catalog = get_catalog()
+    
+    usage = catalog.get_storage_usage(job_folder)
+    totals = usage[0] if usage else {"runs": 0, "logical_size": 0, "stored_size": 0}
+    since = datetime.now() - timedelta(days=window_days)
+    
+    return {
+        "job_folder": str(job_folder),
+        "runs": totals["runs"],
+        "logical_size": totals["logical_size"],
+        "stored_size": totals["stored_size"],
+        "compression_ratio": (
+            totals["logical_size"] / totals["stored_size"] if totals["stored_size"] > 0 else None
+        ),
+        "growth_per_day": catalog.get_growth_rate(job_folder, since),
+    }
+
+
+def storage_overview(jobs: Iterable, window_days: int = GROWTH_WINDOW_DAYS, catalog=None) -> Dict[str, Any]:
+    """
+    Get storage statistics of jobs and a capacity forecast per destination volume.
+    
+    Destinations on the same volume share its free space, so their growth
+    rates are added up before forecasting. Unreachable destinations are
+    left out of the forecast.
+    
+    Args:
+        jobs: Backup jobs
+        window_days: Days of history used to estimate growth
+        catalog: Backup catalog (defaults to the global catalog)
+    
+    Returns:
+        Dictionary with per-job statistics ("jobs"), per-volume forecasts
+        ("destinations"), overall sizes and the soonest days_until_full
+    """
+    job_stats: List[Dict[str, Any]] = []
+    volumes: Dict[int, Dict[str, Any]] = {}
+    seen_folders = set()
+    
+    for job in jobs:
+        job_folder = Path(job.destination_path) / job_folder_name(job.name)
+        stats = job_storage(job_folder, window_days, catalog)
+        stats.update({"job_id": job.job_id, "job_name": job.name, "destination": job.destination_path})
+        job_stats.append(stats)
+        
+        # Jobs sharing a folder must not be counted twice
+        folder_key = str(job_folder.resolve())
+        if folder_key in seen_folders:
+            continue
+        seen_folders.add(folder_key)
+        
+        try:
+            device = os.stat(job.destination_path).st_dev
+        except OSError:
+            continue
+        
+        volume = volumes.get(device)
+        if volume is None:
+            try:
+                usage = shutil.disk_usage(job.destination_path)
+            except OSError:
+                continue
+            volume = volumes[device] = {
+                "destinations": [],
+                "total": usage.total,
+                "used": usage.used,
+                "free": usage.free,
+                "stored_size": 0,
+                "growth_per_day": None,
+            }
+        if job.destination_path not in volume["destinations"]:
+            volume["destinations"].append(job.destination_path)
+        volume["stored_size"] += stats["stored_size"]
+        if stats["growth_per_day"] is not None:
+            volume["growth_per_day"] = (volume["growth_per_day"] or 0) + stats["growth_per_day"]
+    
+    now = datetime.now()
+    for volume in volumes.values():
+        days = days_until_full(volume["free"], volume["growth_per_day"])
+        volume["days_until_full"] = days
+        volume["full_at"] = (now + timedelta(days=days)).isoformat() if days is not None else None
+    
+    logical_size = sum(stats["logical_size"] for stats in job_stats)
+    stored_size = sum(stats["stored_size"] for stats in job_stats)
+    forecasts = [v["days_until_full"] for v in volumes.values() if v["days_until_full"] is not None]
+    
+    return {
+        "jobs": job_stats,
+        "destinations": list(volumes.values()),
+        "logical_size": logical_size,
+        "stored_size": stored_size,
+        "compression_ratio": logical_size / stored_size if stored_size > 0 else None,
+        "days_until_full": min(forecasts) if forecasts else None,
+    }
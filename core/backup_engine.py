@@ -2,13 +2,31 @@
 Core backup engine for performing backup operations.
 """
 import os
+import time
+import heapq
 import shutil
-import hashlib
 import zipfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Callable, Optional, List, Dict, Any
+from typing import Callable, Optional, List, Dict, Any, Iterator, Tuple
 from datetime import datetime
 import threading
+from core.manifest import ManifestWriter, manifest_path_for
+from core.hashing import DEFAULT_ALGORITHM, create_hasher, hash_file, hash_files
+from core.merkle import MerkleTree, tree_path_for
+from core.backup_index import BackupIndex, index_path_for
+from core.chain import list_backups, find_base_backup, backup_chain, resolve_entries
+from utils.rate_limiter import RateLimiter
+
+
+# Chunk size used when streaming file contents
+CHUNK_SIZE = 1024 * 1024
+
+
+def job_folder_name(job_name: str) -> str:
+    """Sanitize a job name for use as its folder name in the destination."""
+    folder_name = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in job_name)
+    return folder_name.strip().replace(' ', '_')
 
 
 class BackupProgress:
@@ -56,9 +74,26 @@ class BackupProgress:
 class BackupEngine:
     """Core backup engine."""
     
-    def __init__(self):
+    def __init__(self, catalog=None):
+        """
+        Args:
+            catalog: Backup catalog to record runs in (defaults to the global catalog)
+        """
         self.progress = BackupProgress()
+        self.catalog = catalog
         self._lock = threading.Lock()
+        self._manifest: Optional[ManifestWriter] = None
+        self._hash_algorithm = DEFAULT_ALGORITHM
+        # Resolved entries of the base backup's chain, streamed in path
+        # order alongside the sorted walk, and the next one not yet reached
+        self._base_entries: Optional[Iterator[Tuple[Dict[str, Any], int]]] = None
+        self._base_entry: Optional[Dict[str, Any]] = None
+        self._unchanged_files = 0
+        self._deleted_files = 0
+        # Seconds and bytes of each phase of the current backup
+        self.phases: Dict[str, Dict[str, float]] = {}
+        # Limits the read throughput of copying; unlimited unless the host is busy
+        self.rate_limiter = RateLimiter()
     
     def calculate_backup_size(self, source_paths: List[str], filters: Dict[str, Any]) -> tuple:
         """
@@ -134,7 +169,9 @@ class BackupEngine:
         filters: Dict[str, Any] = None,
         compression: bool = True,
         progress_callback: Optional[Callable[[BackupProgress], None]] = None,
-        job_name: str = None
+        job_name: str = None,
+        hash_algorithm: str = DEFAULT_ALGORITHM,
+        job_id: str = None
     ) -> Dict[str, Any]:
         """
         Perform backup operation.
@@ -147,6 +184,8 @@ class BackupEngine:
             compression: Whether to compress the backup
             progress_callback: Optional callback for progress updates
             job_name: Optional job name for folder organization
+            hash_algorithm: Hash algorithm for checksums (sha256, blake2b, blake2s)
+            job_id: Optional job id recorded in the backup catalog
             
         Returns:
             Dictionary with backup results
@@ -154,12 +193,18 @@ class BackupEngine:
         if filters is None:
             filters = {}
         
+        # Fail fast on an unknown algorithm
+        create_hasher(hash_algorithm)
+        self._hash_algorithm = hash_algorithm
+        
         # Initialize progress
-        self.progress = BackupProgress()
+        self._start_progress()
         self.progress.start_time = datetime.now()
+        self.phases = {}
         
         # Calculate total size
-        total_size, total_files = self.calculate_backup_size(source_paths, filters)
+        with self._phase("scan"):
+            total_size, total_files = self.calculate_backup_size(source_paths, filters)
         self.progress.total_size = total_size
         self.progress.total_files = total_files
         
@@ -168,9 +213,7 @@ class BackupEngine:
         
         # Use job name or first source folder name for organization
         if job_name:
-            # Sanitize job name for folder
-            folder_name = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in job_name)
-            folder_name = folder_name.strip().replace(' ', '_')
+            folder_name = job_folder_name(job_name)
         else:
             # Use first source folder name
             first_source = Path(source_paths[0])
@@ -183,38 +226,95 @@ class BackupEngine:
         # Create timestamped backup folder/file inside job folder
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
+        # Incremental and differential backups only store changes against a base
+        with self._phase("base"):
+            chain = self._load_base(job_folder, backup_type, hash_algorithm, compression)
+        base = chain[-1] if chain else None
+        if base is None:
+            backup_type = "full"
+        
+        # Per-file manifest is filled in while files are being read
+        manifest_file = manifest_path_for(job_folder, timestamp)
+        self._manifest = ManifestWriter(manifest_file, algorithm=hash_algorithm)
+        
         # Perform backup
         try:
-            if compression:
-                # For compression, create ZIP file directly in job folder
-                archive_path = job_folder / f"backup_{timestamp}.zip"
-                self._backup_with_compression(source_paths, archive_path, filters, progress_callback)
-                backup_path = str(archive_path)
-            else:
-                # For no compression, create timestamped folder in job folder
-                backup_dir = job_folder / f"backup_{timestamp}"
-                backup_dir.mkdir(parents=True, exist_ok=True)
-                self._backup_without_compression(source_paths, backup_dir, filters, progress_callback)
-                backup_path = str(backup_dir)
+            self._manifest.open()
+            
+            with self._phase("copy"):
+                if compression:
+                    # For compression, create ZIP file directly in job folder
+                    archive_path = job_folder / f"backup_{timestamp}.zip"
+                    self._backup_with_compression(source_paths, archive_path, filters, progress_callback)
+                    backup_path = str(archive_path)
+                else:
+                    # For no compression, create timestamped folder in job folder
+                    backup_dir = job_folder / f"backup_{timestamp}"
+                    backup_dir.mkdir(parents=True, exist_ok=True)
+                    self._backup_without_compression(source_paths, backup_dir, filters, progress_callback)
+                    backup_path = str(backup_dir)
+            
+            # Bytes read from the sources and written to the destination
+            bytes_read = self.progress.processed_size
+            bytes_written = Path(backup_path).stat().st_size if compression else bytes_read
+            self.phases["copy"]["bytes"] = bytes_read
+            
+            # Files of the base backup sorting after the last walked file no longer exist
+            if base and not self.progress.is_cancelled:
+                self._advance_base(None)
             
+            self._manifest.close()
             self.progress.end_time = datetime.now()
             
             # Generate checksum
-            checksum = self._calculate_checksum(backup_path)
+            with self._phase("checksum"):
+                checksum = self._calculate_checksum(backup_path, hash_algorithm)
+            self.phases["checksum"]["bytes"] = bytes_written
+            
+            # Organize file hashes into a directory-level Merkle tree. The
+            # tree describes the complete state, including unchanged files
+            # stored in earlier backups of the chain.
+            with self._phase("tree"):
+                resolved = resolve_entries(job_folder, chain + [{"timestamp": timestamp}])
+                tree = MerkleTree.from_entries((entry for entry, _ in resolved), hash_algorithm)
+                tree_file = tree_path_for(job_folder, timestamp)
+                tree.save(tree_file)
+            
+            # Member index for direct single-file restore
+            with self._phase("index"):
+                index_file = index_path_for(job_folder, timestamp)
+                duplicates = BackupIndex.build(index_file, Path(backup_path), manifest_file)
+            if duplicates:
+                self.progress.errors.append(
+                    f"Paths stored more than once, only one version is indexed: {', '.join(duplicates[:10])}"
+                )
             
             # Save metadata
             metadata = {
                 "timestamp": timestamp,
                 "backup_type": backup_type,
+                "base_backup": base["timestamp"] if base else None,
                 "source_paths": source_paths,
                 "destination": backup_path,
                 "total_files": self.progress.processed_files,
                 "total_size": self.progress.processed_size,
                 "compression": compression,
                 "checksum": checksum,
+                "hash_algorithm": hash_algorithm,
+                "manifest": manifest_file.name,
+                "manifest_entries": self._manifest.entry_count,
+                "merkle_tree": tree_file.name,
+                "merkle_root": tree.root_hash,
+                "index": index_file.name,
+                "unchanged_files": self._unchanged_files,
+                "deleted_files": self._deleted_files,
+                "cancelled": self.progress.is_cancelled,
                 "errors": self.progress.errors,
                 "skipped_files": self.progress.skipped_files,
                 "duration_seconds": (self.progress.end_time - self.progress.start_time).total_seconds(),
+                "bytes_read": bytes_read,
+                "bytes_written": bytes_written,
+                "phases": self.phases,
             }
             
             # Save metadata file in job folder
@@ -223,11 +323,241 @@ class BackupEngine:
             with open(metadata_file, "w", encoding="utf-8") as f:
                 json.dump(metadata, f, indent=2, ensure_ascii=False)
             
+            # Record the run in the central catalog
+            self._record_in_catalog(
+                lambda catalog: catalog.record_backup(job_folder, metadata, job_id, job_name)
+            )
+            
             return metadata
             
         except Exception as e:
             self.progress.errors.append(f"Backup failed: {str(e)}")
+            self._record_in_catalog(
+                lambda catalog: catalog.record_failure(job_folder, timestamp, str(e), backup_type, job_id, job_name)
+            )
             raise
+        finally:
+            self._manifest.close()
+            self._manifest = None
+            if self._base_entries is not None:
+                # Closes the base manifests
+                self._base_entries.close()
+            self._base_entries = None
+            self._base_entry = None
+    
+    @contextmanager
+    def _phase(self, name: str):
+        """Time a phase of the backup for the run log."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = {"seconds": round(time.perf_counter() - started, 3), "bytes": 0}
+    
+    def _record_in_catalog(self, record: Callable):
+        """Write to the backup catalog without failing the backup itself."""
+        from core.catalog import get_catalog
+        from utils.logger import get_logger
+        
+        try:
+            record(self.catalog or get_catalog())
+        except Exception as e:
+            # The catalog can be rebuilt from the metadata on disk
+            get_logger().warning(f"Could not record backup in catalog: {str(e)}")
+    
+    def _load_base(
+        self,
+        job_folder: Path,
+        backup_type: str,
+        hash_algorithm: str,
+        compression: bool
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the base of an incremental or differential backup.
+        
+        Opens the resolved file state of the base as a stream in path
+        order, which _advance_base() merges with the sorted walk. A base
+        written with another hash algorithm or storage format cannot be
+        extended, in which case a full backup is made.
+        
+        Returns:
+            Chain of backups ending at the base, empty for a full backup
+        """
+        self._base_entries = None
+        self._base_entry = None
+        self._unchanged_files = 0
+        self._deleted_files = 0
+        
+        if backup_type not in ("incremental", "differential"):
+            return []
+        
+        backups = list_backups(job_folder)
+        base = find_base_backup(job_folder, backups, backup_type)
+        if base is None:
+            return []
+        if base.get("hash_algorithm", DEFAULT_ALGORITHM) != hash_algorithm or base.get("compression") != compression:
+            return []
+        
+        try:
+            chain = backup_chain(backups, base["timestamp"])
+            for metadata in chain:
+                manifest_file = manifest_path_for(job_folder, metadata["timestamp"])
+                if not manifest_file.exists():
+                    raise ValueError(f"Manifest of backup {metadata['timestamp']} missing")
+            self._base_entries = resolve_entries(job_folder, chain)
+            # Reading the first entry opens every manifest of the chain
+            first = next(self._base_entries, None)
+        except (ValueError, OSError) as e:
+            self.progress.errors.append(f"Base backup unusable, performing full backup: {str(e)}")
+            self._base_entries = None
+            return []
+        
+        self._base_entry = first[0] if first else None
+        return chain
+    
+    def _advance_base(self, relpath: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Move the base stream up to a walked path, writing tombstones for the base files passed.
+        
+        Base files sorting before the walked path were not found in the
+        sources, so they are recorded as deleted in path order.
+        
+        Args:
+            relpath: Path of the next walked file, or None to pass every
+                remaining base file
+        
+        Returns:
+            Base entry of the walked path, or None if the base does not have it
+        """
+        while self._base_entry is not None and (relpath is None or self._base_entry["path"] < relpath):
+            self._manifest.add_deleted(self._base_entry["path"])
+            self._deleted_files += 1
+            following = next(self._base_entries, None)
+            self._base_entry = following[0] if following else None
+        
+        if self._base_entry is None or self._base_entry["path"] != relpath:
+            return None
+        entry = self._base_entry
+        following = next(self._base_entries, None)
+        self._base_entry = following[0] if following else None
+        return entry
+    
+    def _skip_unchanged(self, stat: os.stat_result, base_entry: Optional[Dict[str, Any]]) -> bool:
+        """
+        Check whether a file is unchanged since the base backup.
+        
+        Unchanged files are not stored again and are taken out of the
+        progress totals.
+        """
+        if base_entry is None or (base_entry["size"], base_entry["mtime"]) != (stat.st_size, stat.st_mtime):
+            return False
+        
+        self._unchanged_files += 1
+        self.progress.total_files -= 1
+        self.progress.total_size -= stat.st_size
+        return True
+    
+    def _walk_sorted(self, root: Path) -> Iterator[Path]:
+        """
+        Walk the files below a directory in order of their relative paths.
+        
+        Directory names are compared with a trailing "/", which yields the
+        same order as sorting the POSIX paths as strings, so manifests are
+        written sorted without buffering. Like os.walk, symbolic links to
+        directories are not followed and unreadable directories are skipped.
+        """
+        def entries(directory):
+            try:
+                with os.scandir(directory) as it:
+                    items = [(entry.name + "/" if entry.is_dir() else entry.name, entry) for entry in it]
+            except OSError:
+                return iter(())
+            items.sort(key=lambda item: item[0])
+            return iter(items)
+        
+        stack = [entries(root)]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+            key, entry = item
+            if key.endswith("/"):
+                if not entry.is_symlink():
+                    stack.append(entries(entry.path))
+            else:
+                yield Path(entry.path)
+    
+    def _iter_files(self, source_paths: List[str], include_source_name: bool) -> Iterator[Tuple[str, Path]]:
+        """
+        Walk all sources as one stream in order of the paths stored in the backup.
+        
+        Each source is walked sorted and the walks are merged, so the
+        manifest is written in path order for any number of sources. A
+        file whose stored path another source already took is skipped
+        with an error, as a backup can hold only one of them.
+        
+        Args:
+            source_paths: Files and folders to back up
+            include_source_name: Store files of a folder source below the
+                folder's name (folder backups) rather than at the root
+                (ZIP backups)
+        
+        Yields:
+            Tuples of (stored_path, file_path)
+        """
+        def walk(source: Path) -> Iterator[Tuple[str, Path]]:
+            if source.is_file():
+                yield source.name, source
+                return
+            prefix = source.name + "/" if include_source_name else ""
+            for file_path in self._walk_sorted(source):
+                yield prefix + file_path.relative_to(source).as_posix(), file_path
+        
+        walks = []
+        for source_path in source_paths:
+            source = Path(source_path)
+            if not source.exists():
+                self.progress.errors.append(f"Source not found: {source_path}")
+                continue
+            walks.append(walk(source))
+        
+        previous = None
+        for relpath, file_path in heapq.merge(*walks, key=lambda item: item[0]):
+            if relpath == previous:
+                self.progress.errors.append(f"Skipped {file_path}: {relpath} is already backed up from another source")
+                continue
+            previous = relpath
+            yield relpath, file_path
+    
+    def _backup_files(
+        self,
+        source_paths: List[str],
+        filters: Dict[str, Any],
+        include_source_name: bool,
+        store: Callable[[Path, str, Optional[Dict[str, Any]]], None]
+    ):
+        """
+        Back up the files of all sources in path order, merged with the base backup.
+        
+        Args:
+            store: Stores one file; called with the file path, its stored
+                path and its base entry (None if the base lacks it)
+        """
+        for relpath, file_path in self._iter_files(source_paths, include_source_name):
+            if self.progress.is_cancelled:
+                return
+            
+            while self.progress.is_paused:
+                threading.Event().wait(0.1)
+            
+            base_entry = self._advance_base(relpath)
+            if self._should_include_file(file_path, filters):
+                store(file_path, relpath, base_entry)
+            elif base_entry is not None:
+                # Excluded by the filters since the base backup
+                self._manifest.add_deleted(relpath)
+                self._deleted_files += 1
     
     def _backup_with_compression(
         self,
@@ -238,48 +568,43 @@ class BackupEngine:
     ):
         """Perform backup with compression."""
         with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for source_path in source_paths:
-                source = Path(source_path)
-                if not source.exists():
-                    self.progress.errors.append(f"Source not found: {source_path}")
-                    continue
-                
-                if source.is_file():
-                    if self._should_include_file(source, filters):
-                        self._add_file_to_zip(zipf, source, source.parent, progress_callback)
-                else:
-                    for root, dirs, files in os.walk(source):
-                        for file in files:
-                            if self.progress.is_cancelled:
-                                return
-                            
-                            while self.progress.is_paused:
-                                threading.Event().wait(0.1)
-                            
-                            file_path = Path(root) / file
-                            if self._should_include_file(file_path, filters):
-                                self._add_file_to_zip(zipf, file_path, source, progress_callback)
+            self._backup_files(
+                source_paths, filters, False,
+                lambda file_path, arcname, base_entry: self._add_file_to_zip(
+                    zipf, file_path, arcname, base_entry, progress_callback
+                )
+            )
     
     def _add_file_to_zip(
         self,
         zipf: zipfile.ZipFile,
         file_path: Path,
-        base_path: Path,
+        arcname: str,
+        base_entry: Optional[Dict[str, Any]],
         progress_callback: Optional[Callable[[BackupProgress], None]]
     ):
         """Add a single file to zip archive."""
         try:
-            arcname = str(file_path.relative_to(base_path))
+            stat = file_path.stat()
+            if self._skip_unchanged(stat, base_entry):
+                return
+            
             self.progress.current_file = str(file_path)
-            self.progress.current_file_size = file_path.stat().st_size
+            self.progress.current_file_size = stat.st_size
             self.progress.current_file_processed = 0
             
             # Update progress before writing
             if progress_callback:
                 progress_callback(self.progress)
             
-            # Write file to zip
-            zipf.write(file_path, arcname)
+            # Stream file into zip, hashing the data as it is read
+            zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+            zinfo.compress_type = zipfile.ZIP_DEFLATED
+            with open(file_path, 'rb') as src, zipf.open(zinfo, 'w') as dest:
+                digest, size = self._stream_copy(src, dest)
+            
+            # CRC is recorded so archives can be checked without decompression
+            self._manifest.add(arcname, size, stat.st_mtime, digest, crc=zinfo.CRC)
             
             # Mark file as complete
             self.progress.current_file_processed = self.progress.current_file_size
@@ -301,50 +626,42 @@ class BackupEngine:
         progress_callback: Optional[Callable[[BackupProgress], None]]
     ):
         """Perform backup without compression."""
-        for source_path in source_paths:
-            source = Path(source_path)
-            if not source.exists():
-                self.progress.errors.append(f"Source not found: {source_path}")
-                continue
-            
-            if source.is_file():
-                if self._should_include_file(source, filters):
-                    dest_file = backup_dir / source.name
-                    self._copy_file(source, dest_file, progress_callback)
-            else:
-                for root, dirs, files in os.walk(source):
-                    for file in files:
-                        if self.progress.is_cancelled:
-                            return
-                        
-                        while self.progress.is_paused:
-                            threading.Event().wait(0.1)
-                        
-                        file_path = Path(root) / file
-                        if self._should_include_file(file_path, filters):
-                            rel_path = file_path.relative_to(source)
-                            dest_file = backup_dir / source.name / rel_path
-                            dest_file.parent.mkdir(parents=True, exist_ok=True)
-                            self._copy_file(file_path, dest_file, progress_callback)
+        self._backup_files(
+            source_paths, filters, True,
+            lambda file_path, relpath, base_entry: self._copy_file(
+                file_path, backup_dir / relpath, relpath, base_entry, progress_callback
+            )
+        )
     
     def _copy_file(
         self,
         src: Path,
         dest: Path,
+        relpath: str,
+        base_entry: Optional[Dict[str, Any]],
         progress_callback: Optional[Callable[[BackupProgress], None]]
     ):
         """Copy a single file with progress tracking."""
         try:
+            stat = src.stat()
+            if self._skip_unchanged(stat, base_entry):
+                return
+            
             self.progress.current_file = str(src)
-            self.progress.current_file_size = src.stat().st_size
+            self.progress.current_file_size = stat.st_size
             self.progress.current_file_processed = 0
             
             # Update progress before copying
             if progress_callback:
                 progress_callback(self.progress)
             
-            # Copy file
-            shutil.copy2(src, dest)
+            # Copy file contents, hashing the data as it is read
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            with open(src, 'rb') as fsrc, open(dest, 'wb') as fdest:
+                digest, size = self._stream_copy(fsrc, fdest)
+            shutil.copystat(src, dest)
+            
+            self._manifest.add(relpath, size, stat.st_mtime, digest)
             
             # Mark file as complete
             self.progress.current_file_processed = self.progress.current_file_size
@@ -358,24 +675,81 @@ class BackupEngine:
         except Exception as e:
             self.progress.errors.append(f"Error copying {src}: {str(e)}")
     
-    def _calculate_checksum(self, path: str) -> str:
-        """Calculate SHA-256 checksum of backup."""
-        sha256 = hashlib.sha256()
+    def _stream_copy(self, src, dest) -> tuple:
+        """
+        Copy data between open file objects while hashing it.
+        
+        Returns:
+            Tuple of (hex_digest, bytes_copied)
+        """
+        hasher = create_hasher(self._hash_algorithm)
+        size = 0
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+            dest.write(chunk)
+            size += len(chunk)
+            self.progress.current_file_processed = size
+            self.rate_limiter.consume(len(chunk))
+        return hasher.hexdigest(), size
+    
+    def _calculate_checksum(self, path: str, algorithm: str = DEFAULT_ALGORITHM) -> str:
+        """
+        Calculate checksum of backup.
+        
+        ZIP archives are hashed as a single file. For folder backups the
+        files are hashed in parallel and the checksum is taken over the
+        sorted list of relative paths and their digests.
+        """
         path_obj = Path(path)
         
         if path_obj.is_file():
-            with open(path_obj, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    sha256.update(chunk)
-        else:
-            # For directories, hash all file contents
-            for file_path in sorted(path_obj.rglob("*")):
-                if file_path.is_file():
-                    with open(file_path, 'rb') as f:
-                        for chunk in iter(lambda: f.read(4096), b""):
-                            sha256.update(chunk)
-        
-        return sha256.hexdigest()
+            return hash_file(path_obj, algorithm)
+        
+        files = sorted(p for p in path_obj.rglob("*") if p.is_file())
+        combined = create_hasher(algorithm)
+        for file_path, digest, error in hash_files(files, algorithm):
+            if error:
+                raise OSError(f"Cannot hash {file_path}: {error}")
+            rel_path = file_path.relative_to(path_obj).as_posix()
+            combined.update(f"{rel_path}\0{digest}\n".encode("utf-8"))
+        
+        return combined.hexdigest()
+    
+    def verify_backup(
+        self,
+        backup_path: str,
+        mode: str = "quick",
+        progress_callback: Optional[Callable[[BackupProgress], None]] = None,
+        max_bytes_per_second: float = 0,
+        max_workers: int = None
+    ) -> Dict[str, Any]:
+        """
+        Verify an existing backup against its manifest.
+        
+        Args:
+            backup_path: Path to the backup ZIP file or folder
+            mode: "quick" checks sizes and CRCs without decompressing,
+                "deep" re-hashes all contents in parallel
+            progress_callback: Optional callback for progress updates
+            max_bytes_per_second: Read throughput limit (0 = unlimited)
+            max_workers: Number of hashing threads
+            
+        Returns:
+            Dictionary with verification results
+        """
+        from core.verifier import BackupVerifier
+        
+        # Share progress so cancel/pause on the engine apply to verification
+        self._start_progress()
+        verifier = BackupVerifier(self.progress)
+        return verifier.verify(backup_path, mode, progress_callback, max_bytes_per_second, max_workers)
+    
+    def _start_progress(self):
+        """Start tracking a new operation, keeping cancel and pause requests made before it started."""
+        previous = self.progress
+        self.progress = BackupProgress()
+        self.progress.is_cancelled = previous.is_cancelled
+        self.progress.is_paused = previous.is_paused
     
     def cancel_backup(self):
         """Cancel the current backup operation."""
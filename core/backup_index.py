@@ -0,0 +1,262 @@
+"""
+Member index for fast selective restore.
+
+Each backup gets a small SQLite database mapping every stored path to its
+size, mtime, hash and, for ZIP archives, the local header offset and
+compressed size. A single file can then be located with one B-tree lookup
+and read straight from its offset, without parsing the archive's central
+directory.
+"""
+import zlib
+import struct
+import sqlite3
+import zipfile
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+from core.manifest import read_manifest
+
+
+# ZIP local file header (see APPNOTE.TXT 4.3.7)
+LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+# Compressed bytes read from the archive at a time
+READ_SIZE = 1024 * 1024
+
+# Characters that make a restore pattern a glob instead of an exact path
+_GLOB_CHARS = set("*?[")
+
+
+def index_path_for(job_folder: Path, timestamp: str) -> Path:
+    """Get the member index path for a backup timestamp inside a job folder."""
+    return Path(job_folder) / f"backup_{timestamp}_index.db"
+
+
+class IndexedMember(NamedTuple):
+    """A single indexed backup member."""
+    path: str
+    size: int
+    mtime: Optional[float]
+    hash: Optional[str]
+    header_offset: Optional[int]
+    compress_size: Optional[int]
+    compress_type: Optional[int]
+    crc: Optional[int]
+
+
+class BackupIndex:
+    """Read access to a backup member index."""
+    
+    _COLUMNS = "path, size, mtime, hash, header_offset, compress_size, compress_type, crc"
+    
+    def __init__(self, index_file: Path):
+        self.index_file = Path(index_file)
+        self.conn = sqlite3.connect(
+            f"{self.index_file.resolve().as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False
+        )
+    
+    @classmethod
+    def build(cls, index_file: Path, backup_path: Path, manifest_file: Path = None) -> List[str]:
+        """
+        Create the index for a finished backup.
+        
+        ZIP members come from the archive's central directory and get
+        their mtimes and hashes from the manifest, which is streamed
+        rather than loaded, as are the members of folder backups.
+        
+        Args:
+            index_file: Database file to create
+            backup_path: Backup ZIP file or folder
+            manifest_file: Manifest providing mtimes and hashes
+        
+        Returns:
+            Paths stored more than once; only one of their versions (the
+            one a ZIP reader would extract) is indexed
+        """
+        index_file = Path(index_file)
+        if index_file.exists():
+            index_file.unlink()
+        has_manifest = manifest_file is not None and Path(manifest_file).exists()
+        duplicates: List[str] = []
+        
+        def zip_rows(zipf: zipfile.ZipFile) -> Iterator[tuple]:
+            for info in zipf.infolist():
+                if not info.is_dir():
+                    yield (
+                        info.filename, info.file_size, None, None,
+                        info.header_offset, info.compress_size, info.compress_type, info.CRC
+                    )
+        
+        def manifest_rows() -> Iterator[tuple]:
+            previous = None
+            for entry in read_manifest(manifest_file):
+                if entry.get("deleted"):
+                    continue
+                if entry["path"] == previous:
+                    duplicates.append(entry["path"])
+                previous = entry["path"]
+                yield (entry["path"], entry["size"], entry["mtime"], entry["hash"], None, None, None, None)
+        
+        conn = sqlite3.connect(index_file)
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE members ("
+                    "path TEXT PRIMARY KEY, size INTEGER, mtime REAL, hash TEXT, "
+                    "header_offset INTEGER, compress_size INTEGER, compress_type INTEGER, crc INTEGER"
+                    ") WITHOUT ROWID"
+                )
+                insert = f"INSERT OR REPLACE INTO members ({cls._COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                if Path(backup_path).is_file():
+                    with zipfile.ZipFile(backup_path) as zipf:
+                        conn.executemany(insert, zip_rows(zipf))
+                        # Later members replace earlier ones of the same name, as in zipfile
+                        members = [info.filename for info in zipf.infolist() if not info.is_dir()]
+                        if len(zipf.NameToInfo) < len(members):
+                            duplicates.extend(name for name, n in Counter(members).items() if n > 1)
+                    if has_manifest:
+                        conn.executemany(
+                            "UPDATE members SET mtime = ?, hash = ? WHERE path = ?",
+                            (
+                                (entry["mtime"], entry["hash"], entry["path"])
+                                for entry in read_manifest(manifest_file) if not entry.get("deleted")
+                            )
+                        )
+                elif has_manifest:
+                    conn.executemany(insert, manifest_rows())
+        finally:
+            conn.close()
+        return sorted(set(duplicates))
+    
+    def lookup(self, path: str) -> Optional[IndexedMember]:
+        """Find a member by its exact path."""
+        row = self.conn.execute(
+            f"SELECT {self._COLUMNS} FROM members WHERE path = ?",
+            (path.strip("/"),)
+        ).fetchone()
+        return IndexedMember(*row) if row else None
+    
+    def match(self, patterns: Iterable[str]) -> List[IndexedMember]:
+        """
+        Find members matching paths or glob patterns.
+        
+        Exact paths use a primary key lookup. Globs use SQLite GLOB, which
+        is served from the index for the literal prefix before the first
+        wildcard. A trailing "/" selects a whole directory.
+        """
+        found = {}
+        for pattern in patterns:
+            pattern = pattern.replace("\\", "/").lstrip("/")
+            if pattern.endswith("/"):
+                pattern += "*"
+            
+            if _GLOB_CHARS & set(pattern):
+                cursor = self.conn.execute(
+                    f"SELECT {self._COLUMNS} FROM members WHERE path GLOB ?",
+                    (pattern,)
+                )
+                for row in cursor:
+                    found[row[0]] = IndexedMember(*row)
+            else:
+                member = self.lookup(pattern)
+                if member:
+                    found[member.path] = member
+        
+        # Archive order keeps reads sequential
+        return sorted(found.values(), key=lambda m: (m.header_offset or 0, m.path))
+    
+    def count(self) -> int:
+        """Get the number of indexed members."""
+        return self.conn.execute("SELECT COUNT(*) FROM members").fetchone()[0]
+    
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+    
+    def __enter__(self) -> 'BackupIndex':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class IndexedMemberReader:
+    """File-like reader for a ZIP member located through the index."""
+    
+    def __init__(self, archive_file, member: IndexedMember):
+        """
+        Args:
+            archive_file: ZIP archive opened in binary mode
+            member: Indexed member to read
+        """
+        self._file = archive_file
+        self._member = member
+        
+        archive_file.seek(member.header_offset)
+        fields = LOCAL_HEADER.unpack(archive_file.read(LOCAL_HEADER.size))
+        if fields[0] != LOCAL_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile(f"Bad local header for {member.path}")
+        archive_file.seek(fields[9] + fields[10], 1)
+        
+        if member.compress_type == zipfile.ZIP_DEFLATED:
+            self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        elif member.compress_type == zipfile.ZIP_STORED:
+            self._decompressor = None
+        else:
+            raise NotImplementedError(f"Unsupported compression for indexed read: {member.compress_type}")
+        
+        self._remaining = member.compress_size
+        self._pending = b""
+        self._crc = 0
+        self._size = 0
+    
+    def _read_raw(self, size: int) -> bytes:
+        """Read compressed bytes belonging to the member."""
+        raw = self._file.read(size)
+        if not raw:
+            raise EOFError(f"Archive truncated in {self._member.path}")
+        self._remaining -= len(raw)
+        return raw
+    
+    def read(self, size: int = -1) -> bytes:
+        """Read up to size decompressed bytes (b"" at end of member)."""
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(READ_SIZE), b""))
+        
+        data = b""
+        while not data:
+            if self._decompressor is None:
+                if self._remaining == 0:
+                    break
+                data = self._read_raw(min(size, self._remaining))
+            elif self._pending:
+                # Bounded output keeps memory flat for highly compressible data
+                data = self._decompressor.decompress(self._pending, size)
+                self._pending = self._decompressor.unconsumed_tail
+            elif self._remaining > 0:
+                self._pending = self._read_raw(min(self._remaining, READ_SIZE))
+            else:
+                data = self._decompressor.flush()
+                break
+        
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        if not data:
+            self._check()
+        return data
+    
+    def _check(self):
+        """Validate size and CRC once the member has been read."""
+        if self._size != self._member.size:
+            raise zipfile.BadZipFile(f"Size mismatch for {self._member.path}")
+        if self._member.crc is not None and self._crc != self._member.crc:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for {self._member.path}")
+    
+    def __enter__(self) -> 'IndexedMemberReader':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        pass
@@ -0,0 +1,751 @@
+"""
+Central SQLite catalog of backup runs.
+
+Every backup run is recorded with its artifacts, sizes, duration, checksum
+and per-file manifest, so history views query indexed tables instead of
+globbing job folders and parsing metadata files. The on-disk metadata
+stays authoritative: the catalog can be rebuilt from it at any time.
+
+Backed-up paths are interned once and indexed for search across all jobs
+and backups: prefix queries use the B-tree on paths, substring and glob
+queries a trigram full-text index kept in sync by triggers.
+
+Storage totals per job folder are maintained by triggers as well and
+sampled on every change, so capacity analytics never scan destinations.
+
+Writes go through one connection under a lock. Queries use a separate
+connection per thread, so with WAL they never wait for a write in
+progress, such as a large manifest being recorded.
+"""
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from core.chain import TIMESTAMP_FORMAT
+from core.manifest import manifest_path_for, read_manifest
+
+
+# Paths resolved to ids per batch while recording file entries
+_BATCH_SIZE = 500
+
+# Maximum number of error messages stored per run
+_MAX_STORED_ERRORS = 100
+
+# Characters that make a search pattern a glob
+_GLOB_CHARS = set("*?[")
+
+# Shortest substring the trigram index can serve
+_MIN_TRIGRAM_LENGTH = 3
+
+# Storage samples older than this many days are dropped
+_SAMPLE_HISTORY_DAYS = 400
+
+
+def _add_path_search(conn: sqlite3.Connection):
+    """Create the trigram search index over interned paths."""
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE paths_fts USING fts5("
+            "path, content='paths', content_rowid='id', tokenize='trigram')"
+        )
+    except sqlite3.OperationalError:
+        # SQLite without FTS5 or the trigram tokenizer: searches scan paths
+        return
+    conn.execute(
+        "CREATE TRIGGER paths_fts_insert AFTER INSERT ON paths BEGIN "
+        "INSERT INTO paths_fts (rowid, path) VALUES (new.id, new.path); END"
+    )
+    conn.execute(
+        "CREATE TRIGGER paths_fts_delete AFTER DELETE ON paths BEGIN "
+        "INSERT INTO paths_fts (paths_fts, rowid, path) VALUES ('delete', old.id, old.path); END"
+    )
+    conn.execute("INSERT INTO paths_fts (paths_fts) VALUES ('rebuild')")
+
+
+def _epoch_days(moment: datetime) -> float:
+    """Convert a moment to days since the Unix epoch."""
+    return moment.timestamp() / 86400
+
+
+def _add_storage_usage(conn: sqlite3.Connection):
+    """Create per-folder storage totals, kept up to date by triggers, and their history."""
+    conn.execute(
+        "CREATE TABLE storage_usage ("
+        "job_folder TEXT PRIMARY KEY, "
+        "runs INTEGER NOT NULL DEFAULT 0, "
+        "logical_size INTEGER NOT NULL DEFAULT 0, "
+        "stored_size INTEGER NOT NULL DEFAULT 0"
+        ") WITHOUT ROWID"
+    )
+    # Stored size of a folder after every change, in days since the epoch
+    conn.execute(
+        "CREATE TABLE storage_samples ("
+        "job_folder TEXT NOT NULL, "
+        "sampled_at REAL NOT NULL, "
+        "stored_size INTEGER NOT NULL, "
+        "PRIMARY KEY (job_folder, sampled_at)"
+        ") WITHOUT ROWID"
+    )
+    conn.execute(
+        "CREATE TRIGGER storage_run_insert AFTER INSERT ON runs WHEN new.status != 'failed' BEGIN "
+        "INSERT OR IGNORE INTO storage_usage (job_folder) VALUES (new.job_folder); "
+        "UPDATE storage_usage SET runs = runs + 1, logical_size = logical_size + COALESCE(new.total_size, 0) "
+        "WHERE job_folder = new.job_folder; END"
+    )
+    conn.execute(
+        "CREATE TRIGGER storage_artifact_insert AFTER INSERT ON artifacts BEGIN "
+        "UPDATE storage_usage SET stored_size = stored_size + COALESCE(new.size, 0) "
+        "WHERE job_folder = (SELECT job_folder FROM runs WHERE id = new.run_id); END"
+    )
+    # Artifacts are still present before the cascade removes them
+    conn.execute(
+        "CREATE TRIGGER storage_run_delete BEFORE DELETE ON runs WHEN old.status != 'failed' BEGIN "
+        "UPDATE storage_usage SET runs = runs - 1, "
+        "logical_size = logical_size - COALESCE(old.total_size, 0), "
+        "stored_size = stored_size - (SELECT COALESCE(SUM(size), 0) FROM artifacts WHERE run_id = old.id) "
+        "WHERE job_folder = old.job_folder; END"
+    )
+    
+    rows = conn.execute(
+        "SELECT r.job_folder, r.timestamp, r.total_size, "
+        "(SELECT COALESCE(SUM(size), 0) FROM artifacts WHERE run_id = r.id) "
+        "FROM runs r WHERE r.status != 'failed' ORDER BY r.job_folder, r.timestamp"
+    ).fetchall()
+    totals: Dict[str, List[int]] = {}
+    samples = []
+    for job_folder, timestamp, logical_size, stored_size in rows:
+        total = totals.setdefault(job_folder, [0, 0, 0])
+        total[0] += 1
+        total[1] += logical_size or 0
+        total[2] += stored_size
+        samples.append((job_folder, _epoch_days(datetime.strptime(timestamp, TIMESTAMP_FORMAT)), total[2]))
+    conn.executemany(
+        "INSERT INTO storage_usage (job_folder, runs, logical_size, stored_size) VALUES (?, ?, ?, ?)",
+        [(job_folder, *total) for job_folder, total in totals.items()]
+    )
+    conn.executemany("INSERT OR REPLACE INTO storage_samples VALUES (?, ?, ?)", samples)
+
+
+# Schema migrations, applied in order; PRAGMA user_version holds the count
+# applied. A migration is either an SQL script or a function taking the connection.
+_MIGRATIONS = [
+    """
+    CREATE TABLE runs (
+        id INTEGER PRIMARY KEY,
+        job_id TEXT,
+        job_name TEXT,
+        job_folder TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        started_at TEXT,
+        finished_at TEXT,
+        status TEXT NOT NULL,
+        backup_type TEXT,
+        base_backup TEXT,
+        destination TEXT,
+        compression INTEGER,
+        total_files INTEGER DEFAULT 0,
+        total_size INTEGER DEFAULT 0,
+        duration_seconds REAL,
+        checksum TEXT,
+        hash_algorithm TEXT,
+        merkle_root TEXT,
+        error_count INTEGER DEFAULT 0,
+        errors TEXT,
+        UNIQUE (job_folder, timestamp)
+    );
+    CREATE INDEX runs_job_id ON runs (job_id, timestamp);
+    CREATE INDEX runs_timestamp ON runs (timestamp);
+    CREATE INDEX runs_status ON runs (status, timestamp);
+    
+    CREATE TABLE artifacts (
+        run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+        kind TEXT NOT NULL,
+        path TEXT NOT NULL,
+        size INTEGER,
+        PRIMARY KEY (run_id, kind)
+    ) WITHOUT ROWID;
+    
+    CREATE TABLE paths (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE
+    );
+    
+    CREATE TABLE files (
+        run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+        path_id INTEGER NOT NULL REFERENCES paths (id),
+        size INTEGER,
+        mtime REAL,
+        hash TEXT,
+        deleted INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (run_id, path_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX files_path ON files (path_id, run_id);
+    """,
+    _add_path_search,
+    _add_storage_usage,
+]
+
+SCHEMA_VERSION = len(_MIGRATIONS)
+
+_RUN_COLUMNS = (
+    "id", "job_id", "job_name", "job_folder", "timestamp", "started_at", "finished_at",
+    "status", "backup_type", "base_backup", "destination", "compression", "total_files",
+    "total_size", "duration_seconds", "checksum", "hash_algorithm", "merkle_root",
+    "error_count", "errors",
+)
+
+
+def _folder_key(job_folder) -> str:
+    """Normalize a job folder path for storage and lookup."""
+    return str(Path(job_folder).resolve())
+
+
+def run_status(metadata: Dict[str, Any]) -> str:
+    """Derive the status of a finished run from its metadata."""
+    if metadata.get("cancelled"):
+        return "cancelled"
+    if metadata.get("errors"):
+        return "completed_with_errors"
+    return "completed"
+
+
+class BackupCatalog:
+    """Catalog of backup runs stored in SQLite."""
+    
+    def __init__(self, db_file: str = None):
+        if db_file is None:
+            data_dir = Path(__file__).parent.parent / "data"
+            data_dir.mkdir(parents=True, exist_ok=True)
+            self.db_file = data_dir / "catalog.db"
+        else:
+            self.db_file = Path(db_file)
+        
+        # Write connection, shared between the GUI thread and backup threads
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        # Read connections per thread; all of them are closed by close()
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._migrate()
+        self._has_fts = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'paths_fts'"
+        ).fetchone() is not None
+    
+    def _reader(self) -> sqlite3.Connection:
+        """Get the calling thread's read connection, which sees committed data only."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+    
+    def _migrate(self):
+        """Bring the schema up to SCHEMA_VERSION."""
+        with self._lock:
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            for number in range(version, SCHEMA_VERSION):
+                migration = _MIGRATIONS[number]
+                with self.conn:
+                    if callable(migration):
+                        migration(self.conn)
+                    else:
+                        for statement in migration.split(";"):
+                            if statement.strip():
+                                self.conn.execute(statement)
+                    self.conn.execute(f"PRAGMA user_version = {number + 1}")
+    
+    def record_backup(
+        self,
+        job_folder: Path,
+        metadata: Dict[str, Any],
+        job_id: str = None,
+        job_name: str = None
+    ) -> int:
+        """
+        Record a finished backup run together with its file entries.
+        
+        The run, its artifacts and its files are written in a single
+        transaction; recording the same backup again replaces it.
+        
+        Args:
+            job_folder: Folder holding the backup and its companion files
+            metadata: Metadata written by the backup engine
+            job_id: Id of the job that produced the backup
+            job_name: Name of the job
+        
+        Returns:
+            Id of the recorded run
+        """
+        job_folder = Path(job_folder)
+        timestamp = metadata["timestamp"]
+        started_at = datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+        duration = metadata.get("duration_seconds")
+        errors = metadata.get("errors", [])
+        
+        run = {
+            "job_id": job_id,
+            "job_name": job_name,
+            "job_folder": _folder_key(job_folder),
+            "timestamp": timestamp,
+            "started_at": started_at.isoformat(),
+            "finished_at": (started_at + timedelta(seconds=duration)).isoformat() if duration is not None else None,
+            "status": run_status(metadata),
+            "backup_type": metadata.get("backup_type"),
+            "base_backup": metadata.get("base_backup"),
+            "destination": metadata.get("destination"),
+            "compression": int(bool(metadata.get("compression"))),
+            "total_files": metadata.get("total_files", 0),
+            "total_size": metadata.get("total_size", 0),
+            "duration_seconds": duration,
+            "checksum": metadata.get("checksum"),
+            "hash_algorithm": metadata.get("hash_algorithm"),
+            "merkle_root": metadata.get("merkle_root"),
+            "error_count": len(errors),
+            "errors": json.dumps(errors[:_MAX_STORED_ERRORS], ensure_ascii=False),
+        }
+        
+        artifacts = {"metadata": job_folder / f"backup_{timestamp}_metadata.json"}
+        if metadata.get("destination"):
+            artifacts["backup"] = job_folder / Path(metadata["destination"]).name
+        for kind, key in (("manifest", "manifest"), ("tree", "merkle_tree"), ("index", "index")):
+            if metadata.get(key):
+                artifacts[kind] = job_folder / metadata[key]
+        
+        manifest_file = manifest_path_for(job_folder, timestamp)
+        
+        with self._lock, self.conn:
+            run_id = self._insert_run(run)
+            self.conn.executemany(
+                "INSERT INTO artifacts (run_id, kind, path, size) VALUES (?, ?, ?, ?)",
+                [(run_id, kind, str(path), self._artifact_size(path)) for kind, path in artifacts.items()]
+            )
+            if manifest_file.exists():
+                self._insert_files(run_id, read_manifest(manifest_file))
+            self._sample_storage(run["job_folder"])
+        return run_id
+    
+    def record_failure(
+        self,
+        job_folder: Path,
+        timestamp: str,
+        error: str,
+        backup_type: str = None,
+        job_id: str = None,
+        job_name: str = None
+    ) -> int:
+        """Record a backup run that failed before producing metadata."""
+        run = {
+            "job_id": job_id,
+            "job_name": job_name,
+            "job_folder": _folder_key(job_folder),
+            "timestamp": timestamp,
+            "started_at": datetime.strptime(timestamp, TIMESTAMP_FORMAT).isoformat(),
+            "finished_at": datetime.now().isoformat(),
+            "status": "failed",
+            "backup_type": backup_type,
+            "error_count": 1,
+            "errors": json.dumps([error], ensure_ascii=False),
+        }
+        with self._lock, self.conn:
+            return self._insert_run(run)
+    
+    def _insert_run(self, run: Dict[str, Any]) -> int:
+        """Insert or replace a run row inside the current transaction."""
+        # Replacing cascades to the artifacts and files of the previous row
+        self.conn.execute(
+            "DELETE FROM runs WHERE job_folder = ? AND timestamp = ?",
+            (run["job_folder"], run["timestamp"])
+        )
+        columns = ", ".join(run)
+        placeholders = ", ".join("?" for _ in run)
+        cursor = self.conn.execute(f"INSERT INTO runs ({columns}) VALUES ({placeholders})", tuple(run.values()))
+        return cursor.lastrowid
+    
+    def _insert_files(self, run_id: int, entries: Iterable[Dict[str, Any]]):
+        """Insert manifest entries, interning their paths in batches."""
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= _BATCH_SIZE:
+                self._insert_file_batch(run_id, batch)
+                batch = []
+        if batch:
+            self._insert_file_batch(run_id, batch)
+    
+    def _insert_file_batch(self, run_id: int, batch: List[Dict[str, Any]]):
+        """Insert one batch of manifest entries."""
+        paths = [entry["path"] for entry in batch]
+        self.conn.executemany("INSERT OR IGNORE INTO paths (path) VALUES (?)", ((path,) for path in paths))
+        placeholders = ", ".join("?" for _ in paths)
+        path_ids = dict(self.conn.execute(f"SELECT path, id FROM paths WHERE path IN ({placeholders})", paths))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO files (run_id, path_id, size, mtime, hash, deleted) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (run_id, path_ids[entry["path"]], entry.get("size"), entry.get("mtime"),
+                 entry.get("hash"), int(bool(entry.get("deleted"))))
+                for entry in batch
+            )
+        )
+    
+    def _artifact_size(self, path: Path) -> Optional[int]:
+        """Get the stored size of an artifact file or folder."""
+        try:
+            if path.is_dir():
+                return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+            return path.stat().st_size
+        except OSError:
+            return None
+    
+    def _where(
+        self,
+        job_folder=None,
+        job_id: str = None,
+        status: str = None,
+        since: datetime = None,
+        until: datetime = None
+    ) -> Tuple[str, list]:
+        """Build the WHERE clause for run queries."""
+        clauses, params = [], []
+        if job_folder is not None:
+            clauses.append("job_folder = ?")
+            params.append(_folder_key(job_folder))
+        if job_id is not None:
+            clauses.append("job_id = ?")
+            params.append(job_id)
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since.strftime(TIMESTAMP_FORMAT))
+        if until is not None:
+            clauses.append("timestamp <= ?")
+            params.append(until.strftime(TIMESTAMP_FORMAT))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+    
+    def get_runs(
+        self,
+        job_folder=None,
+        job_id: str = None,
+        status: str = None,
+        since: datetime = None,
+        until: datetime = None,
+        limit: int = None,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Query recorded runs, newest first.
+        
+        Args:
+            job_folder: Only runs stored in this job folder
+            job_id: Only runs of this job
+            status: Only runs with this status
+            since: Only runs started at or after this moment
+            until: Only runs started at or before this moment
+            limit: Maximum number of runs
+            offset: Number of runs to skip
+        
+        Returns:
+            List of run dictionaries
+        """
+        where, params = self._where(job_folder, job_id, status, since, until)
+        query = f"SELECT {', '.join(_RUN_COLUMNS)} FROM runs{where} ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        rows = self._reader().execute(query, params).fetchall()
+        return [self._run_dict(row) for row in rows]
+    
+    def count_runs(
+        self,
+        job_folder=None,
+        job_id: str = None,
+        status: str = None,
+        since: datetime = None,
+        until: datetime = None
+    ) -> int:
+        """Count recorded runs matching the same filters as get_runs()."""
+        where, params = self._where(job_folder, job_id, status, since, until)
+        return self._reader().execute(f"SELECT COUNT(*) FROM runs{where}", params).fetchone()[0]
+    
+    def get_run(self, job_folder, timestamp: str) -> Optional[Dict[str, Any]]:
+        """Get a single run by job folder and timestamp."""
+        row = self._reader().execute(
+            f"SELECT {', '.join(_RUN_COLUMNS)} FROM runs WHERE job_folder = ? AND timestamp = ?",
+            (_folder_key(job_folder), timestamp)
+        ).fetchone()
+        return self._run_dict(row) if row else None
+    
+    def get_artifacts(self, run_id: int) -> Dict[str, Dict[str, Any]]:
+        """Get the artifacts of a run keyed by kind."""
+        rows = self._reader().execute(
+            "SELECT kind, path, size FROM artifacts WHERE run_id = ?",
+            (run_id,)
+        ).fetchall()
+        return {kind: {"path": path, "size": size} for kind, path, size in rows}
+    
+    def iter_files(self, run_id: int) -> Iterator[Dict[str, Any]]:
+        """Iterate over the file entries recorded for a run in path order."""
+        rows = self._reader().execute(
+            "SELECT p.path, f.size, f.mtime, f.hash, f.deleted FROM files f "
+            "JOIN paths p ON p.id = f.path_id WHERE f.run_id = ? ORDER BY p.path",
+            (run_id,)
+        ).fetchall()
+        for path, size, mtime, digest, deleted in rows:
+            if deleted:
+                yield {"path": path, "deleted": True}
+            else:
+                yield {"path": path, "size": size, "mtime": mtime, "hash": digest}
+    
+    def delete_run(self, job_folder, timestamp: str):
+        """Remove a run and its artifacts and files from the catalog."""
+        self._delete_runs("job_folder = ? AND timestamp = ?", (_folder_key(job_folder), timestamp))
+        with self._lock, self.conn:
+            self._sample_storage(_folder_key(job_folder))
+    
+    def get_storage_usage(self, job_folder=None) -> List[Dict[str, Any]]:
+        """
+        Get the storage totals of job folders.
+        
+        Totals are updated by triggers as runs are recorded and deleted,
+        so reading them never touches the destination.
+        
+        Returns:
+            List of dictionaries with job_folder, runs, logical_size
+            (bytes of the backed-up files) and stored_size (bytes on disk)
+        """
+        query = "SELECT job_folder, runs, logical_size, stored_size FROM storage_usage"
+        params = []
+        if job_folder is not None:
+            query += " WHERE job_folder = ?"
+            params.append(_folder_key(job_folder))
+        rows = self._reader().execute(query, params).fetchall()
+        return [
+            {"job_folder": folder, "runs": runs, "logical_size": logical_size, "stored_size": stored_size}
+            for folder, runs, logical_size, stored_size in rows
+        ]
+    
+    def get_growth_rate(self, job_folder, since: datetime) -> Optional[float]:
+        """
+        Estimate how fast a job folder grows from its storage samples.
+        
+        The rate is the least-squares slope of the stored size over time,
+        computed from running sums in a single aggregate query.
+        
+        Args:
+            job_folder: Job folder to estimate
+            since: Only use samples taken at or after this moment
+        
+        Returns:
+            Growth in bytes per day (negative when shrinking), or None with
+            fewer than two samples
+        """
+        origin = _epoch_days(since)
+        n, sum_x, sum_y, sum_xx, sum_xy = self._reader().execute(
+            "SELECT COUNT(*), SUM(x), SUM(y), SUM(x * x), SUM(x * y) FROM ("
+            "SELECT sampled_at - ? AS x, CAST(stored_size AS REAL) AS y FROM storage_samples "
+            "WHERE job_folder = ? AND sampled_at >= ?)",
+            (origin, _folder_key(job_folder), origin)
+        ).fetchone()
+        if n < 2:
+            return None
+        denominator = n * sum_xx - sum_x * sum_x
+        if denominator <= 0:
+            return None
+        return (n * sum_xy - sum_x * sum_y) / denominator
+    
+    def _sample_storage(self, folder_key: str):
+        """Record the current stored size of a job folder; call inside a transaction."""
+        now = _epoch_days(datetime.now().replace(microsecond=0))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO storage_samples (job_folder, sampled_at, stored_size) "
+            "SELECT job_folder, ?, stored_size FROM storage_usage WHERE job_folder = ?",
+            (now, folder_key)
+        )
+        self.conn.execute(
+            "DELETE FROM storage_samples WHERE job_folder = ? AND sampled_at < ?",
+            (folder_key, now - _SAMPLE_HISTORY_DAYS)
+        )
+    
+    def _delete_runs(self, where: str, params: tuple):
+        """
+        Delete runs and release paths no other run references.
+        
+        Releasing paths keeps the search index limited to paths that
+        still exist in some backup.
+        """
+        with self._lock, self.conn:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS released_paths (id INTEGER PRIMARY KEY)")
+            self.conn.execute("DELETE FROM released_paths")
+            self.conn.execute(
+                "INSERT OR IGNORE INTO released_paths "
+                f"SELECT f.path_id FROM files f JOIN runs r ON r.id = f.run_id WHERE {where}",
+                params
+            )
+            self.conn.execute(f"DELETE FROM runs WHERE {where}", params)
+            self.conn.execute(
+                "DELETE FROM paths WHERE id IN (SELECT id FROM released_paths) "
+                "AND NOT EXISTS (SELECT 1 FROM files WHERE files.path_id = paths.id)"
+            )
+    
+    def search_files(
+        self,
+        pattern: str,
+        mode: str = "substring",
+        job_folder=None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Find every backed-up version of paths matching a pattern.
+        
+        Args:
+            pattern: Text to search for
+            mode: "prefix" (path starts with pattern), "substring"
+                (case-insensitive, anywhere in the path) or "glob"
+                (SQLite GLOB syntax, case-sensitive)
+            job_folder: Only versions stored in this job folder
+            limit: Maximum number of distinct paths
+        
+        Returns:
+            List of versions ordered by path and newest backup first, each
+            with the file's size, mtime, hash and deleted flag and the run
+            holding it
+        """
+        if mode not in ("prefix", "substring", "glob"):
+            raise ValueError(f"Unknown search mode: {mode}")
+        pattern = pattern.replace("\\", "/")
+        
+        # Candidate paths are limited first so broad patterns stay fast
+        order = ""
+        if mode == "glob" and _GLOB_CHARS & set(pattern[:1]):
+            if self._has_fts:
+                source, id_column, condition = "paths_fts", "rowid", "path GLOB ?"
+            else:
+                source, id_column, condition = "paths", "id", "path GLOB ?"
+            params = [pattern]
+        elif mode in ("glob", "prefix"):
+            source, id_column, order = "paths", "id", " ORDER BY path"
+            if mode == "glob":
+                # Range scan over the literal prefix, then the full glob
+                prefix = pattern[:next(i for i, c in enumerate(pattern + "*") if c in _GLOB_CHARS)]
+                condition = "path >= ? AND path < ? AND path GLOB ?"
+                params = [prefix, prefix + "\U0010ffff", pattern]
+            else:
+                condition = "path >= ? AND path < ?"
+                params = [pattern, pattern + "\U0010ffff"]
+        elif self._has_fts and len(pattern) >= _MIN_TRIGRAM_LENGTH:
+            source, id_column, condition = "paths_fts", "rowid", "paths_fts MATCH ?"
+            params = ['"' + pattern.replace('"', '""') + '"']
+        else:
+            escaped = pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            source, id_column, condition = "paths", "id", "path LIKE ? ESCAPE '\\'"
+            params = [f"%{escaped}%"]
+        
+        if job_folder is not None:
+            # Paths are shared by all jobs, so the limit must only count
+            # paths the job has stored
+            condition += (
+                " AND EXISTS (SELECT 1 FROM files f JOIN runs r ON r.id = f.run_id "
+                f"WHERE f.path_id = {source}.{id_column} AND r.job_folder = ?)"
+            )
+            params.append(_folder_key(job_folder))
+        candidates = f"SELECT {id_column} AS id FROM {source} WHERE {condition}{order} LIMIT ?"
+        params.append(limit)
+        
+        query = (
+            "SELECT p.path, f.size, f.mtime, f.hash, f.deleted, "
+            "r.id, r.timestamp, r.job_id, r.job_name, r.job_folder, r.destination "
+            f"FROM ({candidates}) c "
+            "JOIN paths p ON p.id = c.id "
+            "JOIN files f ON f.path_id = p.id "
+            "JOIN runs r ON r.id = f.run_id"
+        )
+        if job_folder is not None:
+            query += " WHERE r.job_folder = ?"
+            params.append(_folder_key(job_folder))
+        query += " ORDER BY p.path, r.timestamp DESC"
+        
+        rows = self._reader().execute(query, params).fetchall()
+        
+        columns = (
+            "path", "size", "mtime", "hash", "deleted", "run_id", "timestamp",
+            "job_id", "job_name", "job_folder", "destination",
+        )
+        versions = [dict(zip(columns, row)) for row in rows]
+        for version in versions:
+            version["deleted"] = bool(version["deleted"])
+        return versions
+    
+    def sync_folder(self, job_folder: Path, job_id: str = None, job_name: str = None) -> int:
+        """
+        Reconcile the catalog entries of a job folder with its metadata files.
+        
+        Only metadata files missing from the catalog are parsed; runs whose
+        metadata file no longer exists are removed. Failed runs, which have
+        no metadata file, are kept.
+        
+        Returns:
+            Number of runs added or removed
+        """
+        job_folder = Path(job_folder)
+        on_disk = {
+            metadata_file.name[len("backup_"):-len("_metadata.json")]: metadata_file
+            for metadata_file in job_folder.glob("backup_*_metadata.json")
+        }
+        cataloged = {
+            timestamp for timestamp, in self._reader().execute(
+                "SELECT timestamp FROM runs WHERE job_folder = ? AND status != 'failed'",
+                (_folder_key(job_folder),)
+            )
+        }
+        
+        changes = 0
+        for timestamp in sorted(on_disk.keys() - cataloged):
+            try:
+                with open(on_disk[timestamp], 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+            except (OSError, ValueError):
+                continue
+            metadata.setdefault("timestamp", timestamp)
+            self.record_backup(job_folder, metadata, job_id, job_name)
+            changes += 1
+        
+        for timestamp in cataloged - on_disk.keys():
+            self.delete_run(job_folder, timestamp)
+            changes += 1
+        return changes
+    
+    def _run_dict(self, row: tuple) -> Dict[str, Any]:
+        """Convert a run row to a dictionary."""
+        run = dict(zip(_RUN_COLUMNS, row))
+        run["compression"] = bool(run["compression"])
+        run["errors"] = json.loads(run["errors"]) if run["errors"] else []
+        return run
+    
+    def close(self):
+        """Close the database connections."""
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers = []
+        with self._lock:
+            self.conn.close()
+
+
+# Global catalog instance
+_catalog_instance: Optional[BackupCatalog] = None
+
+
+def get_catalog() -> BackupCatalog:
+    """Get or create the global catalog instance."""
+    global _catalog_instance
+    if _catalog_instance is None:
+        _catalog_instance = BackupCatalog()
+    return _catalog_instance
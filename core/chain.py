@@ -0,0 +1,186 @@
+"""
+Backup chains and point-in-time restore planning.
+
+Incremental and differential backups store only files that changed since
+their base backup, plus tombstones for deleted files, and record the base
+in ``base_backup``. The state of a job at any moment is resolved by
+merging the sorted manifests of one chain in a single streaming pass.
+"""
+import json
+import heapq
+from itertools import groupby
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from core.manifest import manifest_path_for, read_manifest_sorted
+from core.merkle import tree_path_for
+from core.backup_index import index_path_for
+
+
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+
+def list_backups(job_folder: Path) -> List[Dict[str, Any]]:
+    """
+    List backups of a job from their metadata files, oldest first.
+    
+    Returns:
+        List of metadata dictionaries
+    """
+    backups = []
+    for metadata_file in Path(job_folder).glob("backup_*_metadata.json"):
+        try:
+            with open(metadata_file, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            continue
+        metadata.setdefault("timestamp", metadata_file.name[len("backup_"):-len("_metadata.json")])
+        backups.append(metadata)
+    
+    backups.sort(key=lambda m: m["timestamp"])
+    return backups
+
+
+def companion_paths(job_folder: Path, timestamp: str) -> List[Path]:
+    """
+    Get the files stored next to a backup.
+    
+    The metadata file comes last, so deleting in this order keeps a backup
+    listed until everything else belonging to it is gone.
+    """
+    job_folder = Path(job_folder)
+    return [
+        manifest_path_for(job_folder, timestamp),
+        tree_path_for(job_folder, timestamp),
+        index_path_for(job_folder, timestamp),
+        job_folder / f"backup_{timestamp}_metadata.json",
+    ]
+
+
+def dependents(backups: List[Dict[str, Any]], timestamp: str) -> List[Dict[str, Any]]:
+    """Get the backups that use a backup as their base."""
+    return [m for m in backups if m.get("base_backup") == timestamp]
+
+
+def is_chainable(job_folder: Path, metadata: Dict[str, Any]) -> bool:
+    """Check whether a backup can serve as the base of another backup."""
+    return (
+        not metadata.get("cancelled")
+        and Path(metadata.get("destination", "")).exists()
+        and manifest_path_for(job_folder, metadata["timestamp"]).exists()
+    )
+
+
+def find_base_backup(job_folder: Path, backups: List[Dict[str, Any]], backup_type: str) -> Optional[Dict[str, Any]]:
+    """
+    Find the base for a new incremental or differential backup.
+    
+    Incremental backups build on the newest backup, differential backups
+    on the newest full backup.
+    
+    Args:
+        job_folder: Job folder holding the backups
+        backups: Backups of the job as returned by list_backups()
+        backup_type: "incremental" or "differential"
+    """
+    for metadata in reversed(backups):
+        if not is_chainable(job_folder, metadata):
+            continue
+        if backup_type == "incremental" or metadata.get("backup_type", "full") == "full":
+            return metadata
+    return None
+
+
+def backup_chain(backups: List[Dict[str, Any]], timestamp: str) -> List[Dict[str, Any]]:
+    """
+    Get the chain ending at a backup, from its full backup to itself.
+    
+    Raises:
+        ValueError: If a backup in the chain is missing
+    """
+    by_timestamp = {m["timestamp"]: m for m in backups}
+    chain = []
+    current = timestamp
+    while current:
+        metadata = by_timestamp.get(current)
+        if metadata is None:
+            raise ValueError(f"Backup {current} missing from chain")
+        chain.append(metadata)
+        current = metadata.get("base_backup")
+    chain.reverse()
+    return chain
+
+
+def resolve_entries(job_folder: Path, chain: List[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """
+    Resolve the newest version of every path across a chain.
+    
+    Manifests are sorted by path, so they are combined with a k-way heap
+    merge holding only one entry per manifest in memory.
+    
+    Yields:
+        Tuples of (manifest_entry, chain_position) in path order, where
+        chain_position indexes the artifact that stores the file
+    """
+    def stream(position: int, metadata: Dict[str, Any]):
+        for entry in read_manifest_sorted(manifest_path_for(job_folder, metadata["timestamp"])):
+            yield entry["path"], -position, entry
+    
+    streams = [stream(position, metadata) for position, metadata in enumerate(chain)]
+    merged = heapq.merge(*streams, key=lambda item: (item[0], item[1]))
+    for _, versions in groupby(merged, key=lambda item: item[0]):
+        # Newest artifact sorts first for equal paths
+        _, negative_position, entry = next(versions)
+        if not entry.get("deleted"):
+            yield entry, -negative_position
+
+
+def backup_at(backups: List[Dict[str, Any]], when: datetime) -> Optional[Dict[str, Any]]:
+    """Get the newest complete backup taken at or before a moment."""
+    moment = when.strftime(TIMESTAMP_FORMAT)
+    candidates = [m for m in backups if m["timestamp"] <= moment and not m.get("cancelled")]
+    return candidates[-1] if candidates else None
+
+
+class RestorePlan:
+    """Files to restore grouped by the artifact that holds them."""
+    
+    def __init__(self, chain: List[Dict[str, Any]]):
+        self.chain = chain
+        # One list of manifest entries per artifact, in chain order
+        self.entries: List[List[Dict[str, Any]]] = [[] for _ in chain]
+    
+    @property
+    def total_files(self) -> int:
+        """Number of files in the plan."""
+        return sum(len(entries) for entries in self.entries)
+    
+    @property
+    def total_size(self) -> int:
+        """Number of bytes in the plan."""
+        return sum(entry["size"] for entries in self.entries for entry in entries)
+    
+    def artifacts(self) -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Iterate over (artifact_metadata, entries) for artifacts with files to read."""
+        for metadata, entries in zip(self.chain, self.entries):
+            if entries:
+                yield metadata, entries
+
+
+def build_restore_plan(job_folder: Path, when: datetime) -> RestorePlan:
+    """
+    Build a plan to restore a job's files as they were at a moment.
+    
+    Raises:
+        ValueError: If no backup exists at or before the moment
+    """
+    backups = list_backups(job_folder)
+    target = backup_at(backups, when)
+    if target is None:
+        raise ValueError(f"No backup found before {when.isoformat()}")
+    
+    chain = backup_chain(backups, target["timestamp"])
+    plan = RestorePlan(chain)
+    for entry, position in resolve_entries(job_folder, chain):
+        plan.entries[position].append(entry)
+    return plan
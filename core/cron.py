@@ -0,0 +1,239 @@
+"""
+Cron expressions for job schedules.
+
+Supports the five standard fields (minute, hour, day of month, month,
+day of week) with lists, ranges, steps and month/day names, "L" for the
+last day of the month, and the @hourly, @daily, @weekly, @monthly and
+@yearly shortcuts. As in cron, a job runs when either the day of month
+or the day of week matches if both are restricted.
+
+The next fire time is found by jumping field by field to the next
+allowed value instead of stepping through every minute, so it costs a
+handful of operations even for rare schedules.
+"""
+import bisect
+import calendar
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+
+MONTH_NAMES = ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+DAY_NAMES = ("sun", "mon", "tue", "wed", "thu", "fri", "sat")
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# Years searched before a schedule is considered impossible (such as 30 February)
+_MAX_YEARS = 8
+
+
+class CronError(ValueError):
+    """Raised for an invalid cron expression."""
+
+
+def _parse_value(text: str, low: int, names: Tuple[str, ...]) -> int:
+    """Parse a number or a name (names map to low, low + 1, ...)."""
+    if text.lower() in names:
+        return names.index(text.lower()) + low
+    if not text.isdigit():
+        raise CronError(f"Invalid cron value: {text}")
+    return int(text)
+
+
+def _parse_field(text: str, low: int, high: int, names: Tuple[str, ...] = ()) -> List[int]:
+    """Parse a cron field into the sorted list of allowed values."""
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise CronError(f"Invalid cron step: {step_text}")
+            step = int(step_text)
+        
+        if part in ("*", "?"):
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = _parse_value(start_text, low, names), _parse_value(end_text, low, names)
+        else:
+            start = _parse_value(part, low, names)
+            end = high if step > 1 else start
+        
+        if not (low <= start <= high and low <= end <= high) or start > end:
+            raise CronError(f"Cron value out of range {low}-{high}: {part}")
+        values.update(range(start, end + 1, step))
+    return sorted(values)
+
+
+class CronExpression:
+    """A parsed cron expression."""
+    
+    def __init__(self, expression: str):
+        """
+        Raises:
+            CronError: If the expression is invalid
+        """
+        self.expression = expression
+        fields = MACROS.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise CronError(f"Cron expression needs 5 fields: {expression}")
+        minute, hour, day, month, weekday = fields
+        
+        self.minutes = _parse_field(minute, 0, 59)
+        self.hours = _parse_field(hour, 0, 23)
+        self.months = _parse_field(month, 1, 12, MONTH_NAMES)
+        # 7 is Sunday as well as 0
+        self.weekdays = sorted({value % 7 for value in _parse_field(weekday, 0, 7, DAY_NAMES)})
+        
+        day_parts = day.split(",")
+        self.last_day = "L" in (part.upper() for part in day_parts)
+        day_parts = [part for part in day_parts if part.upper() != "L"]
+        self.days = _parse_field(",".join(day_parts), 1, 31) if day_parts else []
+        
+        day_restricted = day not in ("*", "?")
+        weekday_restricted = weekday not in ("*", "?")
+        # Which of the day fields decide; with both restricted either may match
+        self._use_days = day_restricted or not weekday_restricted
+        self._use_weekdays = weekday_restricted
+        if not self._use_weekdays and not self.last_day and not self.days:
+            raise CronError(f"Cron expression matches no day: {expression}")
+    
+    def _day_matches(self, year: int, month: int, day: int) -> bool:
+        """Check whether a date matches the day of month or day of week fields."""
+        if self._use_days:
+            if day in self.days:
+                return True
+            if self.last_day and day == calendar.monthrange(year, month)[1]:
+                return True
+        if self._use_weekdays:
+            # datetime weekday() has Monday = 0, cron has Sunday = 0
+            return (calendar.weekday(year, month, day) + 1) % 7 in self.weekdays
+        return False
+    
+    def next_after(self, after: datetime) -> Optional[datetime]:
+        """
+        Get the first matching wall-clock time after a time.
+        
+        Works on the time as given (naive or aware, without converting it);
+        see next_fire_cron() for time zones.
+        
+        Returns:
+            Next matching time, or None if nothing matches within _MAX_YEARS
+        """
+        current = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        year, month, day = current.year, current.month, current.day
+        hour, minute = current.hour, current.minute
+        
+        while year <= after.year + _MAX_YEARS:
+            # Month
+            if month not in self.months:
+                index = bisect.bisect_left(self.months, month)
+                if index == len(self.months):
+                    year, month = year + 1, self.months[0]
+                else:
+                    month = self.months[index]
+                day, hour, minute = 1, 0, 0
+                continue
+            
+            # Day
+            days_in_month = calendar.monthrange(year, month)[1]
+            while day <= days_in_month and not self._day_matches(year, month, day):
+                day, hour, minute = day + 1, 0, 0
+            if day > days_in_month:
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+                day, hour, minute = 1, 0, 0
+                continue
+            
+            # Hour
+            index = bisect.bisect_left(self.hours, hour)
+            if index == len(self.hours):
+                day, hour, minute = day + 1, 0, 0
+                if day > days_in_month:
+                    year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+                    day = 1
+                continue
+            if self.hours[index] != hour:
+                hour, minute = self.hours[index], 0
+            
+            # Minute
+            index = bisect.bisect_left(self.minutes, minute)
+            if index == len(self.minutes):
+                hour, minute = hour + 1, 0
+                if hour > 23:
+                    day, hour = day + 1, 0
+                    if day > days_in_month:
+                        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+                        day = 1
+                continue
+            return after.replace(
+                year=year, month=month, day=day, hour=hour, minute=self.minutes[index],
+                second=0, microsecond=0
+            )
+        return None
+
+
+@lru_cache(maxsize=1024)
+def parse(expression: str) -> CronExpression:
+    """Parse a cron expression, reusing earlier results."""
+    return CronExpression(expression)
+
+
+@lru_cache(maxsize=64)
+def _zone(name: str):
+    """Get a time zone by IANA name."""
+    try:
+        from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+    except ImportError as e:
+        raise CronError("Time zones need Python 3.9 or newer") from e
+    
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        raise CronError(f"Unknown time zone: {name}") from e
+
+
+def next_fire_cron(expression: str, after: datetime, timezone: str = None) -> Optional[datetime]:
+    """
+    Get the next fire time of a cron expression.
+    
+    Without a time zone the expression is matched against local
+    wall-clock time. With one, it is matched against wall-clock time in
+    that zone: a time skipped by a DST change fires right after the jump,
+    and a time repeated by a DST change fires only once.
+    
+    Args:
+        expression: Cron expression
+        after: Naive local reference time
+        timezone: IANA time zone name, such as "Europe/Zagreb"
+    
+    Returns:
+        Naive local fire time, or None if the expression never matches
+    
+    Raises:
+        CronError: If the expression or time zone is invalid
+    """
+    cron = parse(expression)
+    if not timezone:
+        return cron.next_after(after)
+    
+    zone = _zone(timezone)
+    after_zoned = after.astimezone(zone)
+    wall = after_zoned.replace(tzinfo=None)
+    while True:
+        wall = cron.next_after(wall)
+        if wall is None:
+            return None
+        # fold=0 takes the first of repeated times; a skipped time
+        # resolves to the corresponding time after the jump
+        fire_at = wall.replace(tzinfo=zone, fold=0)
+        if fire_at > after_zoned:
+            return fire_at.astimezone().replace(tzinfo=None)
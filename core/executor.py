@@ -0,0 +1,502 @@
+"""
+Concurrent execution of backup jobs.
+
+Each run gets its own BackupEngine, so concurrent runs never share
+progress. Runs are limited overall (max_concurrent_jobs) and per device
+(per_device_concurrency): a job holds a slot on every device its
+sources and destination live on, keyed by st_dev. A job starts only
+when all of its slots are free, so jobs on different disks run in
+parallel while jobs on the same disk queue.
+
+Queued runs start in order of priority. Among runs of the same priority,
+jobs that have used the least run time go first (fair share), and every
+AGING_SECONDS of waiting raise a run's priority by one level, so low
+priority jobs are delayed but never starved. With preemption enabled, a
+run that cannot start pauses lower priority runs at their next file
+boundary and takes their slots; they continue once slots free up again.
+
+Jobs with verify_after set verify each new backup before they count as
+completed, and completion listeners are called after every successful
+run, which the scheduler uses to start dependent jobs.
+"""
+import os
+import time
+import itertools
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence
+from core.job_manager import JobManager, BackupJob
+from core.job_schema import PRIORITIES
+from core.backup_engine import BackupEngine
+from core.retention import prune_in_background
+from utils.logger import get_logger
+
+
+def device_key(path: str) -> Any:
+    """
+    Get the device a path lives on.
+    
+    A path that does not exist yet (such as a new destination) belongs to
+    the device of its nearest existing parent. Unreachable paths are keyed
+    by the path itself.
+    """
+    current = Path(path)
+    for candidate in (current, *current.parents):
+        try:
+            return os.stat(candidate).st_dev
+        except OSError:
+            continue
+    return str(path)
+
+
+def job_devices(job: BackupJob) -> FrozenSet[Any]:
+    """Get the devices of a job's source paths and destination."""
+    return frozenset(device_key(path) for path in [*job.source_paths, job.destination_path])
+
+
+# Seconds of waiting that raise a queued run's priority by one level
+AGING_SECONDS = 600
+
+
+class _Run:
+    """A submitted job run, its callbacks and its scheduling state."""
+    
+    __slots__ = (
+        "job", "devices", "level", "seq", "queued_at", "queue_wait", "started_at", "started_on", "engine",
+        "progress_callback", "on_start", "on_complete", "on_error", "user_paused", "preempted",
+    )
+    
+    def __init__(self, job, devices, seq, progress_callback, on_start, on_complete, on_error):
+        self.job = job
+        self.devices = devices
+        self.level = PRIORITIES.index(job.priority)
+        self.seq = seq
+        self.queued_at = time.monotonic()
+        self.queue_wait: Optional[float] = None
+        self.started_at: Optional[float] = None
+        # Wall-clock start time, for comparing with job timestamps
+        self.started_on: Optional[datetime] = None
+        self.engine: Optional[BackupEngine] = None
+        self.progress_callback = progress_callback
+        self.on_start = on_start
+        self.on_complete = on_complete
+        self.on_error = on_error
+        self.user_paused = False
+        self.preempted = False
+
+
+class JobExecutor:
+    """Runs backup jobs on a bounded pool of worker threads."""
+    
+    def __init__(
+        self,
+        job_manager: JobManager,
+        max_concurrent_jobs: int = None,
+        per_device_concurrency: int = None,
+        preempt: bool = None
+    ):
+        """
+        Args:
+            job_manager: Job manager used to update job status and record runs
+            max_concurrent_jobs: Runs at the same time (defaults to
+                max_concurrent_jobs from the config)
+            per_device_concurrency: Runs at the same time per device
+                (defaults to per_device_concurrency from the config)
+            preempt: Pause lower priority runs for higher priority ones
+                (defaults to preempt_lower_priority from the config)
+        """
+        from utils.config import get_config
+        
+        config = get_config()
+        if max_concurrent_jobs is None:
+            max_concurrent_jobs = config.get("max_concurrent_jobs", 4)
+        if per_device_concurrency is None:
+            per_device_concurrency = config.get("per_device_concurrency", 1)
+        if preempt is None:
+            preempt = config.get("preempt_lower_priority", False)
+        
+        self.job_manager = job_manager
+        self.max_concurrent_jobs = max(1, max_concurrent_jobs)
+        self.per_device_concurrency = max(1, per_device_concurrency)
+        self.preempt = preempt
+        self.logger = get_logger()
+        
+        # Guards everything below
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        # Every queued, running or preempted run by job ID
+        self._runs: Dict[str, _Run] = {}
+        # Runs waiting for slots, including preempted ones
+        self._queue: List[_Run] = []
+        # Runs holding slots
+        self._running: Dict[str, _Run] = {}
+        self._device_runs: Dict[Any, int] = {}
+        # Seconds of run time used per job ID, for fair share
+        self._usage: Dict[str, float] = {}
+        # Read throughput limit of every run in bytes per second, 0 = unlimited
+        self._throttle = 0.0
+        
+        # Called with (job, result) after every successful run, on its worker thread
+        self.completion_listeners: List[Callable[[BackupJob, dict], None]] = []
+        # Called with the job after every run, whatever its outcome, once
+        # the job is no longer active
+        self.release_listeners: List[Callable[[BackupJob], None]] = []
+    
+    def submit(
+        self,
+        job: BackupJob,
+        progress_callback: Optional[Callable] = None,
+        on_start: Optional[Callable[[BackupJob], None]] = None,
+        on_complete: Optional[Callable[[BackupJob, dict], None]] = None,
+        on_error: Optional[Callable[[BackupJob, Exception], None]] = None
+    ) -> bool:
+        """
+        Queue a job run.
+        
+        Args:
+            job: Job to run
+            progress_callback: Passed to BackupEngine.perform_backup
+            on_start: Called when the run starts
+            on_complete: Called with the backup result
+            on_error: Called with the exception of a failed run
+        
+        Returns:
+            False if the job is already queued or running
+        """
+        return self.submit_many([job], progress_callback, on_start, on_complete, on_error) == 1
+    
+    def submit_many(
+        self,
+        jobs: Iterable[BackupJob],
+        progress_callback: Optional[Callable] = None,
+        on_start: Optional[Callable[[BackupJob], None]] = None,
+        on_complete: Optional[Callable[[BackupJob, dict], None]] = None,
+        on_error: Optional[Callable[[BackupJob, Exception], None]] = None
+    ) -> int:
+        """
+        Queue runs of several jobs at once, so they start by priority
+        rather than in the order given. Arguments are as for submit().
+        
+        Returns:
+            Number of jobs queued; jobs already queued or running are skipped
+        """
+        runs = [(job, job_devices(job)) for job in jobs]
+        queued = 0
+        with self._lock:
+            for job, devices in runs:
+                if job.job_id in self._runs:
+                    self.logger.warning(f"Job already queued or running: {job.name}")
+                    continue
+                run = _Run(job, devices, next(self._seq), progress_callback, on_start, on_complete, on_error)
+                self._runs[job.job_id] = run
+                self._queue.append(run)
+                queued += 1
+            self._dispatch()
+        return queued
+    
+    def _rank(self, run: _Run, now: float) -> tuple:
+        """Get the sort key of a queued run: aged priority, then used run time, then submission order."""
+        aged_level = run.level + int((now - run.queued_at) / AGING_SECONDS)
+        return (-aged_level, self._usage.get(run.job.job_id, 0.0), run.seq)
+    
+    def _fits(self, run: _Run, freed: Sequence[_Run] = ()) -> bool:
+        """Check whether a run's slots are free once the freed runs give up theirs."""
+        if len(self._running) - len(freed) >= self.max_concurrent_jobs:
+            return False
+        for device in run.devices:
+            in_use = self._device_runs.get(device, 0) - sum(device in other.devices for other in freed)
+            if in_use >= self.per_device_concurrency:
+                return False
+        return True
+    
+    def _dispatch(self):
+        """Start queued runs whose slots are free, best ranked first; call with the lock held."""
+        now = time.monotonic()
+        for run in sorted(self._queue, key=lambda run: self._rank(run, now)):
+            if self._fits(run) or (self.preempt and self._preempt_for(run, now)):
+                self._start(run, now)
+    
+    def _take_slots(self, run: _Run):
+        """Count a run against its slots; call with the lock held."""
+        self._running[run.job.job_id] = run
+        for device in run.devices:
+            self._device_runs[device] = self._device_runs.get(device, 0) + 1
+    
+    def _free_slots(self, run: _Run):
+        """Give up a run's slots; call with the lock held."""
+        del self._running[run.job.job_id]
+        for device in run.devices:
+            self._device_runs[device] -= 1
+            if not self._device_runs[device]:
+                del self._device_runs[device]
+    
+    def _start(self, run: _Run, now: float):
+        """Start a queued run, or continue a preempted one; call with the lock held."""
+        self._queue.remove(run)
+        self._take_slots(run)
+        if run.preempted:
+            run.preempted = False
+            self._apply_pause(run)
+            self.logger.info(f"Resuming preempted job: {run.job.name}")
+            return
+        
+        run.queue_wait = now - run.queued_at
+        run.started_at = now
+        run.started_on = datetime.now()
+        run.engine = BackupEngine()
+        run.engine.rate_limiter.set_rate(self._throttle)
+        threading.Thread(target=self._execute, args=(run,), daemon=True).start()
+    
+    def _preempt_for(self, run: _Run, now: float) -> bool:
+        """
+        Pause lower priority runs until a run fits; call with the lock held.
+        
+        Returns:
+            True if the run fits now; if it would not fit even after
+            pausing every lower priority run, nothing is paused
+        """
+        pool_full = len(self._running) >= self.max_concurrent_jobs
+        candidates = sorted(
+            (other for other in self._running.values()
+             if other.level < run.level and (pool_full or other.devices & run.devices)),
+            key=lambda other: (other.level, -other.seq)
+        )
+        victims = []
+        for other in candidates:
+            victims.append(other)
+            if self._fits(run, victims):
+                break
+        else:
+            return False
+        
+        for victim in victims:
+            self.logger.info(f"Preempting job {victim.job.name} for {run.job.name}")
+            self._free_slots(victim)
+            victim.preempted = True
+            victim.queued_at = now
+            self._apply_pause(victim)
+            self._queue.append(victim)
+        return True
+    
+    def _apply_pause(self, run: _Run):
+        """Pause a run's engine while the user paused it or it is preempted."""
+        if run.user_paused or run.preempted:
+            run.engine.pause_backup()
+        else:
+            run.engine.resume_backup()
+    
+    def _release(self, run: _Run):
+        """Forget a finished run, free its slots and start the next runs."""
+        with self._lock:
+            del self._runs[run.job.job_id]
+            if run in self._queue:
+                # Finished (or was cancelled) while preempted
+                self._queue.remove(run)
+            if run.job.job_id in self._running:
+                self._free_slots(run)
+            self._usage[run.job.job_id] = (
+                self._usage.get(run.job.job_id, 0.0) + time.monotonic() - run.started_at
+            )
+            self._dispatch()
+        
+        self._notify_released(run.job)
+    
+    def _notify_released(self, job: BackupJob):
+        """Call the release listeners of a job whose run ended; call without the lock."""
+        for listener in list(self.release_listeners):
+            try:
+                listener(job)
+            except Exception as e:
+                self.logger.error(f"Release listener failed for {job.name}: {e}", exc_info=True)
+    
+    def _drop_queued(self, run: _Run):
+        """Remove a run cancelled before it started; call with the lock held."""
+        self._queue.remove(run)
+        del self._runs[run.job.job_id]
+    
+    def _record_cancelled(self, run: _Run):
+        """
+        Record a run cancelled before it started like one cancelled while
+        running, and notify the release listeners; call without the lock.
+        """
+        job = run.job
+        self.job_manager.update_job(job.job_id, status="cancelled")
+        self.job_manager.record_run(
+            job.job_id, datetime.now(), {"cancelled": True},
+            queue_wait_seconds=time.monotonic() - run.queued_at
+        )
+        self.logger.info(f"Cancelled queued backup job: {job.name}")
+        self._notify_released(job)
+    
+    def _execute(self, run: _Run):
+        """Execute a backup run on a worker thread."""
+        job = run.job
+        started_at = datetime.now()
+        try:
+            self.logger.info(f"Starting backup job: {job.name}")
+            
+            # Update job status
+            self.job_manager.update_job(job.job_id, status="running")
+            
+            # Notify listeners
+            if run.on_start:
+                run.on_start(job)
+            
+            # Perform backup
+            result = run.engine.perform_backup(
+                source_paths=job.source_paths,
+                destination_path=job.destination_path,
+                backup_type=job.backup_type,
+                filters=job.filters,
+                compression=job.compression,
+                progress_callback=run.progress_callback,
+                job_name=job.name,
+                hash_algorithm=job.hash_algorithm,
+                job_id=job.job_id
+            )
+            
+            if job.verify_after != "none" and not result.get("cancelled"):
+                verification = run.engine.verify_backup(
+                    result["destination"], job.verify_after, run.progress_callback,
+                    max_bytes_per_second=self._throttle
+                )
+                result["verification"] = verification
+                if verification["cancelled"]:
+                    result["cancelled"] = True
+                elif not verification["ok"]:
+                    problems = len(verification["mismatches"]) + len(verification["missing"])
+                    raise RuntimeError(
+                        f"Verification failed: {problems} files differ from the manifest"
+                        + "".join(f"; {error}" for error in verification["errors"])
+                    )
+            
+            if result.get("cancelled"):
+                # Keeps the last successful run, prunes nothing and notifies no one
+                self.job_manager.update_job(job.job_id, status="cancelled")
+                self.job_manager.record_run(job.job_id, started_at, result, queue_wait_seconds=run.queue_wait)
+                self.logger.info(f"Cancelled backup job: {job.name}")
+                return
+            
+            # Update job status
+            self.job_manager.update_job(
+                job.job_id,
+                status="completed",
+                last_run=datetime.now().isoformat()
+            )
+            self.job_manager.record_run(job.job_id, started_at, result, queue_wait_seconds=run.queue_wait)
+            
+            self.logger.info(f"Completed backup job: {job.name}")
+            
+            # Apply the retention policy without holding up the next job
+            prune_in_background(Path(result["destination"]).parent, job.retention)
+            
+            # Notify listeners
+            if run.on_complete:
+                run.on_complete(job, result)
+            for listener in list(self.completion_listeners):
+                try:
+                    listener(job, result)
+                except Exception as e:
+                    # The backup itself succeeded
+                    self.logger.error(f"Completion listener failed for {job.name}: {e}", exc_info=True)
+        
+        except Exception as e:
+            self.logger.error(f"Backup job failed: {job.name} - {str(e)}", exc_info=True)
+            
+            # Update job status
+            self.job_manager.update_job(job.job_id, status="failed")
+            self.job_manager.record_run(
+                job.job_id, started_at, error=str(e), queue_wait_seconds=run.queue_wait
+            )
+            
+            # Notify listeners
+            if run.on_error:
+                run.on_error(job, e)
+        finally:
+            self._release(run)
+    
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job.
+        
+        Returns:
+            True if the job was queued or running
+        """
+        with self._lock:
+            run = self._runs.get(job_id)
+            if run is None:
+                return False
+            if run.engine is not None:
+                run.engine.cancel_backup()
+                # A paused engine only notices the cancellation once resumed
+                run.engine.resume_backup()
+                return True
+            # Not started yet
+            self._drop_queued(run)
+        self._record_cancelled(run)
+        return True
+    
+    def pause(self, job_id: str):
+        """Pause a running job."""
+        with self._lock:
+            run = self._runs.get(job_id)
+            if run is not None and not run.user_paused:
+                run.user_paused = True
+                if run.engine is not None:
+                    self._apply_pause(run)
+    
+    def resume(self, job_id: str):
+        """Resume a job paused with pause(); preempted runs stay paused until they get their slots back."""
+        with self._lock:
+            run = self._runs.get(job_id)
+            if run is not None and run.user_paused:
+                run.user_paused = False
+                if run.engine is not None:
+                    self._apply_pause(run)
+    
+    def set_throttle(self, bytes_per_second: float):
+        """Limit the read throughput of every running and future run; 0 removes the limit."""
+        with self._lock:
+            if bytes_per_second == self._throttle:
+                return
+            self._throttle = bytes_per_second
+            for run in self._runs.values():
+                if run.engine is not None:
+                    run.engine.rate_limiter.set_rate(bytes_per_second)
+    
+    def is_active(self, job_id: str) -> bool:
+        """Check whether a job is queued or running."""
+        with self._lock:
+            return job_id in self._runs
+    
+    def started_before(self, job_id: str, moment: datetime) -> bool:
+        """Check whether a job has a run that started before a time and has not finished yet."""
+        with self._lock:
+            run = self._runs.get(job_id)
+            return run is not None and run.started_on is not None and run.started_on < moment
+    
+    def get_running(self) -> List[BackupJob]:
+        """Get the jobs that are running."""
+        with self._lock:
+            return [run.job for run in self._running.values()]
+    
+    def get_queued(self) -> List[BackupJob]:
+        """Get the jobs waiting for slots (including preempted ones), in the order they will start."""
+        with self._lock:
+            now = time.monotonic()
+            return [run.job for run in sorted(self._queue, key=lambda run: self._rank(run, now))]
+    
+    def cancel_all(self):
+        """Drop queued runs and cancel started ones."""
+        dropped = []
+        with self._lock:
+            for run in list(self._runs.values()):
+                if run.engine is None:
+                    self._drop_queued(run)
+                    dropped.append(run)
+                else:
+                    run.engine.cancel_backup()
+                    run.engine.resume_backup()
+        for run in dropped:
+            self._record_cancelled(run)
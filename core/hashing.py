@@ -0,0 +1,219 @@
+"""
+Hashing subsystem for backup checksums.
+
+Provides algorithm selection, memory-mapped hashing of large files and
+parallel hashing of independent files. hashlib releases the GIL while
+digesting large buffers, so a thread pool scales across CPU cores.
+
+Run ``python -m core.hashing`` to benchmark the algorithms on this machine.
+"""
+import os
+import mmap
+import time
+import hashlib
+import tempfile
+from collections import deque
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Tuple
+
+
+SUPPORTED_ALGORITHMS = ("sha256", "blake2b", "blake2s")
+DEFAULT_ALGORITHM = "sha256"
+
+# Files at least this large are hashed through a memory map
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+# Read size for regular files and slice size for memory-mapped files
+CHUNK_SIZE = 1024 * 1024
+MMAP_SLICE_SIZE = 8 * 1024 * 1024
+
+
+def create_hasher(algorithm: str = DEFAULT_ALGORITHM):
+    """
+    Create a new hash object for the given algorithm.
+    
+    Raises:
+        ValueError: If the algorithm is not supported
+    """
+    if algorithm not in SUPPORTED_ALGORITHMS:
+        raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+    return hashlib.new(algorithm)
+
+
+def default_workers() -> int:
+    """Get the default number of hashing threads."""
+    return max(1, min(32, os.cpu_count() or 1))
+
+
+def hash_file(path, algorithm: str = DEFAULT_ALGORITHM, rate_limiter=None) -> str:
+    """
+    Hash a single file.
+    
+    Large files are memory-mapped to avoid copying data through Python
+    buffers; small files are read in chunks.
+    
+    Args:
+        path: File to hash
+        algorithm: Hash algorithm name
+        rate_limiter: Optional RateLimiter throttling the read throughput
+    
+    Returns:
+        Hex digest of the file content
+    """
+    hasher = create_hasher(algorithm)
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            # Every view of the map must be released before it is closed
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                for offset in range(0, size, MMAP_SLICE_SIZE):
+                    with view[offset:offset + MMAP_SLICE_SIZE] as block:
+                        if rate_limiter:
+                            rate_limiter.consume(len(block))
+                        hasher.update(block)
+        else:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                if rate_limiter:
+                    rate_limiter.consume(len(chunk))
+                hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _hash_one(path, algorithm: str, rate_limiter=None) -> Tuple[Any, Optional[str], Optional[str]]:
+    """Hash a file, capturing errors instead of raising."""
+    try:
+        return path, hash_file(path, algorithm, rate_limiter), None
+    except (OSError, ValueError) as e:
+        return path, None, str(e)
+
+
+def hash_files(
+    paths: Iterable,
+    algorithm: str = DEFAULT_ALGORITHM,
+    max_workers: int = None,
+    rate_limiter=None
+) -> Iterator[Tuple[Any, Optional[str], Optional[str]]]:
+    """
+    Hash independent files across a thread pool.
+    
+    Args:
+        paths: Files to hash
+        algorithm: Hash algorithm name
+        max_workers: Number of threads (defaults to CPU count)
+        rate_limiter: Optional RateLimiter shared by all threads
+    
+    Yields:
+        Tuples of (path, hex_digest, error) in input order. Exactly one of
+        hex_digest and error is set.
+    """
+    create_hasher(algorithm)  # Validate before starting workers
+    workers = max_workers or default_workers()
+    
+    if workers == 1:
+        for path in paths:
+            yield _hash_one(path, algorithm, rate_limiter)
+        return
+    
+    yield from parallel_map(lambda path: _hash_one(path, algorithm, rate_limiter), paths, workers)
+
+
+def parallel_map(func: Callable, items: Iterable, max_workers: int = None) -> Iterator:
+    """
+    Apply a function to items across a thread pool, yielding results in order.
+    
+    Only a bounded window of work is queued at a time, so very long item
+    streams are processed without materializing them.
+    """
+    workers = max_workers or default_workers()
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hash") as executor:
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= workers * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def benchmark(
+    size_mb: int = 256,
+    file_count: int = 8,
+    algorithms: Iterable[str] = SUPPORTED_ALGORITHMS,
+    workers: Iterable[int] = None,
+    directory: str = None
+) -> List[Dict[str, Any]]:
+    """
+    Benchmark hashing algorithms and thread counts.
+    
+    Writes ``file_count`` random files totalling ``size_mb`` into a
+    temporary directory (optionally on a specific volume) and hashes them
+    with each algorithm and worker count.
+    
+    Returns:
+        List of result dictionaries with throughput in MB/s
+    """
+    if workers is None:
+        workers = sorted({1, default_workers()})
+    
+    results = []
+    with tempfile.TemporaryDirectory(prefix="hash_bench_", dir=directory) as tmp:
+        file_size = max(1, size_mb * 1024 * 1024 // file_count)
+        paths = []
+        for i in range(file_count):
+            path = Path(tmp) / f"bench_{i}.bin"
+            with open(path, 'wb') as f:
+                remaining = file_size
+                while remaining > 0:
+                    block = min(CHUNK_SIZE, remaining)
+                    f.write(os.urandom(block))
+                    remaining -= block
+            paths.append(path)
+        
+        total_mb = file_size * file_count / (1024 * 1024)
+        for algorithm in algorithms:
+            for worker_count in workers:
+                start = time.perf_counter()
+                for _, _, error in hash_files(paths, algorithm, worker_count):
+                    if error:
+                        raise RuntimeError(error)
+                elapsed = time.perf_counter() - start
+                results.append({
+                    "algorithm": algorithm,
+                    "workers": worker_count,
+                    "size_mb": total_mb,
+                    "seconds": elapsed,
+                    "mb_per_second": total_mb / elapsed if elapsed else 0.0,
+                })
+    
+    return results
+
+
+def _main():
+    """Command line entry point for the benchmark."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Benchmark backup hashing algorithms")
+    parser.add_argument("--size-mb", type=int, default=256, help="Total data size in MB")
+    parser.add_argument("--files", type=int, default=8, help="Number of files")
+    parser.add_argument("--workers", type=int, nargs="+", help="Thread counts to test")
+    parser.add_argument("--dir", help="Directory on the volume to benchmark")
+    args = parser.parse_args()
+    
+    results = benchmark(
+        size_mb=args.size_mb,
+        file_count=args.files,
+        workers=args.workers,
+        directory=args.dir
+    )
+    
+    print(f"{'Algorithm':<10} {'Workers':>7} {'Seconds':>9} {'MB/s':>10}")
+    for result in results:
+        print(
+            f"{result['algorithm']:<10} {result['workers']:>7} "
+            f"{result['seconds']:>9.2f} {result['mb_per_second']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    _main()
@@ -1,15 +1,38 @@
 """
 Job manager for handling backup job configurations.
 """
-import json
-import uuid
+import atexit
+import bisect
+import threading
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
+from core.job_store import JobStore
+from core.job_schema import (
+    FIELDS, LOAD_PLAN, SCHEMA_VERSION, JobValidationError, compact, migrate, normalize_field
+)
+from core.catalog import run_status
+
+
+# Run-state fields whose updates are batched instead of written at once
+DEFERRED_FIELDS = frozenset({"status", "last_run", "next_run"})
+
+# Seconds deferred updates wait for more updates before being written
+FLUSH_DELAY = 2.0
+
+# Marks fields missing from loaded job data
+_MISSING = object()
 
 
 class BackupJob:
-    """Represents a single backup job configuration."""
+    """
+    Represents a single backup job configuration.
+    
+    Fields are slots declared by the job schema, and every value is
+    validated when a job is created or updated.
+    """
+    
+    __slots__ = tuple(FIELDS)
     
     def __init__(
         self,
@@ -24,73 +47,81 @@ class BackupJob:
         filters: Dict[str, Any] = None,
         compression: bool = True,
         encryption: bool = False,
+        hash_algorithm: str = "sha256",
+        retention: Dict[str, Any] = None,
+        priority: str = "normal",  # low, normal, high, critical
+        depends_on: List[str] = None,
+        verify_after: str = "none",  # none, quick, deep
         created_at: str = None,
         modified_at: str = None,
         last_run: str = None,
         next_run: str = None,
         status: str = "scheduled",  # scheduled, running, completed, failed, paused
     ):
-        self.job_id = job_id or str(uuid.uuid4())
-        self.name = name
-        self.description = description
-        self.source_paths = source_paths or []
-        self.destination_path = destination_path
-        self.backup_type = backup_type
-        self.enabled = enabled
-        self.schedule = schedule or {"type": "manual"}
-        self.filters = filters or {
-            "include_extensions": [],
-            "exclude_extensions": [],
-            "min_size_mb": 0,
-            "max_size_mb": 0,
-            "exclude_patterns": []
-        }
-        self.compression = compression
-        self.encryption = encryption
-        self.created_at = created_at or datetime.now().isoformat()
-        self.modified_at = modified_at or datetime.now().isoformat()
-        self.last_run = last_run
-        self.next_run = next_run
-        self.status = status
+        values = locals()
+        for name in FIELDS:
+            setattr(self, name, normalize_field(name, values[name]))
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert job to dictionary."""
-        return {
-            "job_id": self.job_id,
-            "name": self.name,
-            "description": self.description,
-            "source_paths": self.source_paths,
-            "destination_path": self.destination_path,
-            "backup_type": self.backup_type,
-            "enabled": self.enabled,
-            "schedule": self.schedule,
-            "filters": self.filters,
-            "compression": self.compression,
-            "encryption": self.encryption,
-            "created_at": self.created_at,
-            "modified_at": self.modified_at,
-            "last_run": self.last_run,
-            "next_run": self.next_run,
-            "status": self.status,
-        }
+        data = {name: getattr(self, name) for name in FIELDS}
+        data["schema_version"] = SCHEMA_VERSION
+        return data
+    
+    def to_record(self) -> Dict[str, Any]:
+        """Convert job to a dictionary for storage, without default settings."""
+        return compact(self.to_dict())
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'BackupJob':
-        """Create job from dictionary."""
-        return cls(**data)
+        """
+        Create job from dictionary, migrating data of older schema versions.
+        
+        Raises:
+            JobValidationError: If a field is unknown or has an invalid value
+        """
+        data = migrate(data)
+        unknown = data.keys() - FIELDS.keys()
+        if unknown:
+            raise JobValidationError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+        
+        # Skips __init__, which would build defaults that are overwritten
+        job = cls.__new__(cls)
+        for name, default, plain in LOAD_PLAN:
+            value = data.get(name, _MISSING)
+            if value is _MISSING:
+                value = default()
+            elif plain is None or type(value) not in plain:
+                # Normalized as by __init__
+                value = normalize_field(name, value)
+            setattr(job, name, value)
+        return job
     
     def update(self, **kwargs):
-        """Update job properties."""
-        for key, value in kwargs.items():
-            if hasattr(self, key):
-                setattr(self, key, value)
+        """
+        Update job properties.
+        
+        Raises:
+            JobValidationError: If a field is unknown or has an invalid
+                value; the job is left unchanged
+        """
+        values = {key: normalize_field(key, value) for key, value in kwargs.items()}
+        for key, value in values.items():
+            setattr(self, key, value)
         self.modified_at = datetime.now().isoformat()
 
 
 class JobManager:
     """Manages all backup jobs."""
     
-    def __init__(self, jobs_file: str = None):
+    def __init__(self, jobs_file: str = None, store: JobStore = None, flush_delay: float = FLUSH_DELAY):
+        """
+        Args:
+            jobs_file: Legacy jobs.json file imported into the store once
+            store: Job store (defaults to data/jobs.db)
+            flush_delay: Seconds run-state updates are held before being
+                written together (0 = write at once)
+        """
         if jobs_file is None:
             data_dir = Path(__file__).parent.parent / "data"
             data_dir.mkdir(parents=True, exist_ok=True)
@@ -98,41 +129,152 @@ class JobManager:
         else:
             self.jobs_file = Path(jobs_file)
         
+        self.store = store or JobStore()
+        # Guards the in-memory jobs, which the GUI and scheduler threads share
+        self._lock = threading.RLock()
         self.jobs: Dict[str, BackupJob] = {}
+        # Stored jobs that failed validation, with the reason, keyed by job ID
+        self.quarantined: Dict[str, Dict[str, Any]] = {}
+        
+        # Secondary indexes, updated on every mutation. Index buckets are
+        # dicts so they keep the job order.
+        self._order: List[str] = []
+        self._by_status: Dict[str, Dict[str, BackupJob]] = {}
+        self._by_destination: Dict[str, Dict[str, BackupJob]] = {}
+        self._enabled: Dict[str, BackupJob] = {}
+        # IDs of the jobs that depend on each job
+        self._dependents: Dict[str, Dict[str, None]] = {}
+        # Sorted (next_run, job_id) pairs of jobs with a next run
+        self._next_runs: List[Tuple[str, str]] = []
+        
+        # Write-behind buffer of run-state updates, keyed by job ID
+        self.flush_delay = flush_delay
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._flush_timer: Optional[threading.Timer] = None
+        
         self._load_jobs()
+        atexit.register(self.flush)
     
     def _load_jobs(self):
-        """Load jobs from file."""
+        """Load jobs from the store, importing a legacy jobs.json first."""
         if self.jobs_file.exists():
             try:
-                with open(self.jobs_file, "r", encoding="utf-8") as f:
-                    jobs_data = json.load(f)
-                    self.jobs = {
-                        job_id: BackupJob.from_dict(job_data)
-                        for job_id, job_data in jobs_data.items()
-                    }
+                count = self.store.import_json(self.jobs_file)
+                print(f"Migrated {count} jobs from {self.jobs_file}")
             except Exception as e:
-                print(f"Error loading jobs: {e}")
-                self.jobs = {}
-        else:
-            self.jobs = {}
+                print(f"Error migrating jobs: {e}")
+        
+        self.jobs = {}
+        self.quarantined = {}
+        outdated = []
+        try:
+            jobs_data = self.store.load_all()
+        except Exception as e:
+            print(f"Error loading jobs: {e}")
+            jobs_data = []
+        
+        for job_data in jobs_data:
+            try:
+                job = BackupJob.from_dict(job_data)
+            except JobValidationError as e:
+                # A broken job must not prevent the others from loading; it
+                # stays untouched in the store
+                print(f"Quarantined job {job_data.get('job_id')}: {e}")
+                self.quarantined[job_data.get("job_id")] = {"data": job_data, "error": str(e)}
+                continue
+            self.jobs[job.job_id] = job
+            if job_data.get("schema_version", 1) < SCHEMA_VERSION:
+                outdated.append(job.to_record())
+        
+        if outdated:
+            try:
+                self.store.put_many(outdated)
+            except Exception as e:
+                print(f"Error saving migrated jobs: {e}")
+        
+        self._order = list(self.jobs)
+        for job in self.jobs.values():
+            self._index(job)
+    
+    def _index(self, job: BackupJob):
+        """Add a job to the secondary indexes."""
+        self._by_status.setdefault(job.status, {})[job.job_id] = job
+        self._by_destination.setdefault(job.destination_path, {})[job.job_id] = job
+        if job.enabled:
+            self._enabled[job.job_id] = job
+        for upstream_id in job.depends_on:
+            self._dependents.setdefault(upstream_id, {})[job.job_id] = None
+        if job.next_run:
+            bisect.insort(self._next_runs, (job.next_run, job.job_id))
+    
+    def _unindex(self, job: BackupJob):
+        """Remove a job from the secondary indexes; call before changing indexed fields."""
+        for index, key in ((self._by_status, job.status), (self._by_destination, job.destination_path)):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(job.job_id, None)
+                if not bucket:
+                    del index[key]
+        self._enabled.pop(job.job_id, None)
+        for upstream_id in job.depends_on:
+            bucket = self._dependents.get(upstream_id)
+            if bucket is not None:
+                bucket.pop(job.job_id, None)
+                if not bucket:
+                    del self._dependents[upstream_id]
+        if job.next_run:
+            position = bisect.bisect_left(self._next_runs, (job.next_run, job.job_id))
+            if position < len(self._next_runs) and self._next_runs[position] == (job.next_run, job.job_id):
+                del self._next_runs[position]
     
     def save_jobs(self):
-        """Save all jobs to file."""
+        """Save all jobs to the store in one transaction."""
+        with self._lock:
+            jobs_data = [job.to_record() for job in self.jobs.values()]
+            self._pending.clear()
         try:
-            jobs_data = {
-                job_id: job.to_dict()
-                for job_id, job in self.jobs.items()
-            }
-            with open(self.jobs_file, "w", encoding="utf-8") as f:
-                json.dump(jobs_data, f, indent=2, ensure_ascii=False)
+            self.store.put_many(jobs_data)
         except Exception as e:
             print(f"Error saving jobs: {e}")
     
+    def _check_dependencies(self, job_id: str, depends_on: List[str]):
+        """
+        Check that a job's dependencies exist and do not form a cycle.
+        
+        Raises:
+            JobValidationError: If a dependency is unknown or leads back to the job
+        """
+        pending = list(depends_on)
+        seen = set()
+        while pending:
+            upstream_id = pending.pop()
+            if upstream_id == job_id:
+                raise JobValidationError("Job dependencies must not form a cycle")
+            if upstream_id in seen:
+                continue
+            seen.add(upstream_id)
+            upstream = self.jobs.get(upstream_id)
+            if upstream is None:
+                raise JobValidationError(f"Unknown job in dependencies: {upstream_id}")
+            pending.extend(upstream.depends_on)
+    
     def create_job(self, job: BackupJob) -> str:
-        """Create a new job."""
-        self.jobs[job.job_id] = job
-        self.save_jobs()
+        """
+        Create a new job.
+        
+        Raises:
+            JobValidationError: If the job's dependencies are unknown or form a cycle
+        """
+        with self._lock:
+            self._check_dependencies(job.job_id, job.depends_on)
+            existing = self.jobs.get(job.job_id)
+            if existing is not None:
+                self._unindex(existing)
+            else:
+                self._order.append(job.job_id)
+            self.jobs[job.job_id] = job
+            self._index(job)
+            self.store.put(job.to_record())
         return job.job_id
     
     def get_job(self, job_id: str) -> Optional[BackupJob]:
@@ -141,32 +283,173 @@ class JobManager:
     
     def get_all_jobs(self) -> List[BackupJob]:
         """Get all jobs."""
-        return list(self.jobs.values())
+        with self._lock:
+            return list(self.jobs.values())
+    
+    def get_jobs_page(self, offset: int, limit: int) -> List[BackupJob]:
+        """Get up to limit jobs starting at offset, in creation order."""
+        with self._lock:
+            return [self.jobs[job_id] for job_id in self._order[offset:offset + limit]]
+    
+    def count_jobs(self) -> int:
+        """Count all jobs."""
+        return len(self.jobs)
     
     def get_enabled_jobs(self) -> List[BackupJob]:
         """Get all enabled jobs."""
-        return [job for job in self.jobs.values() if job.enabled]
+        with self._lock:
+            return list(self._enabled.values())
+    
+    def count_enabled_jobs(self) -> int:
+        """Count enabled jobs."""
+        return len(self._enabled)
+    
+    def get_jobs_by_destination(self, destination_path: str) -> List[BackupJob]:
+        """Get jobs backing up to a destination."""
+        with self._lock:
+            return list(self._by_destination.get(destination_path, {}).values())
+    
+    def get_dependents(self, job_id: str) -> List[BackupJob]:
+        """Get the jobs that depend directly on a job."""
+        with self._lock:
+            return [self.jobs[dependent_id] for dependent_id in self._dependents.get(job_id, ())]
+    
+    def get_jobs_due(self, until: datetime) -> List[BackupJob]:
+        """Get jobs whose next run is at or before a moment, soonest first."""
+        with self._lock:
+            end = bisect.bisect_right(self._next_runs, (until.isoformat(), "\uffff"))
+            return [self.jobs[job_id] for _, job_id in self._next_runs[:end]]
     
     def update_job(self, job_id: str, **kwargs) -> bool:
-        """Update a job."""
-        job = self.jobs.get(job_id)
-        if job:
-            job.update(**kwargs)
-            self.save_jobs()
-            return True
-        return False
+        """
+        Update a job, writing only the changed fields.
+        
+        Updates that only touch run-state fields (status, last_run,
+        next_run) are applied in memory at once and written to the store
+        with other pending updates after flush_delay seconds. Any other
+        update is written immediately, together with the job's pending
+        run-state fields.
+        
+        Raises:
+            JobValidationError: If a field is unknown or has an invalid
+                value, or the dependencies are unknown or form a cycle
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if not job:
+                return False
+            if "depends_on" in kwargs:
+                self._check_dependencies(job_id, kwargs["depends_on"])
+            self._unindex(job)
+            try:
+                job.update(**kwargs)
+            finally:
+                self._index(job)
+            changed = {key: getattr(job, key) for key in kwargs}
+            changed["modified_at"] = job.modified_at
+            
+            if self.flush_delay > 0 and kwargs.keys() <= DEFERRED_FIELDS:
+                self._pending.setdefault(job_id, {}).update(changed)
+                self._schedule_flush()
+            else:
+                self.store.update(job_id, {**self._pending.pop(job_id, {}), **changed})
+        return True
     
     def delete_job(self, job_id: str) -> bool:
-        """Delete a job."""
-        if job_id in self.jobs:
-            del self.jobs[job_id]
-            self.save_jobs()
-            return True
-        return False
+        """Delete a job, removing it from the dependencies of other jobs."""
+        with self._lock:
+            if job_id not in self.jobs:
+                return False
+            for dependent_id in list(self._dependents.get(job_id, ())):
+                dependent = self.jobs[dependent_id]
+                self.update_job(
+                    dependent_id,
+                    depends_on=[upstream_id for upstream_id in dependent.depends_on if upstream_id != job_id]
+                )
+            self._unindex(self.jobs.pop(job_id))
+            self._order.remove(job_id)
+            self._pending.pop(job_id, None)
+            self.store.delete(job_id)
+        return True
+    
+    def record_run(
+        self,
+        job_id: str,
+        started_at: datetime,
+        result: Dict[str, Any] = None,
+        error: str = None,
+        queue_wait_seconds: float = None
+    ):
+        """
+        Append a run of a job to the run log.
+        
+        Args:
+            job_id: ID of the job
+            started_at: When the run started
+            result: Metadata returned by the backup engine
+            error: Error message of a failed run
+            queue_wait_seconds: Time the run waited in the executor queue
+        """
+        finished_at = datetime.now()
+        result = result or {}
+        run = {
+            "job_id": job_id,
+            "started_at": started_at.isoformat(),
+            "finished_at": finished_at.isoformat(),
+            "outcome": "failed" if error else run_status(result),
+            "backup_type": result.get("backup_type"),
+            "files": result.get("total_files", 0),
+            "bytes_read": result.get("bytes_read", 0),
+            "bytes_written": result.get("bytes_written", 0),
+            "duration_seconds": (finished_at - started_at).total_seconds(),
+            "error_count": len(result.get("errors", [])) + (1 if error else 0),
+            "error": error,
+            "phases": result.get("phases"),
+            "queue_wait_seconds": queue_wait_seconds,
+        }
+        try:
+            self.store.append_run(run)
+        except Exception as e:
+            print(f"Error recording job run: {e}")
+    
+    def get_runs(self, job_id: str = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get the most recent runs of a job (or of all jobs), newest first."""
+        return self.store.get_runs(job_id, limit)
+    
+    def flush(self):
+        """Write all pending run-state updates in one transaction."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            try:
+                self.store.update_many(pending)
+            except Exception as e:
+                print(f"Error saving job state: {e}")
+    
+    def close(self):
+        """Flush pending updates and close the store."""
+        self.flush()
+        self.store.close()
+    
+    def _schedule_flush(self):
+        """Start the flush timer unless one is already running."""
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_delay, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
     
     def get_jobs_by_status(self, status: str) -> List[BackupJob]:
         """Get jobs by status."""
-        return [job for job in self.jobs.values() if job.status == status]
+        with self._lock:
+            return list(self._by_status.get(status, {}).values())
+    
+    def count_jobs_by_status(self, status: str) -> int:
+        """Count jobs with a status."""
+        return len(self._by_status.get(status, ()))
 
 
 # Global job manager instance
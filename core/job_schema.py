@@ -0,0 +1,225 @@
+"""
+Schema of backup job data.
+
+Defines the fields of a job with their types and defaults, validates
+values before they reach a BackupJob, and migrates job data written by
+older versions to the current schema version.
+"""
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Tuple
+from core.hashing import SUPPORTED_ALGORITHMS
+
+
+SCHEMA_VERSION = 4
+
+BACKUP_TYPES = ("full", "incremental", "differential")
+
+# Lowest to highest; higher priority jobs start first when jobs queue
+PRIORITIES = ("low", "normal", "high", "critical")
+
+# Verification of each new backup: none, or a BackupVerifier mode
+VERIFY_MODES = ("none", "quick", "deep")
+
+JOB_STATUSES = ("scheduled", "running", "completed", "failed", "paused", "cancelled", "ok", "warning")
+
+_OPTIONAL_STR = (str, type(None))
+
+
+def _default_filters() -> Dict[str, Any]:
+    return {
+        "include_extensions": [],
+        "exclude_extensions": [],
+        "min_size_mb": 0,
+        "max_size_mb": 0,
+        "exclude_patterns": []
+    }
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+# Field name: (accepted types, default factory), in serialization order
+FIELDS: Dict[str, Tuple[Any, Callable[[], Any]]] = {
+    "job_id": (str, lambda: str(uuid.uuid4())),
+    "name": (str, str),
+    "description": (str, str),
+    "source_paths": (list, list),
+    "destination_path": (str, str),
+    "backup_type": (str, lambda: "full"),
+    "enabled": (bool, lambda: True),
+    "schedule": (dict, lambda: {"type": "manual"}),
+    "filters": (dict, _default_filters),
+    "compression": (bool, lambda: True),
+    "encryption": (bool, lambda: False),
+    "hash_algorithm": (str, lambda: "sha256"),
+    "retention": (dict, dict),
+    "priority": (str, lambda: "normal"),
+    "depends_on": (list, list),
+    "verify_after": (str, lambda: "none"),
+    "created_at": (str, _now),
+    "modified_at": (str, _now),
+    "last_run": (_OPTIONAL_STR, lambda: None),
+    "next_run": (_OPTIONAL_STR, lambda: None),
+    "status": (str, lambda: "scheduled"),
+}
+
+# Fields restricted to a set of values
+CHOICES = {
+    "backup_type": BACKUP_TYPES,
+    "hash_algorithm": SUPPORTED_ALGORITHMS,
+    "status": JOB_STATUSES,
+    "priority": PRIORITIES,
+    "verify_after": VERIFY_MODES,
+}
+
+# Settings left out of stored records while they equal their defaults
+COMPACT_DEFAULTS = {
+    name: FIELDS[name][1]()
+    for name in ("description", "backup_type", "schedule", "filters", "compression",
+                 "encryption", "hash_algorithm", "retention", "priority",
+                 "depends_on", "verify_after")
+}
+
+# Fields whose values need only an exact type check, with the accepted
+# types; containers are left out, since empty ones fall back to defaults
+_PLAIN_TYPES = {
+    name: frozenset(types) if isinstance(types, tuple) else frozenset((types,))
+    for name, (types, _) in FIELDS.items()
+    if name not in CHOICES and types not in (list, dict)
+}
+
+# (name, default factory, plain types or None) per field, for loading jobs
+# with inline type checks; other values go through normalize_field
+LOAD_PLAN = tuple((name, default, _PLAIN_TYPES.get(name)) for name, (_, default) in FIELDS.items())
+
+
+class JobValidationError(ValueError):
+    """Raised when job data does not match the job schema."""
+
+
+def validate_field(name: str, value: Any) -> Any:
+    """
+    Check a field value against the schema.
+    
+    Returns:
+        The value
+    
+    Raises:
+        JobValidationError: If the field is unknown or the value invalid
+    """
+    spec = FIELDS.get(name)
+    if spec is None:
+        raise JobValidationError(f"Unknown job field: {name}")
+    
+    if not isinstance(value, spec[0]):
+        raise JobValidationError(f"Invalid type for job field {name}: {type(value).__name__}")
+    if name in CHOICES and value not in CHOICES[name]:
+        raise JobValidationError(f"Invalid value for job field {name}: {value!r}")
+    if name == "source_paths" and not all(isinstance(path, str) for path in value):
+        raise JobValidationError("Source paths must be strings")
+    if name == "depends_on" and not all(isinstance(job_id, str) for job_id in value):
+        raise JobValidationError("Dependencies must be job IDs")
+    if name == "schedule":
+        _validate_schedule(value)
+    if name == "retention" and not all(
+        isinstance(count, int) and not isinstance(count, bool) and count >= 0 for count in value.values()
+    ):
+        raise JobValidationError("Retention counts must be non-negative integers")
+    return value
+
+
+def normalize_field(name: str, value: Any) -> Any:
+    """
+    Get the value a job stores for a field.
+    
+    None and empty containers fall back to the field's default; other
+    values are validated.
+    
+    Raises:
+        JobValidationError: If the field is unknown or the value invalid
+    """
+    spec = FIELDS.get(name)
+    if spec is None:
+        raise JobValidationError(f"Unknown job field: {name}")
+    if value is None or (not value and isinstance(value, (list, dict))):
+        return spec[1]()
+    return validate_field(name, value)
+
+
+def _validate_schedule(schedule: Dict[str, Any]):
+    """
+    Check the catch-up policy of a schedule, and the expression and time
+    zone of a cron schedule, which must also fire at some point.
+    """
+    from core.cron import CronError, next_fire_cron
+    from core.schedules import CATCH_UP_POLICIES
+    
+    if schedule.get("catch_up", "once") not in CATCH_UP_POLICIES:
+        raise JobValidationError(f"Invalid catch-up policy: {schedule['catch_up']!r}")
+    if schedule.get("type") == "cron":
+        try:
+            fire_at = next_fire_cron(schedule.get("expression") or "", datetime.now(), schedule.get("timezone"))
+        except CronError as e:
+            raise JobValidationError(f"Invalid cron schedule: {e}") from e
+        if fire_at is None:
+            raise JobValidationError(
+                f"Invalid cron schedule: {schedule.get('expression')!r} never fires"
+            )
+
+
+def compact(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Leave out settings that equal their defaults, for storage."""
+    return {
+        name: value for name, value in data.items()
+        if name not in COMPACT_DEFAULTS or value != COMPACT_DEFAULTS[name]
+    }
+
+
+def _migrate_v1(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Version 1 jobs predate checksum algorithm selection and retention policies."""
+    data.setdefault("hash_algorithm", "sha256")
+    data.setdefault("retention", {})
+    return data
+
+
+def _migrate_v2(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Version 2 jobs predate job priorities."""
+    data.setdefault("priority", "normal")
+    return data
+
+
+def _migrate_v3(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Version 3 jobs predate job dependencies and verification after backup."""
+    data.setdefault("depends_on", [])
+    data.setdefault("verify_after", "none")
+    return data
+
+
+# Migration from version n to n + 1 is _MIGRATIONS[n]
+_MIGRATIONS: Dict[int, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    1: _migrate_v1,
+    2: _migrate_v2,
+    3: _migrate_v3,
+}
+
+
+def migrate(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Bring job data up to SCHEMA_VERSION.
+    
+    Data without a schema_version is version 1. The returned dictionary
+    no longer contains schema_version.
+    
+    Raises:
+        JobValidationError: If the data was written by a newer version
+    """
+    data = dict(data)
+    version = data.pop("schema_version", 1)
+    if version > SCHEMA_VERSION:
+        raise JobValidationError(f"Job schema version {version} is newer than supported {SCHEMA_VERSION}")
+    while version < SCHEMA_VERSION:
+        data = _MIGRATIONS[version](data)
+        version += 1
+    return data
@@ -0,0 +1,272 @@
+"""
+Transactional SQLite store for backup jobs.
+
+Each job is one row, so updating a job writes only that row, and every
+write is an atomic commit. Fields that change on every run (status,
+last_run, next_run) are separate columns and updated in place without
+re-serializing the job; the remaining settings are stored as JSON.
+"""
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+
+# Schema migrations, applied in order; PRAGMA user_version holds the count applied
+_MIGRATIONS = [
+    """
+    CREATE TABLE jobs (
+        job_id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        enabled INTEGER NOT NULL DEFAULT 1,
+        status TEXT,
+        last_run TEXT,
+        next_run TEXT,
+        modified_at TEXT,
+        settings TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE job_runs (
+        id INTEGER PRIMARY KEY,
+        job_id TEXT NOT NULL,
+        started_at TEXT NOT NULL,
+        finished_at TEXT,
+        outcome TEXT NOT NULL,
+        backup_type TEXT,
+        files INTEGER DEFAULT 0,
+        bytes_read INTEGER DEFAULT 0,
+        bytes_written INTEGER DEFAULT 0,
+        duration_seconds REAL,
+        error_count INTEGER DEFAULT 0,
+        error TEXT,
+        phases TEXT
+    );
+    CREATE INDEX job_runs_job ON job_runs (job_id, started_at);
+    CREATE INDEX job_runs_started ON job_runs (started_at)
+    """,
+    """
+    ALTER TABLE job_runs ADD COLUMN queue_wait_seconds REAL
+    """,
+]
+
+SCHEMA_VERSION = len(_MIGRATIONS)
+
+# Job fields stored in their own columns
+_COLUMNS = ("job_id", "name", "enabled", "status", "last_run", "next_run", "modified_at")
+
+_RUN_COLUMNS = (
+    "id", "job_id", "started_at", "finished_at", "outcome", "backup_type", "files",
+    "bytes_read", "bytes_written", "duration_seconds", "error_count", "error", "phases",
+    "queue_wait_seconds",
+)
+
+
+class JobStore:
+    """Backup jobs stored in SQLite."""
+    
+    def __init__(self, db_file: str = None):
+        if db_file is None:
+            data_dir = Path(__file__).parent.parent / "data"
+            data_dir.mkdir(parents=True, exist_ok=True)
+            self.db_file = data_dir / "jobs.db"
+        else:
+            self.db_file = Path(db_file)
+        
+        # Shared between the GUI thread and scheduler threads
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+    
+    def _migrate(self):
+        """Bring the schema up to SCHEMA_VERSION."""
+        with self._lock:
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            for number in range(version, SCHEMA_VERSION):
+                with self.conn:
+                    for statement in _MIGRATIONS[number].split(";"):
+                        if statement.strip():
+                            self.conn.execute(statement)
+                    self.conn.execute(f"PRAGMA user_version = {number + 1}")
+    
+    def load_all(self) -> List[Dict[str, Any]]:
+        """Load all jobs as dictionaries, oldest first."""
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {', '.join(_COLUMNS)}, settings FROM jobs ORDER BY rowid"
+            ).fetchall()
+        
+        # One JSON document for all settings is parsed much faster than one per row
+        all_settings = json.loads("[" + ",".join(row[-1] for row in rows) + "]")
+        jobs = []
+        for row, settings in zip(rows, all_settings):
+            settings.update(zip(_COLUMNS, row[:-1]))
+            settings["enabled"] = bool(settings["enabled"])
+            jobs.append(settings)
+        return jobs
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Load a single job as a dictionary."""
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT {', '.join(_COLUMNS)}, settings FROM jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+        return self._job_dict(row) if row else None
+    
+    def put(self, job_data: Dict[str, Any]):
+        """Insert or replace a job."""
+        self.put_many([job_data])
+    
+    def put_many(self, jobs_data: Iterable[Dict[str, Any]]):
+        """Insert or replace several jobs in one transaction."""
+        rows = [self._job_row(job_data) for job_data in jobs_data]
+        placeholders = ", ".join("?" * (len(_COLUMNS) + 1))
+        with self._lock, self.conn:
+            # Upsert keeps the rowid, and with it the job order
+            self.conn.executemany(
+                f"INSERT INTO jobs ({', '.join(_COLUMNS)}, settings) VALUES ({placeholders}) "
+                "ON CONFLICT (job_id) DO UPDATE SET "
+                + ", ".join(f"{column} = excluded.{column}" for column in _COLUMNS[1:] + ("settings",)),
+                rows
+            )
+    
+    def update(self, job_id: str, values: Dict[str, Any]) -> bool:
+        """
+        Update fields of a job.
+        
+        Column fields are updated in place; settings are re-serialized only
+        when one of them changes.
+        
+        Returns:
+            True if the job exists
+        """
+        with self._lock, self.conn:
+            return self._update_row(job_id, values)
+    
+    def update_many(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Update fields of several jobs in one transaction.
+        
+        Args:
+            updates: Changed fields keyed by job ID
+        
+        Returns:
+            Number of jobs that exist
+        """
+        with self._lock, self.conn:
+            return sum(self._update_row(job_id, values) for job_id, values in updates.items())
+    
+    def _update_row(self, job_id: str, values: Dict[str, Any]) -> bool:
+        """Update fields of a job inside the current transaction."""
+        columns = {key: value for key, value in values.items() if key in _COLUMNS and key != "job_id"}
+        settings = {key: value for key, value in values.items() if key not in _COLUMNS}
+        if "enabled" in columns:
+            columns["enabled"] = int(bool(columns["enabled"]))
+        
+        if settings:
+            row = self.conn.execute("SELECT settings FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                return False
+            stored = json.loads(row[0])
+            stored.update(settings)
+            columns["settings"] = json.dumps(stored, ensure_ascii=False, separators=(",", ":"))
+        if not columns:
+            return self.conn.execute("SELECT 1 FROM jobs WHERE job_id = ?", (job_id,)).fetchone() is not None
+        cursor = self.conn.execute(
+            f"UPDATE jobs SET {', '.join(f'{column} = ?' for column in columns)} WHERE job_id = ?",
+            (*columns.values(), job_id)
+        )
+        return cursor.rowcount > 0
+    
+    def delete(self, job_id: str) -> bool:
+        """Delete a job; returns True if it existed."""
+        with self._lock, self.conn:
+            return self.conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,)).rowcount > 0
+    
+    def append_run(self, run: Dict[str, Any]) -> int:
+        """
+        Append a finished run to the run log.
+        
+        Runs are never updated or removed, so the log keeps the history
+        of jobs that have since been deleted as well.
+        
+        Returns:
+            Id of the run
+        """
+        values = {column: run.get(column) for column in _RUN_COLUMNS[1:]}
+        values["phases"] = json.dumps(run.get("phases") or {})
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                f"INSERT INTO job_runs ({', '.join(values)}) VALUES ({', '.join('?' * len(values))})",
+                tuple(values.values())
+            )
+        return cursor.lastrowid
+    
+    def get_runs(self, job_id: str = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Get the most recent runs, newest first.
+        
+        Args:
+            job_id: Only runs of this job
+            limit: Maximum number of runs
+        """
+        query = f"SELECT {', '.join(_RUN_COLUMNS)} FROM job_runs"
+        params: list = []
+        if job_id is not None:
+            query += " WHERE job_id = ?"
+            params.append(job_id)
+        query += " ORDER BY started_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        
+        runs = []
+        for row in rows:
+            run = dict(zip(_RUN_COLUMNS, row))
+            run["phases"] = json.loads(run["phases"]) if run["phases"] else {}
+            runs.append(run)
+        return runs
+    
+    def import_json(self, jobs_file: Path) -> int:
+        """
+        Import jobs from a legacy jobs.json file and rename it to jobs.json.migrated.
+        
+        The import is a single transaction, so a failure leaves both the
+        store and the file unchanged.
+        
+        Returns:
+            Number of imported jobs
+        """
+        jobs_file = Path(jobs_file)
+        with open(jobs_file, "r", encoding="utf-8") as f:
+            jobs_data = json.load(f)
+        
+        self.put_many(
+            {**job_data, "job_id": job_data.get("job_id", job_id)}
+            for job_id, job_data in jobs_data.items()
+        )
+        jobs_file.replace(jobs_file.with_name(jobs_file.name + ".migrated"))
+        return len(jobs_data)
+    
+    def _job_row(self, job_data: Dict[str, Any]) -> tuple:
+        """Split a job dictionary into column values and serialized settings."""
+        settings = {key: value for key, value in job_data.items() if key not in _COLUMNS}
+        values = [job_data.get(column) for column in _COLUMNS]
+        values[_COLUMNS.index("enabled")] = int(bool(job_data.get("enabled", True)))
+        return (*values, json.dumps(settings, ensure_ascii=False, separators=(",", ":")))
+    
+    def _job_dict(self, row: tuple) -> Dict[str, Any]:
+        """Combine a row back into a job dictionary."""
+        job_data = json.loads(row[-1])
+        job_data.update(zip(_COLUMNS, row[:-1]))
+        job_data["enabled"] = bool(job_data["enabled"])
+        return job_data
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,156 @@
+"""
+Host load sampling for load-aware scheduling.
+
+Samples CPU utilization, disk I/O utilization (the busiest disk's share
+of time spent on I/O) and memory use with psutil, and compares them with
+configurable thresholds. The scheduler defers due jobs while the host is
+busy and slows down running backups.
+
+The application's own share is taken out of every sample, so running
+backups do not make the host look busy and throttle themselves. Disk
+time cannot be attributed to a process, so a disk's utilization is
+reduced by the share of its transferred bytes this process accounts for.
+"""
+from typing import Dict, List, Optional, Tuple
+import psutil
+
+
+# Seconds over which CPU and disk utilization are measured
+SAMPLE_WINDOW = 1.0
+
+
+def _disk_counters() -> Dict[str, Tuple[int, int]]:
+    """
+    Get the milliseconds each disk has spent on I/O and the bytes it has transferred.
+    
+    Where busy_time is not reported (Windows), the time spent on reads
+    and writes is used; it counts overlapping requests separately, so
+    utilization computed from it is capped at 100%.
+    """
+    try:
+        counters = psutil.disk_io_counters(perdisk=True) or {}
+    except (RuntimeError, OSError):
+        return {}
+    
+    disks = {}
+    for disk, c in counters.items():
+        if hasattr(c, "busy_time"):
+            busy = c.busy_time
+        elif hasattr(c, "read_time") and hasattr(c, "write_time"):
+            busy = c.read_time + c.write_time
+        else:
+            continue
+        disks[disk] = (busy, c.read_bytes + c.write_bytes)
+    return disks
+
+
+def _own_usage(process: psutil.Process) -> Tuple[float, Optional[int]]:
+    """Get the CPU seconds used and bytes read and written by this process (None if not reported)."""
+    times = process.cpu_times()
+    try:
+        io = process.io_counters()
+        io_bytes = io.read_bytes + io.write_bytes
+    except (AttributeError, psutil.Error):
+        # Not available on macOS
+        io_bytes = None
+    return times.user + times.system, io_bytes
+
+
+class LoadMonitor:
+    """Samples host load and decides whether the host is busy."""
+    
+    def __init__(
+        self,
+        max_cpu_percent: float = None,
+        max_disk_percent: float = None,
+        max_memory_percent: float = None
+    ):
+        """
+        Args:
+            max_cpu_percent: CPU utilization above which the host is busy
+                (defaults to load_max_cpu_percent from the config)
+            max_disk_percent: Utilization of the busiest disk above which
+                the host is busy (defaults to load_max_disk_percent)
+            max_memory_percent: Memory use above which the host is busy
+                (defaults to load_max_memory_percent)
+        
+        A threshold of 0 disables that check.
+        """
+        from utils.config import get_config
+        
+        config = get_config()
+        self.max_cpu_percent = (
+            config.get("load_max_cpu_percent", 85) if max_cpu_percent is None else max_cpu_percent
+        )
+        self.max_disk_percent = (
+            config.get("load_max_disk_percent", 90) if max_disk_percent is None else max_disk_percent
+        )
+        self.max_memory_percent = (
+            config.get("load_max_memory_percent", 90) if max_memory_percent is None else max_memory_percent
+        )
+        self._process = psutil.Process()
+    
+    def sample(self, window: float = SAMPLE_WINDOW) -> Dict[str, Optional[float]]:
+        """
+        Measure host load, without this process, over a short window; blocks for the window.
+        
+        Returns:
+            Dictionary with cpu_percent, disk_percent (None where disk
+            utilization is not reported) and memory_percent
+        """
+        own_before = _own_usage(self._process)
+        disks_before = _disk_counters()
+        cpu_percent = psutil.cpu_percent(interval=window)
+        disks_after = _disk_counters()
+        own_after = _own_usage(self._process)
+        
+        if window > 0:
+            own_cpu = (own_after[0] - own_before[0]) / (window * (psutil.cpu_count() or 1)) * 100
+            cpu_percent = max(0.0, cpu_percent - own_cpu)
+        own_bytes = 0
+        if own_before[1] is not None and own_after[1] is not None:
+            own_bytes = own_after[1] - own_before[1]
+        
+        disk_percent = None
+        for disk, (busy_after, bytes_after) in disks_after.items():
+            if disk not in disks_before or window <= 0:
+                continue
+            busy_before, bytes_before = disks_before[disk]
+            utilization = min(100.0, (busy_after - busy_before) / (window * 1000) * 100)
+            transferred = bytes_after - bytes_before
+            if own_bytes > 0 and transferred > 0:
+                # Our bytes may be spread over several disks, so this
+                # errs towards treating a disk as ours
+                utilization *= max(0.0, 1 - own_bytes / transferred)
+            disk_percent = utilization if disk_percent is None else max(disk_percent, utilization)
+        
+        memory_percent = max(0.0, psutil.virtual_memory().percent - self._process.memory_percent())
+        return {
+            "cpu_percent": cpu_percent,
+            "disk_percent": disk_percent,
+            "memory_percent": memory_percent,
+        }
+    
+    def busy_reasons(self, sample: Dict[str, Optional[float]] = None) -> List[str]:
+        """
+        Get the thresholds a load sample exceeds.
+        
+        Args:
+            sample: Load sample (taken now if not given)
+        
+        Returns:
+            Descriptions such as "CPU 93%"; empty if the host is not busy
+        """
+        if sample is None:
+            sample = self.sample()
+        
+        reasons = []
+        for label, key, limit in (
+            ("CPU", "cpu_percent", self.max_cpu_percent),
+            ("disk", "disk_percent", self.max_disk_percent),
+            ("memory", "memory_percent", self.max_memory_percent),
+        ):
+            value = sample.get(key)
+            if limit and value is not None and value > limit:
+                reasons.append(f"{label} {value:.0f}%")
+        return reasons
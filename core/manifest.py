@@ -0,0 +1,144 @@
+"""
+Per-file backup manifests.
+
+A manifest lists every file stored in a backup together with its relative
+path, size, modification time and content hash. It is written as
+gzip-compressed JSON Lines so it can be produced and consumed one entry at
+a time, no matter how many files a backup holds.
+
+Entries are written sorted by path, so manifests of several backups can
+be merged in one streaming pass. Files removed since the base backup of
+an incremental or differential backup are recorded as tombstones at
+their place in that order.
+"""
+import gzip
+import json
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path_for(job_folder: Path, timestamp: str) -> Path:
+    """Get the manifest path for a backup timestamp inside a job folder."""
+    return Path(job_folder) / f"backup_{timestamp}_manifest.jsonl.gz"
+
+
+class ManifestWriter:
+    """Streams manifest entries to a compressed JSON Lines file."""
+    
+    def __init__(self, path: Path, algorithm: str = "sha256"):
+        self.path = Path(path)
+        self.algorithm = algorithm
+        self.entry_count = 0
+        self._file = None
+        self._last_path = None
+    
+    def open(self):
+        """Open the manifest file and write the header line."""
+        self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        self._write_line({
+            "manifest_version": MANIFEST_VERSION,
+            "algorithm": self.algorithm,
+            "created_at": datetime.now().isoformat(),
+            "sorted": True,
+        })
+    
+    def add(self, path: str, size: int, mtime: float, digest: str, **extra):
+        """
+        Append a file entry.
+        
+        Args:
+            path: Path of the file relative to the backup root (POSIX style)
+            size: Number of bytes stored
+            mtime: Source modification time (seconds since epoch)
+            digest: Hex digest of the file content
+            extra: Additional per-entry fields
+        """
+        entry = {"path": path, "size": size, "mtime": mtime, "hash": digest}
+        entry.update(extra)
+        self._add_entry(entry)
+    
+    def add_deleted(self, path: str):
+        """Append a tombstone for a file deleted since the base backup."""
+        self._add_entry({"path": path, "deleted": True})
+    
+    def _add_entry(self, entry: Dict[str, Any]):
+        """
+        Write an entry.
+        
+        Raises:
+            ValueError: If the path does not sort after the previous entry's
+        """
+        if self._last_path is not None and entry["path"] <= self._last_path:
+            raise ValueError(f"Manifest entry out of order: {entry['path']}")
+        self._last_path = entry["path"]
+        self._write_line(entry)
+        self.entry_count += 1
+    
+    def close(self):
+        """Flush and close the manifest file."""
+        if self._file:
+            self._file.close()
+            self._file = None
+    
+    def _write_line(self, data: Dict[str, Any]):
+        """Write a single compact JSON line."""
+        self._file.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+        self._file.write("\n")
+    
+    def __enter__(self) -> 'ManifestWriter':
+        self.open()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def split_backup_path(backup_path) -> Tuple[Path, str]:
+    """
+    Get the job folder and timestamp of a backup archive or folder.
+    
+    Returns:
+        Tuple of (job_folder, timestamp)
+    """
+    backup_path = Path(backup_path)
+    name = backup_path.stem if backup_path.suffix == ".zip" else backup_path.name
+    return backup_path.parent, name[len("backup_"):] if name.startswith("backup_") else name
+
+
+def read_manifest_header(path: Path) -> Dict[str, Any]:
+    """Read the header line of a manifest."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        line = f.readline()
+    return json.loads(line) if line else {}
+
+
+def read_manifest(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the file entries of a manifest.
+    
+    Entries are yielded one by one without loading the whole manifest.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = f.readline()
+        if not header:
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_manifest_sorted(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over manifest entries in path order.
+    
+    Manifests written before entries were kept sorted are sorted in memory.
+    """
+    if read_manifest_header(path).get("sorted"):
+        yield from read_manifest(path)
+    else:
+        yield from sorted(read_manifest(path), key=lambda entry: entry["path"])
+
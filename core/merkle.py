@@ -0,0 +1,225 @@
+"""
+Directory-level Merkle trees over backup manifests.
+
+Every directory node stores the hashes of its files and subdirectories and
+a hash over those children. Two backups can be compared, or a subtree
+checked, by descending only into directories whose hashes differ.
+"""
+import gzip
+import json
+from pathlib import Path
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+from core.hashing import DEFAULT_ALGORITHM, create_hasher
+from core.manifest import read_manifest, read_manifest_header, manifest_path_for
+
+
+TREE_VERSION = 1
+
+
+def tree_path_for(job_folder: Path, timestamp: str) -> Path:
+    """Get the Merkle tree path for a backup timestamp inside a job folder."""
+    return Path(job_folder) / f"backup_{timestamp}_tree.json.gz"
+
+
+def _split(path: str) -> Tuple[str, str]:
+    """Split a manifest path into (directory, name)."""
+    directory, _, name = path.rpartition("/")
+    return directory, name
+
+
+def _join(directory: str, name: str) -> str:
+    """Join a directory and a child name into a manifest path."""
+    return f"{directory}/{name}" if directory else name
+
+
+class MerkleTree:
+    """Merkle tree of a single backup, keyed by directory path."""
+    
+    def __init__(self, algorithm: str = DEFAULT_ALGORITHM, nodes: Dict[str, Dict[str, Any]] = None):
+        self.algorithm = algorithm
+        # Directory path ("" is the root) -> {"hash", "dirs", "files"}
+        self.nodes = nodes or {"": {"hash": None, "dirs": {}, "files": {}}}
+    
+    @property
+    def root_hash(self) -> str:
+        """Get the hash of the whole backup."""
+        return self.nodes[""]["hash"]
+    
+    @classmethod
+    def from_entries(cls, entries, algorithm: str = DEFAULT_ALGORITHM) -> 'MerkleTree':
+        """Build a tree from manifest entries."""
+        tree = cls(algorithm)
+        for entry in entries:
+            if entry.get("deleted"):
+                continue
+            directory, name = _split(entry["path"])
+            tree._ensure_dir(directory)["files"][name] = entry["hash"]
+        tree._compute_hashes()
+        return tree
+    
+    @classmethod
+    def from_manifest(cls, manifest_file: Path) -> 'MerkleTree':
+        """Build a tree from a manifest file."""
+        header = read_manifest_header(manifest_file)
+        algorithm = header.get("algorithm", DEFAULT_ALGORITHM)
+        return cls.from_entries(read_manifest(manifest_file), algorithm)
+    
+    @classmethod
+    def load(cls, path: Path) -> 'MerkleTree':
+        """Load a tree saved with save()."""
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("algorithm", DEFAULT_ALGORITHM), data["nodes"])
+    
+    def save(self, path: Path):
+        """Save the tree as compressed JSON."""
+        data = {
+            "tree_version": TREE_VERSION,
+            "algorithm": self.algorithm,
+            "root": self.root_hash,
+            "nodes": self.nodes,
+        }
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    
+    def _ensure_dir(self, directory: str) -> Dict[str, Any]:
+        """Get or create a directory node and link it to its parents."""
+        node = self.nodes.get(directory)
+        if node is not None:
+            return node
+        node = {"hash": None, "dirs": {}, "files": {}}
+        self.nodes[directory] = node
+        parent, name = _split(directory)
+        self._ensure_dir(parent)["dirs"][name] = None
+        return node
+    
+    def _compute_hashes(self):
+        """Compute directory hashes bottom-up."""
+        for directory in sorted(self.nodes, key=lambda d: d.count("/") + bool(d), reverse=True):
+            node = self.nodes[directory]
+            hasher = create_hasher(self.algorithm)
+            for name in sorted(node["files"]):
+                hasher.update(f"F\0{name}\0{node['files'][name]}\n".encode("utf-8"))
+            for name in sorted(node["dirs"]):
+                child_hash = self.nodes[_join(directory, name)]["hash"]
+                node["dirs"][name] = child_hash
+                hasher.update(f"D\0{name}\0{child_hash}\n".encode("utf-8"))
+            node["hash"] = hasher.hexdigest()
+    
+    def subtree_hash(self, path: str = "") -> Optional[str]:
+        """Get the hash of a directory, or None if it is not in the backup."""
+        node = self.nodes.get(path.strip("/"))
+        return node["hash"] if node else None
+    
+    def iter_files(self, path: str = "") -> Iterator[Tuple[str, str]]:
+        """Iterate over (file_path, hash) pairs below a directory."""
+        path = path.strip("/")
+        node = self.nodes.get(path)
+        if node is None:
+            return
+        for name, digest in node["files"].items():
+            yield _join(path, name), digest
+        for name in node["dirs"]:
+            yield from self.iter_files(_join(path, name))
+    
+    def diff(self, other: 'MerkleTree', path: str = "") -> Dict[str, List[str]]:
+        """
+        Compare this tree (old) with another (new).
+        
+        Only directories whose hashes differ are visited.
+        
+        Returns:
+            Dictionary with "added", "removed" and "changed" file paths
+        """
+        if self.algorithm != other.algorithm:
+            raise ValueError(
+                f"Cannot compare trees hashed with {self.algorithm} and {other.algorithm}"
+            )
+        
+        result = {"added": [], "removed": [], "changed": []}
+        self._diff_node(other, path.strip("/"), result)
+        for paths in result.values():
+            paths.sort()
+        return result
+    
+    def _diff_node(self, other: 'MerkleTree', path: str, result: Dict[str, List[str]]):
+        """Recursively compare a directory present in either tree."""
+        old = self.nodes.get(path)
+        new = other.nodes.get(path)
+        
+        if old is None and new is None:
+            return
+        if old is None:
+            result["added"].extend(p for p, _ in other.iter_files(path))
+            return
+        if new is None:
+            result["removed"].extend(p for p, _ in self.iter_files(path))
+            return
+        if old["hash"] == new["hash"]:
+            return
+        
+        old_files, new_files = old["files"], new["files"]
+        for name, digest in new_files.items():
+            if name not in old_files:
+                result["added"].append(_join(path, name))
+            elif old_files[name] != digest:
+                result["changed"].append(_join(path, name))
+        for name in old_files:
+            if name not in new_files:
+                result["removed"].append(_join(path, name))
+        
+        for name in set(old["dirs"]) | set(new["dirs"]):
+            if old["dirs"].get(name) != new["dirs"].get(name):
+                self._diff_node(other, _join(path, name), result)
+    
+    def verify_subtree(self, path: str, compute_hash: Callable[[str], str]) -> List[str]:
+        """
+        Re-hash the files below a directory and compare with the tree.
+        
+        Args:
+            path: Directory to verify ("" for the whole backup)
+            compute_hash: Callable returning the current hash of a file path
+        
+        Returns:
+            List of file paths whose content no longer matches
+        """
+        mismatches = []
+        for file_path, digest in self.iter_files(path):
+            try:
+                if compute_hash(file_path) != digest:
+                    mismatches.append(file_path)
+            except (OSError, KeyError):
+                mismatches.append(file_path)
+        return mismatches
+
+
+def load_backup_tree(job_folder: Path, timestamp: str) -> Optional[MerkleTree]:
+    """
+    Load the Merkle tree of a backup.
+    
+    Falls back to building it from the manifest for backups created
+    before trees were stored.
+    """
+    tree_file = tree_path_for(job_folder, timestamp)
+    if tree_file.exists():
+        return MerkleTree.load(tree_file)
+    
+    manifest_file = manifest_path_for(job_folder, timestamp)
+    if manifest_file.exists():
+        return MerkleTree.from_manifest(manifest_file)
+    
+    return None
+
+
+def compare_backups(job_folder: Path, old_timestamp: str, new_timestamp: str, path: str = "") -> Dict[str, List[str]]:
+    """
+    Compare two backups of the same job.
+    
+    Returns:
+        Dictionary with "added", "removed" and "changed" file paths
+    """
+    old_tree = load_backup_tree(job_folder, old_timestamp)
+    new_tree = load_backup_tree(job_folder, new_timestamp)
+    if old_tree is None or new_tree is None:
+        raise FileNotFoundError("Backup manifest not found")
+    return old_tree.diff(new_tree, path)
@@ -0,0 +1,511 @@
+"""
+Restore engine for extracting backups back to disk.
+"""
+import os
+import time
+import shutil
+import fnmatch
+import zipfile
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Optional, List, Dict, Any, Tuple
+from core.backup_engine import BackupProgress, CHUNK_SIZE
+from core.hashing import hash_file, parallel_map, default_workers
+from core.manifest import manifest_path_for, read_manifest, split_backup_path
+from core.backup_index import BackupIndex, IndexedMember, IndexedMemberReader, index_path_for
+from core.chain import build_restore_plan
+from core.merkle import load_backup_tree
+
+
+# Minimum interval between byte-level progress callbacks
+PROGRESS_INTERVAL = 0.2
+
+
+def _matches(path: str, patterns: List[str]) -> bool:
+    """Check a member path against restore patterns."""
+    for pattern in patterns:
+        pattern = pattern.replace("\\", "/").lstrip("/")
+        if pattern.endswith("/"):
+            pattern += "*"
+        if path == pattern or fnmatch.fnmatchcase(path, pattern):
+            return True
+    return False
+
+
+class RestoreEngine:
+    """Restores ZIP and folder backups with parallel workers."""
+    
+    def __init__(self):
+        self.progress = BackupProgress()
+        self._lock = threading.Lock()
+        self._last_callback = 0.0
+        # Paths that failed to restore, left out of verification
+        self._failed_files = set()
+    
+    def restore(
+        self,
+        backup_path: str,
+        target_path: str,
+        progress_callback: Optional[Callable[[BackupProgress], None]] = None,
+        max_workers: int = None,
+        overwrite: bool = True,
+        verify: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Restore a backup to a target directory.
+        
+        Args:
+            backup_path: Path to the backup ZIP file or folder
+            target_path: Directory to restore into
+            progress_callback: Optional callback for progress updates
+            max_workers: Number of parallel restore workers
+            overwrite: Whether existing files in the target are replaced
+            verify: Re-hash the restored files and compare them with the
+                backup's Merkle tree. Only the files stored in the backup
+                itself are checked, since the tree of an incremental or
+                differential backup describes its whole chain.
+        
+        Returns:
+            Dictionary with restore results
+        """
+        backup = Path(backup_path)
+        if not backup.exists():
+            raise FileNotFoundError(f"Backup not found: {backup_path}")
+        
+        target = Path(target_path)
+        target.mkdir(parents=True, exist_ok=True)
+        
+        self._start()
+        
+        if backup.is_file():
+            tasks = self._zip_tasks(backup)
+        else:
+            tasks = self._folder_tasks(backup)
+        
+        self._add_totals(tasks)
+        self._run(backup, target, tasks, progress_callback, max_workers, overwrite)
+        if verify and not self.progress.is_cancelled:
+            self._verify_restored(*split_backup_path(backup), target, artifact_only=True)
+        return self._result(backup, target)
+    
+    def restore_selected(
+        self,
+        backup_path: str,
+        patterns: List[str],
+        target_path: str,
+        progress_callback: Optional[Callable[[BackupProgress], None]] = None,
+        max_workers: int = None,
+        overwrite: bool = True,
+        verify: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Restore only the members matching paths or glob patterns.
+        
+        Uses the member index written at backup time, so locating a file
+        does not depend on the size of the backup. Backups created without
+        an index fall back to scanning the archive listing.
+        
+        Args:
+            backup_path: Path to the backup ZIP file or folder
+            patterns: Relative paths, glob patterns, or directories ending in "/"
+            target_path: Directory to restore into
+            progress_callback: Optional callback for progress updates
+            max_workers: Number of parallel restore workers
+            overwrite: Whether existing files in the target are replaced
+            verify: Compare the restored files with the backup's Merkle
+                tree, as for restore()
+        
+        Returns:
+            Dictionary with restore results
+        """
+        backup = Path(backup_path)
+        if not backup.exists():
+            raise FileNotFoundError(f"Backup not found: {backup_path}")
+        
+        target = Path(target_path)
+        target.mkdir(parents=True, exist_ok=True)
+        
+        self._start()
+        
+        job_folder, timestamp = split_backup_path(backup)
+        index_file = index_path_for(job_folder, timestamp)
+        
+        if index_file.exists():
+            with BackupIndex(index_file) as index:
+                members = index.match(patterns)
+            if backup.is_file():
+                tasks = [(m.path, m, m.size, m.mtime) for m in members]
+            else:
+                tasks = [(m.path, backup / m.path, m.size, m.mtime) for m in members]
+        else:
+            all_tasks = self._zip_tasks(backup) if backup.is_file() else self._folder_tasks(backup)
+            tasks = [task for task in all_tasks if _matches(task[0], patterns)]
+        
+        self._add_totals(tasks)
+        self._run(backup, target, tasks, progress_callback, max_workers, overwrite)
+        if verify and not self.progress.is_cancelled:
+            self._verify_restored(job_folder, timestamp, target, patterns, artifact_only=True)
+        return self._result(backup, target)
+    
+    def restore_point_in_time(
+        self,
+        job_folder: str,
+        when: datetime,
+        target_path: str,
+        progress_callback: Optional[Callable[[BackupProgress], None]] = None,
+        max_workers: int = None,
+        overwrite: bool = True,
+        verify: bool = False,
+        patterns: List[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Restore the files of a job as they were at a given moment.
+        
+        The newest backup taken at or before the moment and its chain of
+        base backups are resolved into a plan naming, for every file, the
+        artifact holding its newest version. Each artifact is then read
+        once, in archive order.
+        
+        Args:
+            job_folder: Folder holding the job's backups
+            when: Moment to restore
+            target_path: Directory to restore into
+            progress_callback: Optional callback for progress updates
+            max_workers: Number of parallel restore workers
+            overwrite: Whether existing files in the target are replaced
+            verify: Re-hash the restored files and compare them with the
+                Merkle tree of the restored backup, which describes the
+                complete state of its chain
+            patterns: Only restore files matching these paths or glob
+                patterns, as for restore_selected()
+        
+        Returns:
+            Dictionary with restore results
+        """
+        job_folder = Path(job_folder)
+        plan = build_restore_plan(job_folder, when)
+        
+        target = Path(target_path)
+        target.mkdir(parents=True, exist_ok=True)
+        
+        self._start()
+        
+        artifacts = []
+        for metadata, entries in plan.artifacts():
+            if patterns:
+                entries = [entry for entry in entries if _matches(entry["path"], patterns)]
+                if not entries:
+                    continue
+            # Backups may have been moved together with their job folder
+            backup = job_folder / Path(metadata["destination"]).name
+            if not backup.exists():
+                self.progress.errors.append(f"Backup not found: {backup}")
+                self._failed_files.update(entry["path"] for entry in entries)
+                continue
+            artifacts.append((backup, self._plan_tasks(backup, metadata["timestamp"], entries)))
+        
+        for _, tasks in artifacts:
+            self._add_totals(tasks)
+        for backup, tasks in artifacts:
+            if self.progress.is_cancelled:
+                break
+            self._run(backup, target, tasks, progress_callback, max_workers, overwrite)
+        if verify and not self.progress.is_cancelled:
+            self._verify_restored(job_folder, plan.chain[-1]["timestamp"], target, patterns)
+        
+        result = self._result(plan.chain[-1]["destination"], target)
+        result["backup_chain"] = [metadata["timestamp"] for metadata in plan.chain]
+        return result
+    
+    def _plan_tasks(
+        self,
+        backup: Path,
+        timestamp: str,
+        entries: List[Dict[str, Any]]
+    ) -> List[Tuple[str, Any, int, Optional[float]]]:
+        """List restore tasks for the planned entries of one artifact, in archive order."""
+        if not backup.is_file():
+            return [(e["path"], backup / e["path"], e["size"], e.get("mtime")) for e in entries]
+        
+        index_file = index_path_for(backup.parent, timestamp)
+        if index_file.exists():
+            with BackupIndex(index_file) as index:
+                members = [index.lookup(e["path"]) for e in entries]
+            missing = [e["path"] for e, m in zip(entries, members) if m is None]
+            members = sorted((m for m in members if m), key=lambda m: m.header_offset)
+            tasks = [(m.path, m, m.size, m.mtime) for m in members]
+        else:
+            wanted = {e["path"] for e in entries}
+            tasks = [task for task in self._zip_tasks(backup) if task[0] in wanted]
+            tasks.sort(key=lambda task: task[1].header_offset)
+            found = {task[0] for task in tasks}
+            missing = [path for path in wanted if path not in found]
+        
+        for path in missing:
+            self._failed_files.add(path)
+            self.progress.errors.append(f"Error restoring {path}: not found in {backup.name}")
+        return tasks
+    
+    def _start(self):
+        """Start tracking a new restore."""
+        self.progress = BackupProgress()
+        self.progress.start_time = datetime.now()
+        self._failed_files = set()
+    
+    def _verify_restored(
+        self,
+        job_folder: Path,
+        timestamp: str,
+        target: Path,
+        patterns: List[str] = None,
+        artifact_only: bool = False
+    ):
+        """
+        Re-hash restored files and compare them with the backup's Merkle tree.
+        
+        Only files matching the patterns, if given, are checked. Files
+        that failed to restore, or were kept because they already existed,
+        are already reported and are not hashed.
+        
+        The tree of an incremental or differential backup describes its
+        whole chain. When only the backup's own artifact was restored,
+        artifact_only limits the check to the files its manifest stores.
+        """
+        tree = load_backup_tree(job_folder, timestamp)
+        manifest_file = manifest_path_for(job_folder, timestamp)
+        if tree is None or (artifact_only and not manifest_file.exists()):
+            self.progress.errors.append("Restored files not verified: backup manifest not found")
+            return
+        
+        unchecked = self._failed_files | set(self.progress.skipped_files)
+        stored = None
+        if artifact_only:
+            stored = {entry["path"] for entry in read_manifest(manifest_file) if not entry.get("deleted")}
+        
+        def wanted(path: str) -> bool:
+            return (
+                path not in unchecked
+                and (stored is None or path in stored)
+                and (not patterns or _matches(path, patterns))
+            )
+        
+        def restored_hash(path: str) -> str:
+            if not wanted(path):
+                raise KeyError(path)
+            return hash_file(target / path, tree.algorithm)
+        
+        for path in tree.verify_subtree("", restored_hash):
+            if wanted(path):
+                self.progress.errors.append(f"Restored file does not match backup: {path}")
+    
+    def _result(self, backup: Path, target: Path) -> Dict[str, Any]:
+        """Build the result dictionary of a finished restore."""
+        self.progress.end_time = datetime.now()
+        return {
+            "backup_path": str(backup),
+            "target_path": str(target),
+            "restored_files": self.progress.processed_files,
+            "restored_size": self.progress.processed_size,
+            "errors": self.progress.errors,
+            "skipped_files": self.progress.skipped_files,
+            "cancelled": self.progress.is_cancelled,
+            "duration_seconds": (self.progress.end_time - self.progress.start_time).total_seconds(),
+        }
+    
+    def _zip_tasks(self, archive: Path) -> List[Tuple[str, Any, int, Optional[float]]]:
+        """List (relative_path, member_info, size, mtime) for a ZIP archive."""
+        # Original modification times are kept in the manifest
+        job_folder, timestamp = split_backup_path(archive)
+        manifest_file = manifest_path_for(job_folder, timestamp)
+        mtimes = {}
+        if manifest_file.exists():
+            mtimes = {
+                entry["path"]: entry["mtime"]
+                for entry in read_manifest(manifest_file)
+                if not entry.get("deleted")
+            }
+        
+        with zipfile.ZipFile(archive) as zipf:
+            return [
+                (info.filename, info, info.file_size, mtimes.get(info.filename))
+                for info in zipf.infolist()
+                if not info.is_dir()
+            ]
+    
+    def _folder_tasks(self, folder: Path) -> List[Tuple[str, Any, int, Optional[float]]]:
+        """List (relative_path, source_file, size, mtime) for a folder backup."""
+        tasks = []
+        for root, dirs, files in os.walk(folder):
+            for file in files:
+                file_path = Path(root) / file
+                try:
+                    size = file_path.stat().st_size
+                except OSError as e:
+                    self.progress.errors.append(f"Error reading {file_path}: {str(e)}")
+                    continue
+                tasks.append((file_path.relative_to(folder).as_posix(), file_path, size, None))
+        return tasks
+    
+    def _run(
+        self,
+        backup: Path,
+        target: Path,
+        tasks: List[Tuple[str, Any, int, Optional[float]]],
+        progress_callback: Optional[Callable[[BackupProgress], None]],
+        max_workers: Optional[int],
+        overwrite: bool
+    ):
+        """Restore the given tasks in parallel."""
+        # Each worker thread reads the archive through its own handles
+        local = threading.local()
+        handles = []
+        
+        def open_archive() -> zipfile.ZipFile:
+            if not hasattr(local, "zipf"):
+                local.zipf = zipfile.ZipFile(backup)
+                with self._lock:
+                    handles.append(local.zipf)
+            return local.zipf
+        
+        def open_raw_archive():
+            if not hasattr(local, "raw"):
+                local.raw = open(backup, 'rb')
+                with self._lock:
+                    handles.append(local.raw)
+            return local.raw
+        
+        def restore_one(task):
+            rel_path, source, size, mtime = task
+            if self.progress.is_cancelled:
+                return
+            self._wait_if_paused()
+            
+            dest = None
+            started = False
+            copied = 0
+            try:
+                dest = self._safe_destination(target, rel_path)
+                if dest.exists() and not overwrite:
+                    with self._lock:
+                        self.progress.skipped_files.append(rel_path)
+                        self.progress.processed_files += 1
+                        self.progress.processed_size += size
+                    return
+                
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                self.progress.current_file = rel_path
+                self.progress.current_file_size = size
+                self.progress.current_file_processed = 0
+                
+                started = True
+                if isinstance(source, zipfile.ZipInfo):
+                    with open_archive().open(source) as src, open(dest, 'wb') as fdest:
+                        copied = self._stream(src, fdest, progress_callback)
+                    if mtime is None:
+                        mtime = time.mktime(source.date_time + (0, 0, -1))
+                    os.utime(dest, (mtime, mtime))
+                elif isinstance(source, IndexedMember):
+                    # Read straight from the indexed offset
+                    reader = IndexedMemberReader(open_raw_archive(), source)
+                    with open(dest, 'wb') as fdest:
+                        copied = self._stream(reader, fdest, progress_callback)
+                    if mtime is not None:
+                        os.utime(dest, (mtime, mtime))
+                else:
+                    with open(source, 'rb') as src, open(dest, 'wb') as fdest:
+                        copied = self._stream(src, fdest, progress_callback)
+                    shutil.copystat(source, dest)
+                
+                with self._lock:
+                    self.progress.processed_files += 1
+                    self.progress.current_file_processed = size
+            
+            except Exception as e:
+                # Never leave a partially written file behind
+                if started and dest.exists():
+                    try:
+                        dest.unlink()
+                    except OSError:
+                        pass
+                with self._lock:
+                    # The removed file's bytes no longer count as restored
+                    self.progress.processed_size -= copied
+                if not self.progress.is_cancelled:
+                    with self._lock:
+                        self._failed_files.add(rel_path)
+                        self.progress.errors.append(f"Error restoring {rel_path}: {str(e)}")
+            
+            self._notify(progress_callback, force=True)
+        
+        try:
+            for _ in parallel_map(restore_one, tasks, max_workers or default_workers()):
+                pass
+        finally:
+            for handle in handles:
+                handle.close()
+    
+    def _add_totals(self, tasks: List[Tuple[str, Any, int, Optional[float]]]):
+        """Add restore tasks to the progress totals."""
+        self.progress.total_files += len(tasks)
+        self.progress.total_size += sum(task[2] for task in tasks)
+    
+    def _stream(self, src, dest, progress_callback) -> int:
+        """
+        Copy a file stream chunk by chunk with byte-level progress.
+        
+        Returns:
+            Number of bytes copied; if copying fails, the bytes already
+            counted as processed are taken back before the error is raised
+        """
+        copied = 0
+        try:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                if self.progress.is_cancelled:
+                    raise InterruptedError("Restore cancelled")
+                self._wait_if_paused()
+                dest.write(chunk)
+                with self._lock:
+                    self.progress.processed_size += len(chunk)
+                copied += len(chunk)
+                self._notify(progress_callback)
+        except BaseException:
+            with self._lock:
+                self.progress.processed_size -= copied
+            raise
+        return copied
+    
+    def _safe_destination(self, target: Path, rel_path: str) -> Path:
+        """Resolve a member path inside the target, rejecting path traversal."""
+        dest = (target / rel_path).resolve()
+        if os.path.commonpath([str(dest), str(target.resolve())]) != str(target.resolve()):
+            raise ValueError(f"Unsafe path in backup: {rel_path}")
+        return dest
+    
+    def _notify(self, progress_callback, force: bool = False):
+        """Report progress, limiting byte-level updates to a few per second."""
+        if not progress_callback:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_callback < PROGRESS_INTERVAL:
+                return
+            self._last_callback = now
+            progress_callback(self.progress)
+    
+    def _wait_if_paused(self):
+        """Block while the restore is paused."""
+        while self.progress.is_paused and not self.progress.is_cancelled:
+            threading.Event().wait(0.1)
+    
+    def cancel_restore(self):
+        """Cancel the current restore operation."""
+        self.progress.is_cancelled = True
+    
+    def pause_restore(self):
+        """Pause the current restore operation."""
+        self.progress.is_paused = True
+    
+    def resume_restore(self):
+        """Resume the paused restore operation."""
+        self.progress.is_paused = False
@@ -0,0 +1,248 @@
+"""
+Backup retention.
+
+Applies per-job grandfather-father-son rules (keep the newest backup of
+each of the last N hours, days, weeks and months) and the global
+``backup_retention_days`` fallback. A retained backup keeps its whole
+chain of base backups, and deletions are rate limited so pruning a large
+destination does not starve running backups of I/O.
+"""
+import os
+import shutil
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Set
+from core.chain import TIMESTAMP_FORMAT, list_backups, companion_paths
+from utils.rate_limiter import RateLimiter
+
+
+# Rules a job's retention policy can set
+RETENTION_RULES = ("keep_last", "keep_hourly", "keep_daily", "keep_weekly", "keep_monthly")
+
+# Period a backup falls into for each bucket rule
+_BUCKETS = {
+    "keep_hourly": lambda dt: dt.strftime("%Y%m%d%H"),
+    "keep_daily": lambda dt: dt.strftime("%Y%m%d"),
+    "keep_weekly": lambda dt: "%04d-%02d" % dt.isocalendar()[:2],
+    "keep_monthly": lambda dt: dt.strftime("%Y%m"),
+}
+
+# Rules that keep one backup per period, shortest period first
+RETENTION_BUCKET_RULES = tuple(_BUCKETS)
+
+# Folders currently being pruned, so background runs never overlap
+_pruning: Set[str] = set()
+_pruning_lock = threading.Lock()
+
+
+def select_backups_to_keep(
+    backups: List[Dict[str, Any]],
+    policy: Dict[str, Any],
+    retention_days: int = 0,
+    now: datetime = None
+) -> Set[str]:
+    """
+    Decide which backups a retention policy keeps.
+    
+    A backup is kept when any rule selects it. Without any rule configured
+    the backups of the last retention_days days are kept; when that is 0
+    too, nothing is pruned. The newest complete backup and every base
+    backup a kept backup depends on are always kept.
+    
+    Args:
+        backups: Backups of a job as returned by list_backups()
+        policy: keep_last/keep_hourly/keep_daily/keep_weekly/keep_monthly
+            counts and an optional keep_within_days age
+        retention_days: Global fallback age in days
+        now: Reference time (defaults to the current time)
+    
+    Returns:
+        Set of timestamps of the backups to keep
+    """
+    now = now or datetime.now()
+    policy = policy or {}
+    
+    keep_within = policy.get("keep_within_days")
+    if not any(policy.get(rule) for rule in RETENTION_RULES) and not keep_within:
+        keep_within = retention_days
+        if not keep_within:
+            return {m["timestamp"] for m in backups}
+    
+    # Interrupted backups never represent a period
+    newest_first = sorted(backups, key=lambda m: m["timestamp"], reverse=True)
+    complete = [m for m in newest_first if not m.get("cancelled")]
+    
+    keep = {m["timestamp"] for m in complete[:policy.get("keep_last", 0)]}
+    for rule, bucket in _BUCKETS.items():
+        count = policy.get(rule, 0)
+        periods = set()
+        for metadata in complete:
+            if len(periods) >= count:
+                break
+            period = bucket(datetime.strptime(metadata["timestamp"], TIMESTAMP_FORMAT))
+            if period not in periods:
+                periods.add(period)
+                keep.add(metadata["timestamp"])
+    
+    if keep_within:
+        cutoff = (now - timedelta(days=keep_within)).strftime(TIMESTAMP_FORMAT)
+        keep.update(m["timestamp"] for m in backups if m["timestamp"] >= cutoff)
+    
+    if complete:
+        keep.add(complete[0]["timestamp"])
+    
+    # Incremental and differential backups are useless without their bases
+    by_timestamp = {m["timestamp"]: m for m in backups}
+    for timestamp in list(keep):
+        base = by_timestamp[timestamp].get("base_backup")
+        while base and base not in keep and base in by_timestamp:
+            keep.add(base)
+            base = by_timestamp[base].get("base_backup")
+    
+    return keep
+
+
+def delete_backup(job_folder: Path, metadata: Dict[str, Any], limiter: RateLimiter = None) -> int:
+    """
+    Delete a backup and its companion files.
+    
+    Every removed file counts as one unit against the limiter.
+    
+    Returns:
+        Number of bytes freed
+    """
+    job_folder = Path(job_folder)
+    limiter = limiter or RateLimiter()
+    freed = 0
+    
+    if metadata.get("destination"):
+        backup = job_folder / Path(metadata["destination"]).name
+        if backup.is_dir():
+            for root, dirs, files in os.walk(backup, topdown=False):
+                for name in files:
+                    file_path = Path(root) / name
+                    freed += file_path.stat().st_size
+                    file_path.unlink()
+                    limiter.consume(1)
+            shutil.rmtree(backup, ignore_errors=True)
+        elif backup.exists():
+            freed += backup.stat().st_size
+            backup.unlink()
+            limiter.consume(1)
+    
+    for companion_file in companion_paths(job_folder, metadata["timestamp"]):
+        if companion_file.exists():
+            freed += companion_file.stat().st_size
+            companion_file.unlink()
+            limiter.consume(1)
+    
+    return freed
+
+
+def prune_backups(
+    job_folder: Path,
+    policy: Dict[str, Any] = None,
+    retention_days: int = None,
+    max_deletes_per_second: float = None,
+    dry_run: bool = False,
+    catalog=None
+) -> Dict[str, Any]:
+    """
+    Delete the backups of a job folder that its retention policy does not keep.
+    
+    Backups are deleted newest first, so an interrupted prune never leaves
+    an incremental backup whose base is already gone.
+    
+    Args:
+        job_folder: Folder holding the job's backups
+        policy: Retention policy of the job
+        retention_days: Fallback age in days (defaults to backup_retention_days)
+        max_deletes_per_second: File deletions per second (defaults to
+            retention_max_deletes_per_second, 0 = unlimited)
+        dry_run: Only report what would be deleted
+        catalog: Backup catalog to update (defaults to the global catalog)
+    
+    Returns:
+        Dictionary with prune results
+    """
+    from utils.config import get_config
+    
+    config = get_config()
+    if retention_days is None:
+        retention_days = config.get("backup_retention_days", 0)
+    if max_deletes_per_second is None:
+        max_deletes_per_second = config.get("retention_max_deletes_per_second", 0)
+    
+    backups = list_backups(job_folder)
+    keep = select_backups_to_keep(backups, policy, retention_days)
+    expired = sorted(
+        (m for m in backups if m["timestamp"] not in keep),
+        key=lambda m: m["timestamp"],
+        reverse=True
+    )
+    
+    result = {
+        "job_folder": str(job_folder),
+        "kept": sorted(keep),
+        "deleted": [],
+        "freed_bytes": 0,
+        "errors": [],
+        "dry_run": dry_run,
+    }
+    if dry_run:
+        result["deleted"] = [m["timestamp"] for m in expired]
+        return result
+    
+    if catalog is None:
+        from core.catalog import get_catalog
+        catalog = get_catalog()
+    
+    limiter = RateLimiter(max_deletes_per_second)
+    for metadata in expired:
+        try:
+            result["freed_bytes"] += delete_backup(job_folder, metadata, limiter)
+            result["deleted"].append(metadata["timestamp"])
+        except OSError as e:
+            result["errors"].append(f"Error deleting backup {metadata['timestamp']}: {str(e)}")
+            continue
+        catalog.delete_run(job_folder, metadata["timestamp"])
+    
+    return result
+
+
+def prune_in_background(job_folder: Path, policy: Dict[str, Any] = None) -> Optional[threading.Thread]:
+    """
+    Prune a job folder in a background thread.
+    
+    Returns:
+        The started thread, or None if the folder is already being pruned
+    """
+    from utils.logger import get_logger
+    
+    key = str(Path(job_folder).resolve())
+    with _pruning_lock:
+        if key in _pruning:
+            return None
+        _pruning.add(key)
+    
+    def run():
+        logger = get_logger()
+        try:
+            result = prune_backups(job_folder, policy)
+            if result["deleted"]:
+                logger.info(
+                    f"Retention removed {len(result['deleted'])} backups from {job_folder} "
+                    f"({result['freed_bytes'] / (1024 * 1024):.1f} MB)"
+                )
+            for error in result["errors"]:
+                logger.warning(error)
+        except Exception as e:
+            logger.error(f"Retention failed for {job_folder}: {str(e)}")
+        finally:
+            with _pruning_lock:
+                _pruning.discard(key)
+    
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
@@ -1,121 +1,263 @@
 """
 Scheduler for automated backup execution.
 """
-import schedule
-import time
+import heapq
 import threading
-from datetime import datetime
-from typing import Callable, Optional
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from core.job_manager import JobManager, BackupJob
-from core.backup_engine import BackupEngine
+from core.job_schema import PRIORITIES
+from core.executor import JobExecutor
+from core.load_monitor import LoadMonitor
+from core.schedules import count_fires, next_fire
 from utils.logger import get_logger
 
 
+# Most missed runs of one job repeated by the "all" catch-up policy
+MAX_CATCH_UP_RUNS = 24
+
+
 class BackupScheduler:
-    """Manages scheduled backup execution."""
+    """
+    Manages scheduled backup execution.
+    
+    Next fire times are kept in a heap, and the scheduler thread sleeps
+    until the earliest one instead of polling. Rescheduling a job pushes
+    a new entry; the stale one is skipped when it reaches the top.
+    
+    The next fire time of every job is persisted as its next_run, so runs
+    that came due while the scheduler was stopped are caught up on start.
     
-    def __init__(self, job_manager: JobManager):
+    Jobs with dependencies form a DAG: when a job completes, each job
+    depending on it is triggered once all of its upstream jobs have
+    completed since its own last run. A triggered job is queued for now,
+    so it is deferred while the host is busy like any due job, and one
+    that is still running waits for that run to finish. Dependents that
+    become ready together are queued together and run in parallel within
+    the executor's limits.
+    """
+    
+    def __init__(self, job_manager: JobManager, executor: JobExecutor = None, load_monitor: LoadMonitor = None):
+        from utils.config import get_config
+        
+        config = get_config()
         self.job_manager = job_manager
-        self.backup_engine = BackupEngine()
+        # Due jobs are handed to the executor, so a long backup does not
+        # hold up the jobs due after it
+        self.executor = executor or JobExecutor(job_manager)
         self.logger = get_logger()
         self.is_running = False
         self._thread: Optional[threading.Thread] = None
-        self._stop_event = threading.Event()
+        self._load_thread: Optional[threading.Thread] = None
+        # Guards the queue and wakes the scheduler thread early
+        self._wakeup = threading.Condition()
+        self._queue: List[Tuple[datetime, str]] = []
+        # Current next fire time per job ID
+        self._next_fire: Dict[str, datetime] = {}
+        # Schedule each fire time was computed from, per job ID
+        self._schedules: Dict[str, Dict[str, Any]] = {}
+        # Missed runs still to be started per job ID, under the "all" policy
+        self._catch_up: Dict[str, int] = {}
+        self._catch_up_stagger = timedelta(0)
+        # IDs of jobs triggered by their upstream jobs and not started yet
+        self._triggered: Set[str] = set()
+        
+        # Load-aware scheduling: due jobs wait while the host is busy, up
+        # to a deadline, and running backups are slowed down
+        if load_monitor is None and config.get("load_aware_scheduling", True):
+            load_monitor = LoadMonitor()
+        self.load_monitor = load_monitor
+        self._load_check_seconds = config.get("load_check_seconds", 60)
+        self._max_defer = timedelta(minutes=config.get("load_max_defer_minutes", 120))
+        self._busy_throttle = config.get("load_throttle_mbps", 20) * 1024 * 1024
+        # Latest load sample's exceeded thresholds; empty while not busy
+        self._busy_reasons: List[str] = []
+        # Time deferred jobs first came due, per job ID
+        self._deferred: Dict[str, datetime] = {}
+        # Set once the first load sample is taken
+        self._load_sampled = threading.Event()
+        
         self.on_job_start: Optional[Callable[[BackupJob], None]] = None
         self.on_job_complete: Optional[Callable[[BackupJob, dict], None]] = None
         self.on_job_error: Optional[Callable[[BackupJob, Exception], None]] = None
+        
+        self.executor.completion_listeners.append(self._start_dependents)
+        self.executor.release_listeners.append(self._schedule_after_run)
     
-    def _schedule_job(self, job: BackupJob):
-        """Schedule a single job based on its schedule configuration."""
-        schedule_config = job.schedule
-        schedule_type = schedule_config.get("type", "manual")
+    def _schedule_at(self, job: BackupJob, fire_at: Optional[datetime]):
+        """
+        Set the next fire time of a job and persist it as the job's
+        next_run; call with the lock held.
+        """
+        if fire_at is None:
+            self._next_fire.pop(job.job_id, None)
+        else:
+            self._next_fire[job.job_id] = fire_at
+            heapq.heappush(self._queue, (fire_at, job.job_id))
         
-        if schedule_type == "manual":
-            return  # Manual jobs are not scheduled
+        next_run = fire_at.isoformat(timespec="seconds") if fire_at else None
+        if job.next_run != next_run:
+            # A deferred field, so rescheduling many jobs is one write
+            self.job_manager.update_job(job.job_id, next_run=next_run)
+    
+    def _schedule_job(self, job: BackupJob, after: datetime):
+        """Schedule the next run of a job after a time; call with the lock held."""
+        # Manual jobs are not scheduled
+        self._schedule_at(job, next_fire(job.schedule, after))
+    
+    def _schedule_all(self, catch_up: bool = False):
+        """
+        Rebuild the queue from all jobs; call with the lock held.
         
-        # Create the job execution function
-        def execute_job():
-            self._execute_backup_job(job)
+        Jobs whose schedule did not change keep their fire time. With
+        catch_up, fire times persisted by an earlier session are used as
+        well, and runs missed while the scheduler was stopped are handled
+        by the job's catch-up policy.
+        """
+        now = datetime.now()
+        previous, self._next_fire, self._queue = self._next_fire, {}, []
+        previous_schedules, self._schedules = self._schedules, {}
+        overdue = []
         
-        # Schedule based on type
-        if schedule_type == "daily":
-            time_str = schedule_config.get("time", "00:00")
-            schedule.every().day.at(time_str).do(execute_job).tag(job.job_id)
-            
-        elif schedule_type == "weekly":
-            day = schedule_config.get("day", "monday")
-            time_str = schedule_config.get("time", "00:00")
-            getattr(schedule.every(), day).at(time_str).do(execute_job).tag(job.job_id)
-            
-        elif schedule_type == "monthly":
-            # Monthly scheduling - run on specific day of month
-            day_of_month = schedule_config.get("day_of_month", 1)
-            time_str = schedule_config.get("time", "00:00")
-            
-            def monthly_check():
-                if datetime.now().day == day_of_month:
-                    execute_job()
+        for job in self.job_manager.get_all_jobs():
+            if not job.enabled:
+                self._schedule_at(job, None)
+                continue
+            computed = next_fire(job.schedule, now)
+            if computed is None:
+                self._schedule_at(job, None)
+                continue
+            self._schedules[job.job_id] = job.schedule
             
-            schedule.every().day.at(time_str).do(monthly_check).tag(job.job_id)
+            known = previous.get(job.job_id) if previous_schedules.get(job.job_id) == job.schedule else None
+            if known is None and catch_up and job.next_run:
+                try:
+                    known = datetime.fromisoformat(job.next_run)
+                except ValueError:
+                    known = None
             
-        elif schedule_type == "interval":
-            # Interval-based scheduling
-            interval = schedule_config.get("interval", 1)
-            unit = schedule_config.get("unit", "hours")  # minutes, hours, days
-            
-            if unit == "minutes":
-                schedule.every(interval).minutes.do(execute_job).tag(job.job_id)
-            elif unit == "hours":
-                schedule.every(interval).hours.do(execute_job).tag(job.job_id)
-            elif unit == "days":
-                schedule.every(interval).days.do(execute_job).tag(job.job_id)
-        
-        self.logger.info(f"Scheduled job: {job.name} ({schedule_type})")
-    
-    def _execute_backup_job(self, job: BackupJob):
-        """Execute a backup job."""
-        try:
-            self.logger.info(f"Starting backup job: {job.name}")
-            
-            # Update job status
-            self.job_manager.update_job(job.job_id, status="running")
-            
-            # Notify listeners
-            if self.on_job_start:
-                self.on_job_start(job)
-            
-            # Perform backup
-            result = self.backup_engine.perform_backup(
-                source_paths=job.source_paths,
-                destination_path=job.destination_path,
-                backup_type=job.backup_type,
-                filters=job.filters,
-                compression=job.compression,
-                job_name=job.name
-            )
+            if known is not None and known <= now and catch_up:
+                overdue.append((job, known))
+            elif known is not None:
+                # A changed interval or time can only bring a run forward
+                self._schedule_at(job, min(known, computed))
+            else:
+                self._schedule_at(job, computed)
+        
+        if overdue:
+            self._schedule_catch_up(overdue, now)
+        
+        # Triggers are kept over schedule changes
+        for job_id in list(self._triggered):
+            job = self.job_manager.get_job(job_id)
+            if job is None or not job.enabled:
+                self._triggered.discard(job_id)
+            else:
+                self._schedule_at(job, now)
+        self.logger.info(f"Scheduled {len(self._next_fire)} jobs")
+    
+    def _schedule_catch_up(self, overdue: List[Tuple[BackupJob, datetime]], now: datetime):
+        """
+        Schedule runs missed while the scheduler was stopped; call with the lock held.
+        
+        Catch-up runs start catch_up_stagger_seconds apart, highest
+        priority and longest overdue first, instead of all at once.
+        """
+        from utils.config import get_config
+        
+        config = get_config()
+        default_policy = config.get("catch_up_policy", "once")
+        stagger = self._catch_up_stagger = timedelta(seconds=config.get("catch_up_stagger_seconds", 60))
+        
+        overdue.sort(key=lambda item: (-PRIORITIES.index(item[0].priority), item[1]))
+        slot = 0
+        for job, missed_at in overdue:
+            policy = job.schedule.get("catch_up", default_policy)
+            missed = count_fires(job.schedule, missed_at, now, MAX_CATCH_UP_RUNS)
+            if policy == "skip":
+                self.logger.info(f"Skipping {missed} missed runs of job: {job.name}")
+                self._schedule_job(job, now)
+                continue
             
-            # Update job status
-            self.job_manager.update_job(
-                job.job_id,
-                status="completed",
-                last_run=datetime.now().isoformat()
+            if policy == "all" and missed > 1:
+                self._catch_up[job.job_id] = missed
+            self.logger.info(f"Catching up job {job.name} ({missed if policy == 'all' else 1} runs)")
+            self._schedule_at(job, now + slot * stagger)
+            slot += 1
+    
+    def _submit(self, job: BackupJob) -> bool:
+        """Queue a job on the executor with the scheduler's listeners."""
+        return self.executor.submit(
+            job,
+            on_start=self.on_job_start,
+            on_complete=self.on_job_complete,
+            on_error=self.on_job_error
+        )
+    
+    def _dependencies_met(self, job: BackupJob) -> bool:
+        """Check whether every upstream job of a job has completed since the job last ran."""
+        for upstream_id in job.depends_on:
+            upstream = self.job_manager.get_job(upstream_id)
+            if upstream is None:
+                continue
+            if upstream.status != "completed" or not upstream.last_run:
+                return False
+            if job.last_run and upstream.last_run <= job.last_run:
+                return False
+        return True
+    
+    def _start_dependents(self, job: BackupJob, result: dict):
+        """Trigger the jobs that depend on a completed job and have all dependencies met."""
+        if not self.is_running or result.get("cancelled"):
+            return
+        
+        upstream = self.job_manager.get_job(job.job_id)
+        if upstream is None or not upstream.last_run:
+            return
+        completed_at = datetime.fromisoformat(upstream.last_run)
+        
+        # Held while triggering, so upstream jobs completing together
+        # trigger a shared dependent only once
+        with self._wakeup:
+            ready = [
+                dependent for dependent in self.job_manager.get_dependents(job.job_id)
+                if dependent.enabled and dependent.job_id not in self._triggered
+                and self._dependencies_met(dependent)
+                # A queued run, or one started since, reads the upstream output
+                # already; one started before needs another run afterwards
+                and (
+                    self.executor.started_before(dependent.job_id, completed_at)
+                    or not self.executor.is_active(dependent.job_id)
+                )
+            ]
+            if not ready:
+                return
+            self.logger.info(
+                f"Starting jobs after {job.name}: {', '.join(dependent.name for dependent in ready)}"
             )
-            
-            self.logger.info(f"Completed backup job: {job.name}")
-            
-            # Notify listeners
-            if self.on_job_complete:
-                self.on_job_complete(job, result)
-                
-        except Exception as e:
-            self.logger.error(f"Backup job failed: {job.name} - {str(e)}", exc_info=True)
-            
-            # Update job status
-            self.job_manager.update_job(job.job_id, status="failed")
-            
-            # Notify listeners
-            if self.on_job_error:
-                self.on_job_error(job, e)
+            # Queued for now rather than submitted, so they are deferred
+            # while the host is busy and started together by _pop_due
+            now = datetime.now()
+            for dependent in ready:
+                self._triggered.add(dependent.job_id)
+                self._schedule_at(dependent, now)
+            self._wakeup.notify_all()
+    
+    def _schedule_after_run(self, job: BackupJob):
+        """
+        Queue what waited for a job's run to finish: the job again if it
+        was triggered meanwhile, or its next missed run.
+        """
+        with self._wakeup:
+            if not self.is_running:
+                return
+            if job.job_id in self._triggered:
+                self._schedule_at(job, datetime.now())
+            elif job.job_id in self._catch_up:
+                self._schedule_at(job, datetime.now() + self._catch_up_stagger)
+            else:
+                return
+            self._wakeup.notify_all()
     
     def start(self):
         """Start the scheduler."""
@@ -123,26 +265,164 @@ class BackupScheduler:
             self.logger.warning("Scheduler is already running")
             return
         
+        # Threads of an earlier start exit once they see is_running unset
+        for thread in (self._thread, self._load_thread):
+            if thread is not None and thread.is_alive():
+                thread.join()
+        
         self.logger.info("Starting backup scheduler")
         self.is_running = True
-        self._stop_event.clear()
-        
-        # Clear existing schedules
-        schedule.clear()
-        
-        # Schedule all enabled jobs
-        for job in self.job_manager.get_enabled_jobs():
-            self._schedule_job(job)
+        with self._wakeup:
+            self._schedule_all(catch_up=True)
         
         # Start scheduler thread
         self._thread = threading.Thread(target=self._run_scheduler, daemon=True)
         self._thread.start()
+        if self.load_monitor is not None:
+            self._load_sampled.clear()
+            self._load_thread = threading.Thread(target=self._watch_load, daemon=True)
+            self._load_thread.start()
+    
+    def _watch_load(self):
+        """Sample host load, slowing down backups and releasing deferred jobs accordingly."""
+        while self.is_running:
+            reasons = self.load_monitor.busy_reasons()
+            with self._wakeup:
+                if not self.is_running:
+                    break
+                if reasons != self._busy_reasons:
+                    self.logger.info(
+                        f"Host busy ({', '.join(reasons)}), slowing down backups" if reasons
+                        else "Host load back to normal"
+                    )
+                self._busy_reasons = reasons
+                self._load_sampled.set()
+                if not reasons and self._deferred:
+                    # Deferred jobs start now rather than at their next check
+                    now = datetime.now()
+                    for job_id in list(self._deferred):
+                        job = self.job_manager.get_job(job_id)
+                        if job is not None and job_id in self._next_fire:
+                            self._schedule_at(job, now)
+                    self._wakeup.notify_all()
+                self.executor.set_throttle(self._busy_throttle if reasons else 0)
+                self._wakeup.wait(self._load_check_seconds)
+        self.executor.set_throttle(0)
+    
+    def _latest_start(self, job: BackupJob, first_due: datetime) -> datetime:
+        """
+        Get the time after which a job starts even if the host is busy.
+        
+        The job should finish within max_defer_minutes of the schedule
+        (or load_max_defer_minutes) of first coming due, so the duration
+        of its last successful run is subtracted.
+        """
+        window = self._max_defer
+        if "max_defer_minutes" in job.schedule:
+            window = timedelta(minutes=job.schedule["max_defer_minutes"])
+        runs = [run for run in self.job_manager.get_runs(job.job_id, limit=5) if run["outcome"] != "failed"]
+        expected = timedelta(seconds=runs[0]["duration_seconds"] or 0) if runs else timedelta(0)
+        return max(first_due, first_due + window - expected)
+    
+    def _defer(self, job: BackupJob, now: datetime) -> bool:
+        """
+        Put off a due job while the host is busy; call with the lock held.
+        
+        Returns:
+            True if the job was deferred, False if it should start now
+        """
+        if not self._busy_reasons:
+            self._deferred.pop(job.job_id, None)
+            return False
+        
+        first_due = self._deferred.get(job.job_id)
+        if first_due is None:
+            first_due = self._deferred[job.job_id] = now
+            self.logger.info(f"Deferring job {job.name}: host busy ({', '.join(self._busy_reasons)})")
+        if now >= self._latest_start(job, first_due):
+            self.logger.warning(f"Starting deferred job {job.name} despite high load: deadline reached")
+            del self._deferred[job.job_id]
+            return False
+        
+        self._schedule_at(job, now + timedelta(seconds=self._load_check_seconds))
+        return True
+    
+    def _pop_due(self) -> List[str]:
+        """
+        Sleep until jobs are due and take them off the queue.
+        
+        Returns:
+            IDs of due jobs, or an empty list when the scheduler stops
+        """
+        with self._wakeup:
+            while self.is_running:
+                now = datetime.now()
+                if self._queue and self._queue[0][0] <= now:
+                    break
+                # Sleeps until the earliest fire time, or until start,
+                # stop or refresh_schedules wakes the thread
+                timeout = (self._queue[0][0] - now).total_seconds() if self._queue else None
+                self._wakeup.wait(timeout)
+            else:
+                return []
+            
+            due = []
+            while self._queue and self._queue[0][0] <= now:
+                fire_at, job_id = heapq.heappop(self._queue)
+                # Entries replaced by a reschedule are skipped
+                if self._next_fire.get(job_id) != fire_at:
+                    continue
+                job = self.job_manager.get_job(job_id)
+                if job is None or not job.enabled:
+                    self._next_fire.pop(job_id, None)
+                    continue
+                if self._defer(job, now):
+                    continue
+                
+                if job_id in self._triggered:
+                    # A triggered job still running is queued again by
+                    # _schedule_after_run once that run finishes
+                    if not self.executor.is_active(job_id):
+                        self._triggered.discard(job_id)
+                        due.append(job_id)
+                    self._schedule_job(job, now)
+                    continue
+                
+                remaining = self._catch_up.get(job_id)
+                if remaining is None:
+                    due.append(job_id)
+                    self._schedule_job(job, now)
+                elif self.executor.is_active(job_id):
+                    # Missed runs are repeated one after another: the next
+                    # one is queued by _schedule_after_run once this run
+                    # finishes, catch_up_stagger_seconds later
+                    continue
+                elif remaining > 1:
+                    # Not queued again until this run has finished
+                    due.append(job_id)
+                    self._catch_up[job_id] = remaining - 1
+                else:
+                    due.append(job_id)
+                    del self._catch_up[job_id]
+                    self._schedule_job(job, now)
+            return due
     
     def _run_scheduler(self):
         """Run the scheduler loop."""
-        while self.is_running and not self._stop_event.is_set():
-            schedule.run_pending()
-            time.sleep(1)
+        if self.load_monitor is not None:
+            # Jobs due at once are not started before the load is known
+            self._load_sampled.wait(timeout=10)
+        while self.is_running:
+            due = [self.job_manager.get_job(job_id) for job_id in self._pop_due()]
+            due = [job for job in due if job is not None]
+            if due and self.is_running:
+                # Queued together, so jobs due at the same time start by priority
+                self.executor.submit_many(
+                    due,
+                    on_start=self.on_job_start,
+                    on_complete=self.on_job_complete,
+                    on_error=self.on_job_error
+                )
     
     def stop(self):
         """Stop the scheduler."""
@@ -150,13 +430,22 @@ class BackupScheduler:
             return
         
         self.logger.info("Stopping backup scheduler")
-        self.is_running = False
-        self._stop_event.set()
+        with self._wakeup:
+            self.is_running = False
+            self._wakeup.notify_all()
         
-        if self._thread:
-            self._thread.join(timeout=5)
+        for thread in (self._thread, self._load_thread):
+            if thread is not None:
+                thread.join(timeout=5)
         
-        schedule.clear()
+        with self._wakeup:
+            self._queue = []
+            self._next_fire = {}
+            self._schedules = {}
+            self._catch_up = {}
+            self._triggered = set()
+            self._deferred = {}
+            self._busy_reasons = []
     
     def refresh_schedules(self):
         """Refresh all job schedules (call after job changes)."""
@@ -164,28 +453,25 @@ class BackupScheduler:
             return
         
         self.logger.info("Refreshing job schedules")
-        
-        # Clear and reschedule
-        schedule.clear()
-        for job in self.job_manager.get_enabled_jobs():
-            self._schedule_job(job)
+        with self._wakeup:
+            self._schedule_all()
+            self._wakeup.notify_all()
     
-    def run_job_now(self, job_id: str):
-        """Run a specific job immediately."""
+    def run_job_now(self, job_id: str) -> bool:
+        """
+        Run a specific job as soon as the executor has a free slot for it.
+        
+        Returns:
+            False if the job does not exist or is already queued or running
+        """
         job = self.job_manager.get_job(job_id)
         if job:
             self.logger.info(f"Running job immediately: {job.name}")
-            threading.Thread(
-                target=self._execute_backup_job,
-                args=(job,),
-                daemon=True
-            ).start()
-        else:
-            self.logger.error(f"Job not found: {job_id}")
+            return self._submit(job)
+        self.logger.error(f"Job not found: {job_id}")
+        return False
     
     def get_next_run_time(self, job_id: str) -> Optional[datetime]:
         """Get the next scheduled run time for a job."""
-        jobs = schedule.get_jobs(job_id)
-        if jobs:
-            return jobs[0].next_run
-        return None
+        with self._wakeup:
+            return self._next_fire.get(job_id)
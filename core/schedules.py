@@ -0,0 +1,100 @@
+"""
+Next-fire computation for job schedules.
+
+A schedule is the dictionary stored in BackupJob.schedule. Its next fire
+time is computed directly from the schedule and a reference time, so a
+scheduler only has to wake up when a job is actually due.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from core.cron import next_fire_cron
+
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+# What to do on start with runs missed while the scheduler was stopped:
+# run the job once, repeat every missed run, or wait for the next run
+CATCH_UP_POLICIES = ("once", "all", "skip")
+
+# Seconds per interval unit
+INTERVAL_UNITS = {"minutes": 60, "hours": 3600, "days": 86400}
+
+
+def _at_time(day: datetime, time_str: Optional[str]) -> datetime:
+    """Get the given day at a "HH:MM" (or "HH:MM:SS") time."""
+    parts = [int(part) for part in (time_str or "00:00").split(":")]
+    hour, minute = parts[0], parts[1] if len(parts) > 1 else 0
+    second = parts[2] if len(parts) > 2 else 0
+    return day.replace(hour=hour, minute=minute, second=second, microsecond=0)
+
+
+def _next_monthly(after: datetime, day_of_month: int, time_str: Optional[str]) -> datetime:
+    """Get the next time on day_of_month, skipping months that are too short."""
+    year, month = after.year, after.month
+    while True:
+        try:
+            candidate = _at_time(after.replace(year=year, month=month, day=day_of_month), time_str)
+        except ValueError:
+            candidate = None
+        if candidate is not None and candidate > after:
+            return candidate
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def next_fire(schedule: Dict[str, Any], after: datetime) -> Optional[datetime]:
+    """
+    Get the first time after a reference time at which a schedule fires.
+    
+    Args:
+        schedule: Job schedule configuration
+        after: Reference time; for interval schedules, the previous fire
+            time (or the time the schedule was created)
+    
+    Returns:
+        Next fire time, or None for manual or unknown schedules
+    
+    Raises:
+        CronError: If a cron schedule is invalid
+    """
+    schedule_type = schedule.get("type", "manual")
+    
+    if schedule_type == "daily":
+        candidate = _at_time(after, schedule.get("time"))
+        return candidate if candidate > after else candidate + timedelta(days=1)
+    
+    if schedule_type == "weekly":
+        weekday = WEEKDAYS.index(schedule.get("day", "monday"))
+        candidate = _at_time(after, schedule.get("time"))
+        candidate += timedelta(days=(weekday - candidate.weekday()) % 7)
+        return candidate if candidate > after else candidate + timedelta(days=7)
+    
+    if schedule_type == "monthly":
+        return _next_monthly(after, schedule.get("day_of_month", 1), schedule.get("time"))
+    
+    if schedule_type == "cron":
+        return next_fire_cron(schedule.get("expression", ""), after, schedule.get("timezone"))
+    
+    if schedule_type == "interval":
+        unit = INTERVAL_UNITS.get(schedule.get("unit", "hours"))
+        if unit is None:
+            return None
+        return after + timedelta(seconds=schedule.get("interval", 1) * unit)
+    
+    return None
+
+
+def count_fires(schedule: Dict[str, Any], since: datetime, until: datetime, limit: int) -> int:
+    """
+    Count the fire times from since (which counts as the first) up to until.
+    
+    Args:
+        schedule: Job schedule configuration
+        since: First fire time
+        until: End of the period
+        limit: Stop counting at this many
+    """
+    count, fire_at = 0, since
+    while fire_at is not None and fire_at <= until and count < limit:
+        count += 1
+        fire_at = next_fire(schedule, fire_at)
+    return count
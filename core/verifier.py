@@ -0,0 +1,260 @@
+"""
+Backup verification.
+
+Quick mode checks the structure of a backup against its manifest without
+reading file contents: ZIP central directory sizes and CRCs, local headers
+and folder file sizes. Deep mode re-hashes every stored file in parallel
+and compares the digests with the manifest.
+"""
+import zlib
+import zipfile
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Optional, Dict, Any
+from core.backup_engine import BackupProgress, CHUNK_SIZE
+from core.backup_index import LOCAL_HEADER, LOCAL_HEADER_SIGNATURE
+from core.hashing import DEFAULT_ALGORITHM, create_hasher, hash_files, parallel_map, default_workers
+from core.manifest import manifest_path_for, read_manifest, read_manifest_header, split_backup_path
+from utils.rate_limiter import RateLimiter
+
+
+class BackupVerifier:
+    """Verifies existing backups against their manifests."""
+    
+    def __init__(self, progress: BackupProgress = None):
+        self.progress = progress or BackupProgress()
+    
+    def verify(
+        self,
+        backup_path: str,
+        mode: str = "quick",
+        progress_callback: Optional[Callable[[BackupProgress], None]] = None,
+        max_bytes_per_second: float = 0,
+        max_workers: int = None
+    ) -> Dict[str, Any]:
+        """
+        Verify a backup.
+        
+        Args:
+            backup_path: Path to the backup ZIP file or folder
+            mode: "quick" (structure only) or "deep" (re-hash contents)
+            progress_callback: Optional callback for progress updates
+            max_bytes_per_second: Read throughput limit for deep mode (0 = unlimited)
+            max_workers: Number of hashing threads for deep mode
+        
+        Returns:
+            Dictionary with verification results
+        """
+        if mode not in ("quick", "deep"):
+            raise ValueError(f"Unknown verification mode: {mode}")
+        
+        backup = Path(backup_path)
+        if not backup.exists():
+            raise FileNotFoundError(f"Backup not found: {backup_path}")
+        
+        self.progress.start_time = datetime.now()
+        
+        job_folder, timestamp = split_backup_path(backup)
+        manifest_file = manifest_path_for(job_folder, timestamp)
+        
+        result = {
+            "backup_path": str(backup),
+            "mode": mode,
+            "has_manifest": manifest_file.exists(),
+            "checked_files": 0,
+            "mismatches": [],
+            "missing": [],
+            "extra": [],
+            "errors": [],
+        }
+        
+        manifest = {}
+        algorithm = DEFAULT_ALGORITHM
+        if manifest_file.exists():
+            algorithm = read_manifest_header(manifest_file).get("algorithm", DEFAULT_ALGORITHM)
+            manifest = {
+                entry["path"]: entry
+                for entry in read_manifest(manifest_file)
+                if not entry.get("deleted")
+            }
+        
+        self.progress.total_files = len(manifest)
+        self.progress.total_size = sum(entry["size"] for entry in manifest.values())
+        
+        limiter = RateLimiter(max_bytes_per_second)
+        workers = max_workers or default_workers()
+        
+        if backup.is_file():
+            self._verify_zip(backup, manifest, algorithm, mode, result, limiter, workers, progress_callback)
+        else:
+            self._verify_folder(backup, manifest, algorithm, mode, result, limiter, workers, progress_callback)
+        
+        self.progress.end_time = datetime.now()
+        result["ok"] = not (result["mismatches"] or result["missing"] or result["errors"])
+        result["cancelled"] = self.progress.is_cancelled
+        result["duration_seconds"] = (self.progress.end_time - self.progress.start_time).total_seconds()
+        return result
+    
+    def _verify_zip(self, archive: Path, manifest, algorithm, mode, result, limiter, workers, progress_callback):
+        """Verify a ZIP archive."""
+        try:
+            zipf = zipfile.ZipFile(archive)
+        except (zipfile.BadZipFile, OSError) as e:
+            result["errors"].append(f"Cannot read central directory: {e}")
+            return
+        
+        with zipf:
+            members = {info.filename: info for info in zipf.infolist() if not info.is_dir()}
+            if not manifest:
+                self.progress.total_files = len(members)
+                self.progress.total_size = sum(info.file_size for info in members.values())
+            
+            self._compare_listing(members, manifest, result)
+            
+            # Structural checks straight from the central directory
+            archive_size = archive.stat().st_size
+            with open(archive, 'rb') as f:
+                for name, info in members.items():
+                    entry = manifest.get(name)
+                    problem = self._check_local_header(f, info, archive_size)
+                    if problem is None and entry:
+                        if info.file_size != entry["size"]:
+                            problem = f"size {info.file_size} != {entry['size']}"
+                        elif "crc" in entry and info.CRC != entry["crc"]:
+                            problem = "CRC does not match manifest"
+                    if problem:
+                        result["mismatches"].append({"path": name, "reason": problem})
+                    if mode == "quick":
+                        self._advance(info.file_size, progress_callback)
+            
+            if mode == "quick" or self.progress.is_cancelled:
+                result["checked_files"] = len(members)
+                return
+        
+        # Deep: decompress and re-hash members in parallel, one handle per thread
+        local = threading.local()
+        handles = []
+        
+        def open_archive():
+            if not hasattr(local, "zipf"):
+                local.zipf = zipfile.ZipFile(archive)
+                handles.append(local.zipf)
+            return local.zipf
+        
+        def hash_member(info):
+            if self.progress.is_cancelled:
+                return info, None, "cancelled"
+            self._wait_if_paused()
+            hasher = create_hasher(algorithm)
+            try:
+                with open_archive().open(info) as src:
+                    for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                        limiter.consume(len(chunk))
+                        hasher.update(chunk)
+            except (zipfile.BadZipFile, zlib.error, OSError, EOFError) as e:
+                return info, None, str(e)
+            return info, hasher.hexdigest(), None
+        
+        try:
+            for info, digest, error in parallel_map(hash_member, members.values(), workers):
+                if error == "cancelled":
+                    continue
+                self._record_hash(info.filename, digest, error, manifest, result)
+                self._advance(info.file_size, progress_callback)
+        finally:
+            for handle in handles:
+                handle.close()
+    
+    def _check_local_header(self, f, info: zipfile.ZipInfo, archive_size: int) -> Optional[str]:
+        """Check that a member's local header agrees with the central directory."""
+        if info.header_offset + LOCAL_HEADER.size > archive_size:
+            return "local header outside archive"
+        f.seek(info.header_offset)
+        header = f.read(LOCAL_HEADER.size)
+        fields = LOCAL_HEADER.unpack(header)
+        if fields[0] != LOCAL_HEADER_SIGNATURE:
+            return "bad local header signature"
+        name_length, extra_length = fields[9], fields[10]
+        data_end = info.header_offset + LOCAL_HEADER.size + name_length + extra_length + info.compress_size
+        if data_end > archive_size:
+            return "member data truncated"
+        # Without a data descriptor the local CRC must match the central one
+        if not fields[2] & 0x08 and fields[6] != info.CRC:
+            return "local header CRC differs from central directory"
+        return None
+    
+    def _verify_folder(self, folder: Path, manifest, algorithm, mode, result, limiter, workers, progress_callback):
+        """Verify a folder backup."""
+        if not manifest:
+            result["errors"].append("Manifest not found, folder contents cannot be verified")
+            return
+        
+        present = {}
+        for name, entry in manifest.items():
+            file_path = folder / name
+            try:
+                size = file_path.stat().st_size
+            except OSError:
+                result["missing"].append(name)
+                continue
+            if size != entry["size"]:
+                result["mismatches"].append({"path": name, "reason": f"size {size} != {entry['size']}"})
+            else:
+                present[name] = file_path
+            if mode == "quick":
+                self._advance(entry["size"], progress_callback)
+        
+        if mode == "quick":
+            result["checked_files"] = len(manifest)
+            return
+        
+        def paths():
+            for name, file_path in present.items():
+                if self.progress.is_cancelled:
+                    return
+                self._wait_if_paused()
+                yield name
+        
+        for name, digest, error in hash_files(
+            (folder / name for name in paths()),
+            algorithm,
+            workers,
+            limiter
+        ):
+            rel_name = Path(name).relative_to(folder).as_posix()
+            self._record_hash(rel_name, digest, error, manifest, result)
+            self._advance(manifest[rel_name]["size"], progress_callback)
+    
+    def _compare_listing(self, members: Dict[str, Any], manifest: Dict[str, Any], result: Dict[str, Any]):
+        """Compare the member list with the manifest."""
+        if not manifest:
+            return
+        result["missing"].extend(sorted(name for name in manifest if name not in members))
+        result["extra"].extend(sorted(name for name in members if name not in manifest))
+    
+    def _record_hash(self, name: str, digest: Optional[str], error: Optional[str], manifest, result):
+        """Record the outcome of re-hashing a single file."""
+        result["checked_files"] += 1
+        if error:
+            result["mismatches"].append({"path": name, "reason": error})
+            return
+        entry = manifest.get(name)
+        if entry and entry["hash"] != digest:
+            result["mismatches"].append({"path": name, "reason": "content hash mismatch"})
+    
+    def _advance(self, size: int, progress_callback):
+        """Advance progress by one file."""
+        self.progress.processed_files += 1
+        self.progress.processed_size += size
+        if progress_callback:
+            progress_callback(self.progress)
+    
+    def _wait_if_paused(self):
+        """Block while verification is paused."""
+        while self.progress.is_paused and not self.progress.is_cancelled:
+            threading.Event().wait(0.1)
+    
+    def cancel(self):
+        """Cancel the running verification."""
+        self.progress.is_cancelled = True
@@ -5,20 +5,200 @@ import customtkinter as ctk
 from tkinter import messagebox, filedialog
 from pathlib import Path
 from datetime import datetime
-import json
 from typing import Optional, List, Dict, Any
 from utils.i18n import t
+from core.chain import TIMESTAMP_FORMAT, list_backups, dependents
+from core.retention import delete_backup
+from core.backup_engine import BackupEngine, job_folder_name
+from core.restore_engine import RestoreEngine
+from core.merkle import compare_backups
+from core.catalog import get_catalog
+from gui.virtual_list import VirtualList
+from gui.trends import TREND_RUNS, run_trends
+from core.job_manager import get_job_manager
+from utils.config import get_config
+from utils.logger import get_logger
+import threading
+import queue
+
+
+# Interval for applying background loading results in the Tk thread (ms)
+POLL_INTERVAL_MS = 100
+
+# Backups checked for existence per streamed update
+EXISTS_BATCH_SIZE = 200
+
+# Most distinct paths listed by a file search
+SEARCH_LIMIT = 200
+
+# Characters that make a search pattern a glob
+_GLOB_CHARS = set("*?[")
+
+
+class BackupRow(ctk.CTkFrame):
+    """Reusable row of the history list, re-filled for each visible backup."""
+    
+    def __init__(self, parent, on_open, on_restore, on_verify, on_compare, on_delete):
+        super().__init__(parent)
+        
+        self.backup: Optional[Dict[str, Any]] = None
+        
+        self.date_label = self._add_label()
+        self.type_label = self._add_label()
+        self.files_label = self._add_label()
+        self.size_label = self._add_label()
+        self.status_label = self._add_label()
+        
+        # Actions
+        actions_frame = ctk.CTkFrame(self, fg_color="transparent")
+        actions_frame.pack(side="left", expand=True, fill="x", padx=5)
+        
+        self.buttons = []
+        for text, command in (
+            ("📂", lambda: on_open(self.backup["path"])),
+            ("↻", lambda: on_restore(self.backup)),
+            ("✔", lambda: on_verify(self.backup)),
+            ("⇄", lambda: on_compare(self.backup)),
+        ):
+            button = ctk.CTkButton(actions_frame, text=text, command=command, width=40, height=28)
+            button.pack(side="left", padx=2)
+            self.buttons.append(button)
+        
+        delete_button = ctk.CTkButton(
+            actions_frame,
+            text="🗑",
+            command=lambda: on_delete(self.backup),
+            width=40,
+            height=28,
+            fg_color="#e74c3c",
+            hover_color="#c0392b"
+        )
+        delete_button.pack(side="left", padx=2)
+        self.buttons.append(delete_button)
+    
+    def _add_label(self) -> ctk.CTkLabel:
+        """Create one column label."""
+        label = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=11))
+        label.pack(side="left", expand=True, fill="x", padx=5)
+        return label
+    
+    def show(self, backup: Dict[str, Any]):
+        """Fill the row with a backup."""
+        self.backup = backup
+        
+        # Parse timestamp
+        try:
+            dt = datetime.strptime(backup["timestamp"], "%Y%m%d_%H%M%S")
+            date_str = dt.strftime("%d.%m.%Y %H:%M")
+        except ValueError:
+            date_str = backup["timestamp"]
+        
+        # Get metadata
+        metadata = backup.get("metadata", {})
+        size_mb = (metadata.get("total_size") or 0) / (1024 * 1024)
+        
+        self.date_label.configure(text=date_str)
+        self.type_label.configure(text=backup["type"])
+        self.files_label.configure(text=str(metadata.get("total_files", "?")))
+        self.size_label.configure(text=f"{size_mb:.1f} MB")
+        
+        # Status, existence is checked in the background
+        if backup["path"] is None:
+            status, color = "✗ Failed", "red"
+        elif backup.get("exists") is None:
+            status, color = "…", "gray"
+        elif backup["exists"]:
+            status, color = "✓ OK", "green"
+        else:
+            status, color = "✗ Missing", "red"
+        self.status_label.configure(text=status, text_color=color)
+        
+        state = "normal" if backup["path"] is not None else "disabled"
+        for button in self.buttons:
+            button.configure(state=state)
+
+
+class SearchResultsWindow(ctk.CTkToplevel):
+    """Lists the backed-up versions of files found by a search."""
+    
+    def __init__(self, parent, pattern: str, versions: List[Dict[str, Any]]):
+        """
+        Args:
+            parent: Parent window
+            pattern: Search pattern, shown in the title
+            versions: Versions from Catalog.search_files, by path and newest first
+        """
+        super().__init__(parent)
+        
+        self.title(f"{t('history.search_results')} - {pattern}")
+        self.geometry("700x450")
+        self.transient(parent)
+        
+        paths = len({version["path"] for version in versions})
+        summary = f"{t('history.search_found')}: {paths}"
+        if paths >= SEARCH_LIMIT:
+            summary += f" ({t('history.search_limited')})"
+        ctk.CTkLabel(
+            self,
+            text=summary,
+            font=ctk.CTkFont(size=12)
+        ).pack(anchor="w", padx=15, pady=(15, 5))
+        
+        textbox = ctk.CTkTextbox(self, font=ctk.CTkFont(family="Consolas", size=12), wrap="none")
+        textbox.pack(fill="both", expand=True, padx=15, pady=5)
+        textbox.insert("end", self._format(versions))
+        textbox.configure(state="disabled")
+        
+        ctk.CTkButton(
+            self,
+            text=t("common.close"),
+            command=self.destroy,
+            width=120
+        ).pack(side="right", padx=15, pady=(5, 15))
+    
+    @staticmethod
+    def _format(versions: List[Dict[str, Any]]) -> str:
+        """List every path followed by its versions."""
+        lines = []
+        previous = None
+        for version in versions:
+            if version["path"] != previous:
+                previous = version["path"]
+                lines.append(version["path"])
+            try:
+                date_str = datetime.strptime(version["timestamp"], TIMESTAMP_FORMAT).strftime("%d.%m.%Y %H:%M")
+            except ValueError:
+                date_str = version["timestamp"]
+            if version["deleted"]:
+                detail = t("history.search_deleted")
+            else:
+                detail = f"{(version['size'] or 0) / (1024 * 1024):.2f} MB"
+            lines.append(f"    {date_str}   {detail}")
+        return "\n".join(lines)
 
 
 class HistoryWindow(ctk.CTkToplevel):
     """History window for backup management."""
     
-    def __init__(self, parent, job_name: str, destination_path: str):
+    def __init__(self, parent, job_name: str, destination_path: str, jobs: List[Any] = None):
+        """
+        Args:
+            parent: Parent window
+            job_name: Name of the job to show
+            destination_path: Destination of the job
+            jobs: Optional list of jobs to choose from
+        """
         super().__init__(parent)
         
         self.job_name = job_name
         self.destination_path = destination_path
-        self.backups = []
+        self.jobs = jobs or []
+        self.job_id = next((job.job_id for job in self.jobs if job.name == job_name), None)
+        
+        # Results of background loading, applied in the Tk thread
+        self._updates = queue.Queue()
+        self._generation = 0
+        self._existence: Dict[str, bool] = {}
         
         # Window setup
         self.title(f"{t('history.title')} - {job_name}")
@@ -34,6 +214,7 @@ class HistoryWindow(ctk.CTkToplevel):
         
         self._create_ui()
         self._load_backups()
+        self.after(POLL_INTERVAL_MS, self._poll_updates)
     
     def _create_ui(self):
         """Create the UI."""
@@ -42,21 +223,61 @@ class HistoryWindow(ctk.CTkToplevel):
         main_frame.pack(fill="both", expand=True, padx=30, pady=30)
         
         # Title
-        ctk.CTkLabel(
+        self.title_label = ctk.CTkLabel(
             main_frame,
             text=f"{t('history.backup_history')} - {self.job_name}",
             font=ctk.CTkFont(size=18, weight="bold")
-        ).pack(pady=(0, 20))
+        )
+        self.title_label.pack(pady=(0, 20))
         
         # Info frame
         info_frame = ctk.CTkFrame(main_frame)
         info_frame.pack(fill="x", pady=(0, 15))
         
-        ctk.CTkLabel(
+        self.destination_label = ctk.CTkLabel(
             info_frame,
             text=f"{t('history.destination')}: {self.destination_path}",
             font=ctk.CTkFont(size=12)
-        ).pack(padx=15, pady=10, anchor="w")
+        )
+        self.destination_label.pack(side="left", padx=15, pady=10, anchor="w")
+        
+        # Duration and throughput of the job's recent runs
+        self.trend_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color="gray"
+        )
+        self.trend_label.pack(side="left", padx=15, pady=10, anchor="w")
+        
+        # Job selection when more than one job is available
+        if len(self.jobs) > 1:
+            self.job_var = ctk.StringVar(value=self.job_name)
+            ctk.CTkOptionMenu(
+                info_frame,
+                values=[job.name for job in self.jobs],
+                variable=self.job_var,
+                command=self._select_job,
+                width=200
+            ).pack(side="right", padx=15, pady=10)
+        
+        # Search for files across the job's backups
+        search_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        search_frame.pack(fill="x", pady=(0, 10))
+        
+        self.search_entry = ctk.CTkEntry(
+            search_frame,
+            placeholder_text=t("history.search_placeholder")
+        )
+        self.search_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        self.search_entry.bind("<Return>", lambda event: self._search_files())
+        
+        ctk.CTkButton(
+            search_frame,
+            text=t("history.search"),
+            command=self._search_files,
+            width=120
+        ).pack(side="left", padx=5)
         
         # Backups list
         list_frame = ctk.CTkFrame(main_frame)
@@ -82,9 +303,17 @@ class HistoryWindow(ctk.CTkToplevel):
                 font=ctk.CTkFont(size=12, weight="bold")
             ).pack(side="left", expand=True, fill="x", padx=5)
         
-        # Scrollable frame for backups
-        self.backups_frame = ctk.CTkScrollableFrame(list_frame, height=300)
-        self.backups_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        # Virtualized list, only visible rows are created
+        self.backup_list = VirtualList(
+            list_frame,
+            row_height=40,
+            create_row=self._create_backup_row,
+            fetch=self._fetch_backups,
+            empty_text=t("history.no_backups"),
+            fg_color="transparent",
+            height=300
+        )
+        self.backup_list.pack(fill="both", expand=True, padx=10, pady=(0, 10))
         
         # Buttons
         buttons_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
@@ -111,174 +340,168 @@ class HistoryWindow(ctk.CTkToplevel):
             width=120
         ).pack(side="right", padx=5)
     
-    def _load_backups(self):
-        """Load backup history."""
-        # Clear existing
-        for widget in self.backups_frame.winfo_children():
-            widget.destroy()
-        
-        self.backups = []
-        
-        # Get job folder
-        dest = Path(self.destination_path)
-        
-        # Sanitize job name
-        folder_name = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in self.job_name)
-        folder_name = folder_name.strip().replace(' ', '_')
-        
-        job_folder = dest / folder_name
-        
-        if not job_folder.exists():
-            ctk.CTkLabel(
-                self.backups_frame,
-                text=t("history.no_backups"),
-                font=ctk.CTkFont(size=14)
-            ).pack(pady=50)
+    def _job_folder(self) -> Path:
+        """Get the folder holding the backups of the current job."""
+        return Path(self.destination_path) / job_folder_name(self.job_name)
+    
+    def _select_job(self, job_name: str):
+        """Switch the window to another job."""
+        job = next((job for job in self.jobs if job.name == job_name), None)
+        if job is None:
             return
         
-        # Find all backup files and metadata
-        backup_files = []
+        self.job_name = job.name
+        self.job_id = job.job_id
+        self.destination_path = job.destination_path
         
-        # Find ZIP files
-        for zip_file in job_folder.glob("backup_*.zip"):
-            timestamp = zip_file.stem.replace("backup_", "")
-            metadata_file = job_folder / f"backup_{timestamp}_metadata.json"
+        self.title(f"{t('history.title')} - {job.name}")
+        self.title_label.configure(text=f"{t('history.backup_history')} - {job.name}")
+        self.destination_label.configure(text=f"{t('history.destination')}: {job.destination_path}")
+        self._load_backups()
+    
+    def _load_backups(self):
+        """
+        Load backup history.
+        
+        Cached runs from the catalog are shown at once; reconciling them
+        with the destination happens in a background thread, so slow or
+        network destinations never block the window.
+        """
+        # Results of an earlier load are ignored from now on
+        self._generation += 1
+        self._existence = {}
+        job_folder = self._job_folder()
+        
+        # Rows are fetched page by page while scrolling
+        self.backup_list.set_count(get_catalog().count_runs(job_folder=job_folder))
+        self._show_trends()
+        
+        threading.Thread(
+            target=self._reconcile_backups,
+            args=(self._generation, job_folder, self.job_id, self.job_name),
+            daemon=True
+        ).start()
+    
+    def _reconcile_backups(self, generation: int, job_folder: Path, job_id: Optional[str], job_name: str):
+        """Reconcile the catalog with the destination (runs in a worker thread)."""
+        try:
+            catalog = get_catalog()
             
-            metadata = {}
-            if metadata_file.exists():
-                try:
-                    with open(metadata_file, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
-                except:
-                    pass
+            # An unreachable destination must not wipe the cached history
+            if job_folder.exists() and catalog.sync_folder(job_folder, job_id, job_name):
+                self._updates.put((generation, "count", catalog.count_runs(job_folder=job_folder)))
             
-            backup_files.append({
-                "path": str(zip_file),
-                "timestamp": timestamp,
-                "metadata": metadata,
-                "type": "ZIP"
-            })
-        
-        # Find backup folders
-        for backup_dir in job_folder.glob("backup_*"):
-            if backup_dir.is_dir():
-                timestamp = backup_dir.name.replace("backup_", "")
-                metadata_file = job_folder / f"backup_{timestamp}_metadata.json"
-                
-                metadata = {}
-                if metadata_file.exists():
-                    try:
-                        with open(metadata_file, 'r', encoding='utf-8') as f:
-                            metadata = json.load(f)
-                    except:
-                        pass
-                
-                backup_files.append({
-                    "path": str(backup_dir),
-                    "timestamp": timestamp,
-                    "metadata": metadata,
-                    "type": "Folder"
-                })
-        
-        # Sort by timestamp (newest first)
-        backup_files.sort(key=lambda x: x["timestamp"], reverse=True)
-        self.backups = backup_files
-        
-        if not backup_files:
-            ctk.CTkLabel(
-                self.backups_frame,
-                text=t("history.no_backups"),
-                font=ctk.CTkFont(size=14)
-            ).pack(pady=50)
+            # Stream existence checks in batches, newest backups first
+            offset = 0
+            while generation == self._generation:
+                runs = catalog.get_runs(job_folder=job_folder, limit=EXISTS_BATCH_SIZE, offset=offset)
+                if not runs:
+                    break
+                self._updates.put((generation, "exists", {
+                    run["timestamp"]: bool(run["destination"]) and (job_folder / Path(run["destination"]).name).exists()
+                    for run in runs
+                }))
+                offset += len(runs)
+        except Exception as e:
+            self._updates.put((generation, "error", str(e)))
+    
+    def _show_trends(self):
+        """Show duration and throughput trends of the current job."""
+        trends = run_trends(get_job_manager().get_runs(self.job_id, TREND_RUNS)) if self.job_id else {}
+        if not trends:
+            self.trend_label.configure(text="")
             return
         
-        # Display backups
-        for backup in backup_files:
-            self._create_backup_row(backup)
+        text = f"{t('history.duration_trend')}: {trends['duration_line']} ({trends['last_duration']:.0f} s)"
+        if trends["last_throughput"] is not None:
+            text += (
+                f"   {t('history.throughput_trend')}: {trends['throughput_line']} "
+                f"({trends['last_throughput']:.1f} MB/s)"
+            )
+        self.trend_label.configure(text=text)
     
-    def _create_backup_row(self, backup: Dict[str, Any]):
-        """Create a row for a backup."""
-        row_frame = ctk.CTkFrame(self.backups_frame)
-        row_frame.pack(fill="x", pady=2, padx=5)
+    def _poll_updates(self):
+        """Apply results streamed by the background loader."""
+        if not self.winfo_exists():
+            return
         
-        # Parse timestamp
+        changed = False
         try:
-            dt = datetime.strptime(backup["timestamp"], "%Y%m%d_%H%M%S")
-            date_str = dt.strftime("%d.%m.%Y %H:%M")
-        except:
-            date_str = backup["timestamp"]
-        
-        # Get metadata
-        metadata = backup.get("metadata", {})
-        files_count = metadata.get("total_files", "?")
-        size_mb = metadata.get("total_size", 0) / (1024 * 1024)
-        
-        # Date
-        ctk.CTkLabel(
-            row_frame,
-            text=date_str,
-            font=ctk.CTkFont(size=11)
-        ).pack(side="left", expand=True, fill="x", padx=5)
-        
-        # Type
-        ctk.CTkLabel(
-            row_frame,
-            text=backup["type"],
-            font=ctk.CTkFont(size=11)
-        ).pack(side="left", expand=True, fill="x", padx=5)
-        
-        # Files
-        ctk.CTkLabel(
-            row_frame,
-            text=str(files_count),
-            font=ctk.CTkFont(size=11)
-        ).pack(side="left", expand=True, fill="x", padx=5)
-        
-        # Size
-        ctk.CTkLabel(
-            row_frame,
-            text=f"{size_mb:.1f} MB",
-            font=ctk.CTkFont(size=11)
-        ).pack(side="left", expand=True, fill="x", padx=5)
-        
-        # Status
-        status = "✓ OK" if Path(backup["path"]).exists() else "✗ Missing"
-        ctk.CTkLabel(
-            row_frame,
-            text=status,
-            font=ctk.CTkFont(size=11),
-            text_color="green" if "✓" in status else "red"
-        ).pack(side="left", expand=True, fill="x", padx=5)
-        
-        # Actions
-        actions_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
-        actions_frame.pack(side="left", expand=True, fill="x", padx=5)
-        
-        ctk.CTkButton(
-            actions_frame,
-            text="📂",
-            command=lambda: self._open_backup(backup["path"]),
-            width=40,
-            height=28
-        ).pack(side="left", padx=2)
-        
-        ctk.CTkButton(
-            actions_frame,
-            text="↻",
-            command=lambda: self._restore_backup(backup),
-            width=40,
-            height=28
-        ).pack(side="left", padx=2)
-        
-        ctk.CTkButton(
-            actions_frame,
-            text="🗑",
-            command=lambda: self._delete_backup(backup),
-            width=40,
-            height=28,
-            fg_color="#e74c3c",
-            hover_color="#c0392b"
-        ).pack(side="left", padx=2)
+            while True:
+                generation, kind, value = self._updates.get_nowait()
+                if generation != self._generation:
+                    continue
+                if kind == "count":
+                    self.backup_list.set_count(value)
+                elif kind == "exists":
+                    self._existence.update(value)
+                    changed = True
+                elif kind == "error":
+                    get_logger().warning(f"Loading backup history failed: {value}")
+        except queue.Empty:
+            pass
+        
+        if changed:
+            self.backup_list.refresh()
+        self.after(POLL_INTERVAL_MS, self._poll_updates)
+    
+    def _fetch_backups(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Fetch one page of backups from the catalog, newest first."""
+        job_folder = self._job_folder()
+        backups = []
+        for run in get_catalog().get_runs(job_folder=job_folder, limit=limit, offset=offset):
+            # Failed runs left no backup behind
+            destination = run["destination"]
+            backups.append({
+                "path": str(job_folder / Path(destination).name) if destination else None,
+                "timestamp": run["timestamp"],
+                "metadata": run,
+                "type": "ZIP" if run["compression"] else "Folder",
+                "exists": self._existence.get(run["timestamp"])
+            })
+        return backups
+    
+    def _search_files(self):
+        """Search the catalog for files in the current job's backups."""
+        pattern = self.search_entry.get().strip()
+        if not pattern:
+            return
+        mode = "glob" if _GLOB_CHARS & set(pattern) else "substring"
+        job_folder = self._job_folder()
+        
+        def run_search():
+            try:
+                versions = get_catalog().search_files(pattern, mode, job_folder=job_folder, limit=SEARCH_LIMIT)
+                self.after(0, lambda: self._show_search_results(pattern, versions))
+            except Exception as e:
+                error = str(e)
+                self.after(0, lambda: messagebox.showerror(
+                    t("app_title"),
+                    f"{t('history.search_failed')}\n\n{error}"
+                ))
+        
+        threading.Thread(target=run_search, daemon=True).start()
+    
+    def _show_search_results(self, pattern: str, versions: List[Dict[str, Any]]):
+        """Show the files found by a search."""
+        if not versions:
+            messagebox.showinfo(
+                t("app_title"),
+                t("history.search_no_results")
+            )
+            return
+        SearchResultsWindow(self, pattern, versions)
+    
+    def _create_backup_row(self, parent) -> BackupRow:
+        """Create a pooled row widget for the history list."""
+        return BackupRow(
+            parent,
+            on_open=self._open_backup,
+            on_restore=self._restore_backup,
+            on_verify=self._verify_backup,
+            on_compare=self._compare_backup,
+            on_delete=self._delete_backup
+        )
     
     def _open_backup(self, path: str):
         """Open backup location."""
@@ -299,7 +522,16 @@ class HistoryWindow(ctk.CTkToplevel):
             )
     
     def _restore_backup(self, backup: Dict[str, Any]):
-        """Restore backup to a location."""
+        """Restore a backup, or only some of its files, to a location."""
+        # Paths or glob patterns separated by ";", empty for everything
+        answer = ctk.CTkInputDialog(
+            title=t("history.restore"),
+            text=t("history.restore_patterns_prompt")
+        ).get_input()
+        if answer is None:
+            return
+        patterns = [pattern.strip() for pattern in answer.split(";") if pattern.strip()]
+        
         # Ask for restore location
         restore_path = filedialog.askdirectory(
             title=t("history.select_restore_location")
@@ -315,14 +547,204 @@ class HistoryWindow(ctk.CTkToplevel):
         ):
             return
         
-        # TODO: Implement restore functionality
+        # Run restore in background with progress dialog
+        from gui.progress_dialog import ProgressDialog
+        
+        progress_dialog = ProgressDialog(self, f"{t('restore.title')} - {self.job_name}")
+        progress_dialog.grab_set()
+        engine = RestoreEngine()
+        # Restored files are re-hashed against the backup's Merkle tree
+        verify = get_config().get("verify_restores", True)
+        
+        def update_progress(progress):
+            if progress_dialog.is_cancelled:
+                engine.cancel_restore()
+                return
+            
+            if progress_dialog.is_paused:
+                engine.pause_restore()
+            else:
+                engine.resume_restore()
+            
+            # Update UI in main thread
+            self.after(0, lambda: progress_dialog.update_progress(progress))
+        
+        def run_restore():
+            try:
+                if backup["metadata"].get("base_backup"):
+                    # Incremental and differential backups are restored with their chain
+                    result = engine.restore_point_in_time(
+                        Path(backup["path"]).parent,
+                        datetime.strptime(backup["timestamp"], TIMESTAMP_FORMAT),
+                        restore_path,
+                        progress_callback=update_progress,
+                        verify=verify,
+                        patterns=patterns
+                    )
+                elif patterns:
+                    # Located through the backup's member index
+                    result = engine.restore_selected(
+                        backup["path"],
+                        patterns,
+                        restore_path,
+                        progress_callback=update_progress,
+                        verify=verify
+                    )
+                else:
+                    result = engine.restore(
+                        backup["path"],
+                        restore_path,
+                        progress_callback=update_progress,
+                        verify=verify
+                    )
+                if result["cancelled"]:
+                    return
+                
+                success = not result["errors"]
+                message = "\n".join(result["errors"][:10])
+                if success and patterns and not result["restored_files"]:
+                    success, message = False, t("history.restore_no_match")
+                self.after(0, lambda: progress_dialog.show_restore_completion(success, message))
+            except Exception as e:
+                error = str(e)
+                self.after(0, lambda: progress_dialog.show_restore_completion(False, error))
+        
+        threading.Thread(target=run_restore, daemon=True).start()
+    
+    def _verify_backup(self, backup: Dict[str, Any]):
+        """Verify backup integrity in the background."""
+        if not Path(backup["path"]).exists():
+            messagebox.showerror(
+                t("app_title"),
+                t("history.backup_not_found")
+            )
+            return
+        
+        # Yes = deep (re-hash contents), No = quick (sizes and CRCs only)
+        answer = messagebox.askyesnocancel(
+            t("app_title"),
+            t("history.verify_mode_prompt")
+        )
+        if answer is None:
+            return
+        mode = "deep" if answer else "quick"
+        
+        max_mbps = get_config().get("verify_max_mbps", 0)
+        
+        def run_verify():
+            try:
+                result = BackupEngine().verify_backup(
+                    backup["path"],
+                    mode=mode,
+                    max_bytes_per_second=max_mbps * 1024 * 1024
+                )
+                self.after(0, lambda: self._show_verify_result(result))
+            except Exception as e:
+                error = str(e)
+                self.after(0, lambda: messagebox.showerror(
+                    t("app_title"),
+                    f"{t('history.verify_failed')}\n\n{error}"
+                ))
+        
+        threading.Thread(target=run_verify, daemon=True).start()
+    
+    def _show_verify_result(self, result: Dict[str, Any]):
+        """Show verification result."""
+        if result["ok"]:
+            messagebox.showinfo(
+                t("app_title"),
+                f"{t('history.verify_ok')}\n\n"
+                f"{t('history.files')}: {result['checked_files']}"
+            )
+            return
+        
+        # List the first problems per file
+        problems = [f"{m['path']}: {m['reason']}" for m in result["mismatches"]]
+        problems += [f"{path}: {t('history.verify_missing')}" for path in result["missing"]]
+        problems += result["errors"]
+        details = "\n".join(problems[:15])
+        if len(problems) > 15:
+            details += f"\n... (+{len(problems) - 15})"
+        
+        messagebox.showerror(
+            t("app_title"),
+            f"{t('history.verify_problems')}\n\n{details}"
+        )
+    
+    def _compare_backup(self, backup: Dict[str, Any]):
+        """Show the files added, removed and changed since the previous backup."""
+        job_folder = Path(backup["path"]).parent
+        timestamp = backup["timestamp"]
+        
+        def run_compare():
+            try:
+                previous = [
+                    metadata for metadata in list_backups(job_folder)
+                    if metadata["timestamp"] < timestamp and not metadata.get("cancelled")
+                ]
+                if not previous:
+                    self.after(0, lambda: messagebox.showinfo(
+                        t("app_title"),
+                        t("history.compare_no_previous")
+                    ))
+                    return
+                # Only directories whose Merkle hashes differ are visited
+                diff = compare_backups(job_folder, previous[-1]["timestamp"], timestamp)
+                self.after(0, lambda: self._show_compare_result(previous[-1]["timestamp"], diff))
+            except Exception as e:
+                error = str(e)
+                self.after(0, lambda: messagebox.showerror(
+                    t("app_title"),
+                    f"{t('history.compare_failed')}\n\n{error}"
+                ))
+        
+        threading.Thread(target=run_compare, daemon=True).start()
+    
+    def _show_compare_result(self, previous_timestamp: str, diff: Dict[str, List[str]]):
+        """Show the differences between a backup and the previous one."""
+        try:
+            date_str = datetime.strptime(previous_timestamp, TIMESTAMP_FORMAT).strftime("%d.%m.%Y %H:%M")
+        except ValueError:
+            date_str = previous_timestamp
+        
+        if not any(diff.values()):
+            messagebox.showinfo(
+                t("app_title"),
+                f"{t('history.compare_since')} {date_str}\n\n{t('history.compare_identical')}"
+            )
+            return
+        
+        lines = []
+        for kind in ("added", "removed", "changed"):
+            if diff[kind]:
+                lines.append(f"{t('history.compare_' + kind)}: {len(diff[kind])}")
+                lines.extend(f"    {path}" for path in diff[kind][:5])
+                if len(diff[kind]) > 5:
+                    lines.append(f"    ... (+{len(diff[kind]) - 5})")
+        
         messagebox.showinfo(
             t("app_title"),
-            t("history.restore_not_implemented")
+            f"{t('history.compare_since')} {date_str}\n\n" + "\n".join(lines)
         )
     
     def _delete_backup(self, backup: Dict[str, Any]):
         """Delete a backup."""
+        # Failed runs left no backup behind
+        if backup["path"] is None:
+            return
+        
+        backup_path = Path(backup["path"])
+        timestamp = backup["timestamp"]
+        job_folder = backup_path.parent
+        
+        # Incremental and differential backups cannot be restored without their base
+        if dependents(list_backups(job_folder), timestamp):
+            messagebox.showerror(
+                t("app_title"),
+                t("history.delete_has_dependents")
+            )
+            return
+        
         if not messagebox.askyesno(
             t("app_title"),
             t("history.confirm_delete")
@@ -330,21 +752,9 @@ class HistoryWindow(ctk.CTkToplevel):
             return
         
         try:
-            backup_path = Path(backup["path"])
-            
-            # Delete backup file/folder
-            if backup_path.is_file():
-                backup_path.unlink()
-            elif backup_path.is_dir():
-                import shutil
-                shutil.rmtree(backup_path)
-            
-            # Delete metadata file
-            timestamp = backup["timestamp"]
-            job_folder = backup_path.parent
-            metadata_file = job_folder / f"backup_{timestamp}_metadata.json"
-            if metadata_file.exists():
-                metadata_file.unlink()
+            # Delete the backup with its manifest, Merkle tree, index and metadata
+            delete_backup(job_folder, {"timestamp": timestamp, "destination": str(backup_path)})
+            get_catalog().delete_run(job_folder, timestamp)
             
             messagebox.showinfo(
                 t("app_title"),
@@ -364,12 +774,7 @@ class HistoryWindow(ctk.CTkToplevel):
         """Open destination folder."""
         import subprocess
         dest = Path(self.destination_path)
-        
-        # Sanitize job name
-        folder_name = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in self.job_name)
-        folder_name = folder_name.strip().replace(' ', '_')
-        
-        job_folder = dest / folder_name
+        job_folder = self._job_folder()
         
         if job_folder.exists():
             subprocess.run(['explorer', str(job_folder)])
@@ -5,6 +5,10 @@ import customtkinter as ctk
 from tkinter import filedialog, messagebox
 from typing import Optional, Callable
 from core.job_manager import BackupJob, get_job_manager
+from core.job_schema import PRIORITIES, VERIFY_MODES, JobValidationError
+from core.schedules import CATCH_UP_POLICIES
+from core.hashing import SUPPORTED_ALGORITHMS
+from core.retention import RETENTION_BUCKET_RULES
 from utils.i18n import t
 from pathlib import Path
 
@@ -49,14 +53,23 @@ class JobEditorWindow(ctk.CTkToplevel):
             "backup_type": job.backup_type if job else "full",
             "schedule_type": job.schedule.get("type", "manual") if job else "manual",
             "schedule_time": job.schedule.get("time", "00:00") if job else "00:00",
+            "schedule_expression": job.schedule.get("expression", "") if job else "",
+            "schedule_timezone": job.schedule.get("timezone", "") if job else "",
+            "schedule_catch_up": job.schedule.get("catch_up", "default") if job else "default",
             "include_ext": ",".join(job.filters.get("include_extensions", [])) if job else "",
             "exclude_ext": ",".join(job.filters.get("exclude_extensions", [])) if job else "",
             "min_size": str(job.filters.get("min_size_mb", 0)) if job else "0",
             "max_size": str(job.filters.get("max_size_mb", 0)) if job else "0",
             "compression": job.compression if job else True,
             "encryption": job.encryption if job else False,
+            "hash_algorithm": job.hash_algorithm if job else "sha256",
+            "priority": job.priority if job else "normal",
+            "depends_on": job.depends_on.copy() if job else [],
+            "verify_after": job.verify_after if job else "none",
             "enabled": job.enabled if job else True,
         }
+        for rule in RETENTION_BUCKET_RULES:
+            self.step_data[rule] = str(job.retention.get(rule, 0)) if job else "0"
         
         # Create UI
         self._create_ui()
@@ -316,6 +329,40 @@ class JobEditorWindow(ctk.CTkToplevel):
             variable=self.schedule_type_var,
             value="monthly"
         ).pack(anchor="w", pady=5, padx=15)
+        
+        ctk.CTkRadioButton(
+            self.content_frame,
+            text="Cron Expression",
+            variable=self.schedule_type_var,
+            value="cron"
+        ).pack(anchor="w", pady=5, padx=15)
+        
+        # Cron expression, e.g. "0 2,14 * * mon-fri" or "0 3 L * *"
+        cron_frame = ctk.CTkFrame(self.content_frame, fg_color="transparent")
+        cron_frame.pack(fill="x", pady=10, padx=15)
+        
+        ctk.CTkLabel(cron_frame, text="Expression:").pack(side="left", padx=10)
+        self.cron_entry = ctk.CTkEntry(cron_frame, width=180, placeholder_text="0 2 * * mon-fri")
+        self.cron_entry.insert(0, self.step_data["schedule_expression"])
+        self.cron_entry.pack(side="left")
+        
+        ctk.CTkLabel(cron_frame, text="Time Zone:").pack(side="left", padx=10)
+        self.timezone_entry = ctk.CTkEntry(cron_frame, width=160, placeholder_text="Europe/Zagreb")
+        self.timezone_entry.insert(0, self.step_data["schedule_timezone"])
+        self.timezone_entry.pack(side="left")
+        
+        # Runs missed while the computer was off or the service stopped
+        catch_up_frame = ctk.CTkFrame(self.content_frame, fg_color="transparent")
+        catch_up_frame.pack(fill="x", pady=10, padx=15)
+        
+        ctk.CTkLabel(catch_up_frame, text="Missed Runs:").pack(side="left", padx=10)
+        self.catch_up_var = ctk.StringVar(value=self.step_data["schedule_catch_up"])
+        ctk.CTkOptionMenu(
+            catch_up_frame,
+            values=["default", *CATCH_UP_POLICIES],
+            variable=self.catch_up_var,
+            width=120
+        ).pack(side="left")
     
     def _create_filters_step(self):
         """Create filters step."""
@@ -377,6 +424,78 @@ class JobEditorWindow(ctk.CTkToplevel):
             variable=self.compression_var
         ).pack(anchor="w", pady=10, padx=15)
         
+        # Checksum algorithm
+        hash_frame = ctk.CTkFrame(self.content_frame, fg_color="transparent")
+        hash_frame.pack(fill="x", pady=10, padx=15)
+        
+        ctk.CTkLabel(hash_frame, text="Checksum Algorithm:").pack(side="left", padx=(0, 10))
+        self.hash_algorithm_var = ctk.StringVar(value=self.step_data["hash_algorithm"])
+        ctk.CTkOptionMenu(
+            hash_frame,
+            values=list(SUPPORTED_ALGORITHMS),
+            variable=self.hash_algorithm_var,
+            width=120
+        ).pack(side="left")
+        
+        # Priority when several jobs are due at once
+        priority_frame = ctk.CTkFrame(self.content_frame, fg_color="transparent")
+        priority_frame.pack(fill="x", pady=10, padx=15)
+        
+        ctk.CTkLabel(priority_frame, text="Priority:").pack(side="left", padx=(0, 10))
+        self.priority_var = ctk.StringVar(value=self.step_data["priority"])
+        ctk.CTkOptionMenu(
+            priority_frame,
+            values=list(PRIORITIES),
+            variable=self.priority_var,
+            width=120
+        ).pack(side="left")
+        
+        # Verification of each new backup
+        verify_frame = ctk.CTkFrame(self.content_frame, fg_color="transparent")
+        verify_frame.pack(fill="x", pady=10, padx=15)
+        
+        ctk.CTkLabel(verify_frame, text="Verify After Backup:").pack(side="left", padx=(0, 10))
+        self.verify_after_var = ctk.StringVar(value=self.step_data["verify_after"])
+        ctk.CTkOptionMenu(
+            verify_frame,
+            values=list(VERIFY_MODES),
+            variable=self.verify_after_var,
+            width=120
+        ).pack(side="left")
+        
+        # Upstream jobs; the job starts once all of them have completed
+        other_jobs = [
+            other for other in self.job_manager.get_all_jobs()
+            if not self.job or other.job_id != self.job.job_id
+        ]
+        if other_jobs:
+            ctk.CTkLabel(
+                self.content_frame,
+                text="Run After Jobs (starts when all selected jobs have completed):",
+                font=ctk.CTkFont(size=12)
+            ).pack(anchor="w", pady=(10, 5), padx=15)
+            
+            depends_frame = ctk.CTkScrollableFrame(self.content_frame, height=100)
+            depends_frame.pack(fill="x", pady=(0, 10), padx=15)
+            self.depends_on_vars = {}
+            for other in other_jobs:
+                var = ctk.BooleanVar(value=other.job_id in self.step_data["depends_on"])
+                ctk.CTkCheckBox(depends_frame, text=other.name, variable=var).pack(anchor="w", pady=2)
+                self.depends_on_vars[other.job_id] = var
+        
+        # Retention (grandfather-father-son)
+        retention_frame = ctk.CTkFrame(self.content_frame, fg_color="transparent")
+        retention_frame.pack(fill="x", pady=10, padx=15)
+        
+        ctk.CTkLabel(retention_frame, text="Keep Backups:").pack(side="left", padx=(0, 10))
+        self.retention_entries = {}
+        for rule in RETENTION_BUCKET_RULES:
+            ctk.CTkLabel(retention_frame, text=rule[len("keep_"):].capitalize()).pack(side="left", padx=5)
+            entry = ctk.CTkEntry(retention_frame, width=50, placeholder_text="0")
+            entry.insert(0, self.step_data[rule])
+            entry.pack(side="left", padx=5)
+            self.retention_entries[rule] = entry
+        
         # Encryption
         self.encryption_var = ctk.BooleanVar(value=self.step_data["encryption"])
         ctk.CTkCheckBox(
@@ -461,6 +580,12 @@ class JobEditorWindow(ctk.CTkToplevel):
                     self.step_data["schedule_type"] = self.schedule_type_var.get()
                 if hasattr(self, 'time_entry'):
                     self.step_data["schedule_time"] = self.time_entry.get()
+                if hasattr(self, 'cron_entry'):
+                    self.step_data["schedule_expression"] = self.cron_entry.get().strip()
+                if hasattr(self, 'timezone_entry'):
+                    self.step_data["schedule_timezone"] = self.timezone_entry.get().strip()
+                if hasattr(self, 'catch_up_var'):
+                    self.step_data["schedule_catch_up"] = self.catch_up_var.get()
             
             elif step == 2:  # Filters step
                 if hasattr(self, 'include_ext_entry'):
@@ -477,8 +602,21 @@ class JobEditorWindow(ctk.CTkToplevel):
                     self.step_data["compression"] = self.compression_var.get()
                 if hasattr(self, 'encryption_var'):
                     self.step_data["encryption"] = self.encryption_var.get()
+                if hasattr(self, 'hash_algorithm_var'):
+                    self.step_data["hash_algorithm"] = self.hash_algorithm_var.get()
+                if hasattr(self, 'priority_var'):
+                    self.step_data["priority"] = self.priority_var.get()
+                if hasattr(self, 'verify_after_var'):
+                    self.step_data["verify_after"] = self.verify_after_var.get()
+                if hasattr(self, 'depends_on_vars'):
+                    self.step_data["depends_on"] = [
+                        job_id for job_id, var in self.depends_on_vars.items() if var.get()
+                    ]
                 if hasattr(self, 'enabled_var'):
                     self.step_data["enabled"] = self.enabled_var.get()
+                if hasattr(self, 'retention_entries'):
+                    for rule, entry in self.retention_entries.items():
+                        self.step_data[rule] = entry.get()
         except Exception as e:
             print(f"Error saving step data: {e}")
     
@@ -531,6 +669,12 @@ class JobEditorWindow(ctk.CTkToplevel):
             "type": self.step_data["schedule_type"],
             "time": self.step_data["schedule_time"] if self.step_data["schedule_type"] != "manual" else None
         }
+        if self.step_data["schedule_type"] == "cron":
+            schedule_config["expression"] = self.step_data["schedule_expression"]
+            if self.step_data["schedule_timezone"]:
+                schedule_config["timezone"] = self.step_data["schedule_timezone"]
+        if self.step_data["schedule_catch_up"] != "default":
+            schedule_config["catch_up"] = self.step_data["schedule_catch_up"]
         
         filters = {
             "include_extensions": [ext.strip() for ext in self.step_data["include_ext"].split(",") if ext.strip()],
@@ -540,36 +684,65 @@ class JobEditorWindow(ctk.CTkToplevel):
             "exclude_patterns": []
         }
         
-        if self.job:
-            # Update existing job
-            self.job_manager.update_job(
-                self.job.job_id,
-                name=self.step_data["name"],
-                description=self.step_data["description"],
-                source_paths=self.source_paths,
-                destination_path=self.step_data["destination"],
-                backup_type=self.step_data["backup_type"],
-                schedule=schedule_config,
-                filters=filters,
-                compression=self.step_data["compression"],
-                encryption=self.step_data["encryption"],
-                enabled=self.step_data["enabled"]
-            )
-        else:
-            # Create new job
-            new_job = BackupJob(
-                name=self.step_data["name"],
-                description=self.step_data["description"],
-                source_paths=self.source_paths,
-                destination_path=self.step_data["destination"],
-                backup_type=self.step_data["backup_type"],
-                schedule=schedule_config,
-                filters=filters,
-                compression=self.step_data["compression"],
-                encryption=self.step_data["encryption"],
-                enabled=self.step_data["enabled"]
-            )
-            self.job_manager.create_job(new_job)
+        # Only rules with a count are stored; an empty policy falls back to
+        # the global retention age. Rules the editor does not show
+        # (keep_last, keep_within_days) are kept as they are.
+        retention = dict(self.job.retention) if self.job else {}
+        for rule in RETENTION_BUCKET_RULES:
+            try:
+                count = int(self.step_data[rule] or 0)
+            except ValueError:
+                messagebox.showerror("Error", f"Keep {rule[len('keep_'):].capitalize()} must be a whole number")
+                return
+            if count > 0:
+                retention[rule] = count
+            else:
+                retention.pop(rule, None)
+        
+        try:
+            if self.job:
+                # Update existing job
+                self.job_manager.update_job(
+                    self.job.job_id,
+                    name=self.step_data["name"],
+                    description=self.step_data["description"],
+                    source_paths=self.source_paths,
+                    destination_path=self.step_data["destination"],
+                    backup_type=self.step_data["backup_type"],
+                    schedule=schedule_config,
+                    filters=filters,
+                    compression=self.step_data["compression"],
+                    encryption=self.step_data["encryption"],
+                    hash_algorithm=self.step_data["hash_algorithm"],
+                    retention=retention,
+                    priority=self.step_data["priority"],
+                    depends_on=self.step_data["depends_on"],
+                    verify_after=self.step_data["verify_after"],
+                    enabled=self.step_data["enabled"]
+                )
+            else:
+                # Create new job
+                new_job = BackupJob(
+                    name=self.step_data["name"],
+                    description=self.step_data["description"],
+                    source_paths=self.source_paths,
+                    destination_path=self.step_data["destination"],
+                    backup_type=self.step_data["backup_type"],
+                    schedule=schedule_config,
+                    filters=filters,
+                    compression=self.step_data["compression"],
+                    encryption=self.step_data["encryption"],
+                    hash_algorithm=self.step_data["hash_algorithm"],
+                    retention=retention,
+                    priority=self.step_data["priority"],
+                    depends_on=self.step_data["depends_on"],
+                    verify_after=self.step_data["verify_after"],
+                    enabled=self.step_data["enabled"]
+                )
+                self.job_manager.create_job(new_job)
+        except JobValidationError as e:
+            messagebox.showerror("Error", str(e))
+            return
         
         # Callback and close
         if self.on_save:
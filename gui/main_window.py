@@ -6,12 +6,16 @@ from typing import Optional
 from utils.i18n import get_i18n, t
 from utils.theme_manager import get_theme_manager
 from utils.config import get_config
+from utils.logger import get_logger
 from core.job_manager import get_job_manager, BackupJob
 from core.scheduler import BackupScheduler
 from gui.job_editor import JobEditorWindow
 from gui.settings_window import SettingsWindow
+from gui.trends import TREND_RUNS, run_trends
+from gui.virtual_list import VirtualList
 import tkinter as tk
 from tkinter import messagebox
+import threading
 
 
 class DashboardCard(ctk.CTkFrame):
@@ -40,20 +44,30 @@ class DashboardCard(ctk.CTkFrame):
             font=ctk.CTkFont(size=12),
             text_color="gray"
         )
-        self.title_label.pack(pady=(5, 15))
+        self.title_label.pack(pady=(5, 0))
+        
+        self.detail_label = ctk.CTkLabel(
+            self,
+            text="",
+            font=ctk.CTkFont(size=11),
+            text_color="gray"
+        )
+        self.detail_label.pack(pady=(0, 15))
     
-    def update_value(self, value: str):
-        """Update card value."""
+    def update_value(self, value: str, detail: str = None):
+        """Update card value and, if given, the detail line."""
         self.value_label.configure(text=value)
+        if detail is not None:
+            self.detail_label.configure(text=detail)
 
 
 class JobRow(ctk.CTkFrame):
-    """Single job row in the jobs table."""
+    """Reusable row of the jobs table, re-filled for each visible job."""
     
-    def __init__(self, parent, job: BackupJob, on_run, on_edit, on_delete, on_history=None):
+    def __init__(self, parent, on_run, on_edit, on_delete, on_history=None):
         super().__init__(parent, corner_radius=5, fg_color="transparent")
         
-        self.job = job
+        self.job: Optional[BackupJob] = None
         self.on_run = on_run
         self.on_edit = on_edit
         self.on_delete = on_delete
@@ -67,51 +81,39 @@ class JobRow(ctk.CTkFrame):
         self.grid_columnconfigure(4, weight=1)  # Actions
         
         # Name with icon
-        icon = "📁"
         name_frame = ctk.CTkFrame(self, fg_color="transparent")
         name_frame.grid(row=0, column=0, sticky="w", padx=10, pady=5)
         
-        ctk.CTkLabel(
+        self.name_label = ctk.CTkLabel(
             name_frame,
-            text=f"{icon} {job.name}",
+            text="",
             font=ctk.CTkFont(size=13, weight="bold")
-        ).pack(side="left")
+        )
+        self.name_label.pack(side="left")
         
         # Status
-        status_color = self._get_status_color(job.status)
-        status_text = t(f"status.{job.status}")
-        
-        status_label = ctk.CTkLabel(
+        self.status_label = ctk.CTkLabel(
             self,
-            text=f"● {status_text}",
-            text_color=status_color,
+            text="",
             font=ctk.CTkFont(size=12)
         )
-        status_label.grid(row=0, column=1, padx=10, pady=5)
+        self.status_label.grid(row=0, column=1, padx=10, pady=5)
         
         # Last Run
-        last_run = job.last_run if job.last_run else "-"
-        if job.last_run:
-            from datetime import datetime
-            try:
-                dt = datetime.fromisoformat(job.last_run)
-                last_run = dt.strftime("%d.%m. %H:%M")
-            except:
-                pass
-        
-        ctk.CTkLabel(
+        self.last_run_label = ctk.CTkLabel(
             self,
-            text=last_run,
+            text="",
             font=ctk.CTkFont(size=12)
-        ).grid(row=0, column=2, padx=10, pady=5)
+        )
+        self.last_run_label.grid(row=0, column=2, padx=10, pady=5)
         
         # Next Run
-        next_run = job.next_run if job.next_run else "-"
-        ctk.CTkLabel(
+        self.next_run_label = ctk.CTkLabel(
             self,
-            text=next_run,
+            text="",
             font=ctk.CTkFont(size=12)
-        ).grid(row=0, column=3, padx=10, pady=5)
+        )
+        self.next_run_label.grid(row=0, column=3, padx=10, pady=5)
         
         # Actions
         actions_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -121,14 +123,14 @@ class JobRow(ctk.CTkFrame):
             actions_frame,
             text="▶",
             width=30,
-            command=lambda: self.on_run(job.job_id)
+            command=lambda: self.on_run(self.job.job_id)
         ).pack(side="left", padx=2)
         
         ctk.CTkButton(
             actions_frame,
             text="✏",
             width=30,
-            command=lambda: self.on_edit(job.job_id)
+            command=lambda: self.on_edit(self.job.job_id)
         ).pack(side="left", padx=2)
         
         if self.on_history:
@@ -136,7 +138,7 @@ class JobRow(ctk.CTkFrame):
                 actions_frame,
                 text="📜",
                 width=30,
-                command=lambda: self.on_history(job.job_id)
+                command=lambda: self.on_history(self.job.job_id)
             ).pack(side="left", padx=2)
         
         ctk.CTkButton(
@@ -145,15 +147,40 @@ class JobRow(ctk.CTkFrame):
             width=30,
             fg_color="#e74c3c",
             hover_color="#c0392b",
-            command=lambda: self.on_delete(job.job_id)
+            command=lambda: self.on_delete(self.job.job_id)
         ).pack(side="left", padx=2)
     
+    def show(self, job: BackupJob):
+        """Fill the row with a job."""
+        self.job = job
+        
+        icon = "📁"
+        self.name_label.configure(text=f"{icon} {job.name}")
+        
+        self.status_label.configure(
+            text=f"● {t(f'status.{job.status}')}",
+            text_color=self._get_status_color(job.status)
+        )
+        
+        last_run = job.last_run if job.last_run else "-"
+        if job.last_run:
+            from datetime import datetime
+            try:
+                dt = datetime.fromisoformat(job.last_run)
+                last_run = dt.strftime("%d.%m. %H:%M")
+            except:
+                pass
+        self.last_run_label.configure(text=last_run)
+        
+        self.next_run_label.configure(text=job.next_run if job.next_run else "-")
+    
     def _get_status_color(self, status: str) -> str:
         """Get color for status."""
         colors = {
             "ok": "#27ae60",
             "running": "#3498db",
             "paused": "#95a5a6",
+            "cancelled": "#95a5a6",
             "failed": "#e74c3c",
             "warning": "#f39c12",
             "completed": "#27ae60",
@@ -174,6 +201,7 @@ class MainWindow(ctk.CTk):
         self.app_config = get_config()
         self.job_manager = get_job_manager()
         self.scheduler = BackupScheduler(self.job_manager)
+        self._storage_refreshing = False
         
         # Apply saved settings
         self.i18n.set_language(self.app_config.get("language", "hr"))
@@ -233,7 +261,7 @@ class MainWindow(ctk.CTk):
         cards_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
         cards_frame.pack(fill="x", pady=(0, 20))
         
-        cards_frame.grid_columnconfigure((0, 1, 2), weight=1)
+        cards_frame.grid_columnconfigure((0, 1, 2, 3), weight=1)
         
         self.jobs_card = DashboardCard(
             cards_frame,
@@ -259,6 +287,14 @@ class MainWindow(ctk.CTk):
         )
         self.storage_card.grid(row=0, column=2, padx=10, sticky="ew")
         
+        self.throughput_card = DashboardCard(
+            cards_frame,
+            t("dashboard.throughput"),
+            "-",
+            "⚡"
+        )
+        self.throughput_card.grid(row=0, column=3, padx=10, sticky="ew")
+        
         # Jobs section
         jobs_header = ctk.CTkFrame(main_frame, fg_color="transparent")
         jobs_header.pack(fill="x", pady=(0, 10))
@@ -302,9 +338,17 @@ class MainWindow(ctk.CTk):
                 font=ctk.CTkFont(size=12, weight="bold")
             ).grid(row=0, column=i, padx=10, pady=10)
         
-        # Jobs list (scrollable)
-        self.jobs_container = ctk.CTkScrollableFrame(main_frame, height=300)
-        self.jobs_container.pack(fill="both", expand=True)
+        # Jobs list, only visible rows are created
+        self.jobs_list = VirtualList(
+            main_frame,
+            row_height=44,
+            create_row=self._create_job_row,
+            fetch=self.job_manager.get_jobs_page,
+            empty_text=t("messages.no_jobs"),
+            fg_color="transparent",
+            height=300
+        )
+        self.jobs_list.pack(fill="both", expand=True)
         
         # Load jobs
         self._refresh_jobs()
@@ -314,44 +358,82 @@ class MainWindow(ctk.CTk):
     
     def _refresh_jobs(self):
         """Refresh jobs list."""
-        # Clear existing
-        for widget in self.jobs_container.winfo_children():
-            widget.destroy()
-        
-        # Load jobs
-        jobs = self.job_manager.get_all_jobs()
-        
-        if not jobs:
-            no_jobs_label = ctk.CTkLabel(
-                self.jobs_container,
-                text=t("messages.no_jobs"),
-                font=ctk.CTkFont(size=14),
-                text_color="gray"
-            )
-            no_jobs_label.pack(pady=50)
-        else:
-            for job in jobs:
-                job_row = JobRow(
-                    self.jobs_container,
-                    job,
-                    self._run_job,
-                    self._edit_job,
-                    self._delete_job,
-                    self._show_job_history
-                )
-                job_row.pack(fill="x", pady=2)
+        # Rows are pooled and filled page by page while scrolling
+        self.jobs_list.set_count(self.job_manager.count_jobs())
+    
+    def _create_job_row(self, parent) -> JobRow:
+        """Create a pooled row of the jobs list."""
+        return JobRow(
+            parent,
+            self._run_job,
+            self._edit_job,
+            self._delete_job,
+            self._show_job_history
+        )
     
     def _update_statistics(self):
         """Update dashboard statistics."""
-        jobs = self.job_manager.get_all_jobs()
-        running_jobs = self.job_manager.get_jobs_by_status("running")
-        
-        self.jobs_card.update_value(str(len(jobs)))
-        self.active_card.update_value(str(len(running_jobs)))
+        self.jobs_card.update_value(str(self.job_manager.count_jobs()))
+        self.active_card.update_value(str(self.job_manager.count_jobs_by_status("running")))
+        self._show_trends(self.job_manager.get_runs(limit=TREND_RUNS))
+        
+        # Storage statistics read the catalog and the destination volumes,
+        # which may be slow network drives
+        if not self._storage_refreshing:
+            self._storage_refreshing = True
+            threading.Thread(
+                target=self._refresh_storage,
+                args=(self.job_manager.get_all_jobs(),),
+                daemon=True
+            ).start()
         
         # Schedule next update
         self.after(5000, self._update_statistics)
     
+    def _show_trends(self, runs):
+        """
+        Show the throughput trend of recent runs of all jobs on the throughput card.
+        
+        Durations depend on how much each job backs up, so they are only
+        compared per job, in the history window; throughput is already
+        normalized by the bytes read.
+        """
+        trends = run_trends(runs)
+        if not trends or trends["last_throughput"] is None:
+            return
+        
+        self.throughput_card.update_value(
+            f"{trends['last_throughput']:.1f} MB/s",
+            f"{t('dashboard.all_jobs')} {trends['throughput_line']}"
+        )
+    
+    def _refresh_storage(self, jobs):
+        """Compute storage statistics in a background thread."""
+        from core.analytics import storage_overview
+        
+        try:
+            overview = storage_overview(jobs)
+        except Exception as e:
+            get_logger().warning(f"Could not compute storage statistics: {str(e)}")
+            overview = None
+        finally:
+            self._storage_refreshing = False
+        
+        if overview is not None:
+            self.after(0, lambda: self._show_storage(overview))
+    
+    def _show_storage(self, overview):
+        """Show storage statistics on the storage card."""
+        stored_gb = overview["stored_size"] / (1024 ** 3)
+        
+        details = []
+        if overview["compression_ratio"]:
+            details.append(t("dashboard.compression_ratio").format(ratio=overview["compression_ratio"]))
+        if overview["days_until_full"] is not None:
+            details.append(t("dashboard.full_in_days").format(days=int(overview["days_until_full"])))
+        
+        self.storage_card.update_value(f"{stored_gb:.1f} GB", " · ".join(details))
+    
     def _create_new_job(self):
         """Open job editor for new job."""
         editor = JobEditorWindow(self, None, self._on_job_saved)
@@ -376,68 +458,44 @@ class MainWindow(ctk.CTk):
         if not job:
             return
         
+        if self.scheduler.executor.is_active(job_id):
+            messagebox.showinfo(t("app_title"), t("messages.job_already_running"))
+            return
+        
         # Import progress dialog
         from gui.progress_dialog import ProgressDialog
-        from core.backup_engine import BackupEngine
-        import threading
         
         # Create progress dialog
         progress_dialog = ProgressDialog(self, job.name)
         progress_dialog.grab_set()
-        
-        # Run backup in thread
-        def run_backup():
-            try:
-                engine = BackupEngine()
-                
-                # Progress callback
-                def update_progress(progress):
-                    if progress_dialog.is_cancelled:
-                        engine.cancel_backup()
-                        return
-                    
-                    if progress_dialog.is_paused:
-                        engine.pause_backup()
-                    else:
-                        engine.resume_backup()
-                    
-                    # Update UI in main thread
-                    self.after(0, lambda: progress_dialog.update_progress(progress))
-                
-                # Perform backup
-                result = engine.perform_backup(
-                    source_paths=job.source_paths,
-                    destination_path=job.destination_path,
-                    backup_type=job.backup_type,
-                    filters=job.filters,
-                    compression=job.compression,
-                    progress_callback=update_progress,
-                    job_name=job.name
-                )
-                
-                # Update job
-                from datetime import datetime
-                self.job_manager.update_job(
-                    job_id,
-                    status="completed",
-                    last_run=datetime.now().isoformat()
-                )
-                
-                # Show completion
-                self.after(0, lambda: progress_dialog.show_completion(True, ""))
-                self.after(100, self._refresh_jobs)
-                
-            except Exception as e:
-                # Update job status
-                self.job_manager.update_job(job_id, status="failed")
-                
-                # Show error
-                self.after(0, lambda: progress_dialog.show_completion(False, str(e)))
-                self.after(100, self._refresh_jobs)
-        
-        # Start backup thread
-        backup_thread = threading.Thread(target=run_backup, daemon=True)
-        backup_thread.start()
+        executor = self.scheduler.executor
+        
+        # Progress callback
+        def update_progress(progress):
+            if progress_dialog.is_cancelled:
+                executor.cancel(job_id)
+                return
+            
+            if progress_dialog.is_paused:
+                executor.pause(job_id)
+            else:
+                executor.resume(job_id)
+            
+            # Update UI in main thread
+            self.after(0, lambda: progress_dialog.update_progress(progress))
+        
+        def on_complete(job, result):
+            # Show completion
+            self.after(0, lambda: progress_dialog.show_completion(True, ""))
+            self.after(100, self._refresh_jobs)
+        
+        def on_error(job, error):
+            # Show error
+            self.after(0, lambda: progress_dialog.show_completion(False, str(error)))
+            self.after(100, self._refresh_jobs)
+        
+        # The executor runs the backup once the job's devices have a free slot
+        executor.submit(job, progress_callback=update_progress, on_complete=on_complete, on_error=on_error)
     
     def _delete_job(self, job_id: str):
         """Delete a job."""
@@ -473,7 +531,7 @@ class MainWindow(ctk.CTk):
         job = self.job_manager.get_job(job_id)
         if job:
             from gui.history_window import HistoryWindow
-            history = HistoryWindow(self, job.name, job.destination_path)
+            history = HistoryWindow(self, job.name, job.destination_path, jobs=[job])
             history.grab_set()
     
     def _show_history(self):
@@ -488,18 +546,9 @@ class MainWindow(ctk.CTk):
             )
             return
         
-        # If only one job, open it directly
-        if len(jobs) == 1:
-            from gui.history_window import HistoryWindow
-            history = HistoryWindow(self, jobs[0].name, jobs[0].destination_path)
-            history.grab_set()
-            return
-        
-        # Multiple jobs - show selection dialog
+        # Open the first job, the window lets the user switch between jobs
         from gui.history_window import HistoryWindow
-        
-        # For now, open first job (TODO: add job selection dialog)
-        history = HistoryWindow(self, jobs[0].name, jobs[0].destination_path)
+        history = HistoryWindow(self, jobs[0].name, jobs[0].destination_path, jobs=jobs)
         history.grab_set()
     
     def _show_about(self):
@@ -512,6 +561,8 @@ class MainWindow(ctk.CTk):
     def _on_closing(self):
         """Handle window closing."""
         self.scheduler.stop()
+        # Persist batched job status updates before exiting
+        self.job_manager.flush()
         self.destroy()
 
 
@@ -285,3 +285,20 @@ class ProgressDialog(ctk.CTkToplevel):
             )
         
         self.destroy()
+    
+    def show_restore_completion(self, success: bool, message: str):
+        """Show restore completion message."""
+        from tkinter import messagebox
+        
+        if success:
+            messagebox.showinfo(
+                t("app_title"),
+                t("messages.restore_completed")
+            )
+        else:
+            messagebox.showerror(
+                t("app_title"),
+                t("messages.restore_failed") + f"\n\n{message}"
+            )
+        
+        self.destroy()
@@ -0,0 +1,61 @@
+"""
+Text sparklines for run duration and throughput trends.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+
+# Block characters from lowest to highest value
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+# Runs shown in a trend
+TREND_RUNS = 20
+
+
+def sparkline(values: Sequence[float]) -> str:
+    """Render values as a line of block characters scaled between their minimum and maximum."""
+    if not values:
+        return ""
+    low, high = min(values), max(values)
+    if high == low:
+        return SPARK_CHARS[len(SPARK_CHARS) // 2] * len(values)
+    scale = (len(SPARK_CHARS) - 1) / (high - low)
+    return "".join(SPARK_CHARS[round((value - low) * scale)] for value in values)
+
+
+def throughput_mbps(run: Dict[str, Any]) -> Optional[float]:
+    """Get the read throughput of a run's copy phase in MB/s."""
+    copy = (run.get("phases") or {}).get("copy")
+    if copy and copy.get("seconds"):
+        return copy["bytes"] / (1024 * 1024) / copy["seconds"]
+    if run.get("duration_seconds"):
+        return (run.get("bytes_read") or 0) / (1024 * 1024) / run["duration_seconds"]
+    return None
+
+
+def run_trends(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Summarize the duration and throughput of runs.
+    
+    Args:
+        runs: Runs as returned by JobManager.get_runs(), newest first
+    
+    Returns:
+        Dictionary with sparklines (oldest to newest) and the latest
+        duration and throughput, or an empty dictionary without finished runs
+    """
+    # Failed and cancelled runs stopped early, so their times are not comparable
+    finished = [
+        run for run in reversed(runs)
+        if run["outcome"] not in ("failed", "cancelled") and run.get("duration_seconds")
+    ]
+    if not finished:
+        return {}
+    
+    durations = [run["duration_seconds"] for run in finished]
+    throughputs = [value for value in map(throughput_mbps, finished) if value is not None]
+    return {
+        "duration_line": sparkline(durations),
+        "last_duration": durations[-1],
+        "throughput_line": sparkline(throughputs),
+        "last_throughput": throughputs[-1] if throughputs else None,
+    }
@@ -0,0 +1,181 @@
+"""
+Virtualized list widget for long, paged lists.
+"""
+import tkinter
+import customtkinter as ctk
+from collections import OrderedDict
+from typing import Any, Callable, List
+
+
+# Items requested from the data source at a time
+PAGE_SIZE = 100
+
+# Pages kept in memory while scrolling
+MAX_CACHED_PAGES = 10
+
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Scrollable list that only creates widgets for the visible rows.
+    
+    Row widgets are created once, pooled and re-filled while scrolling.
+    Items are requested page by page from a fetch callback, so opening and
+    scrolling the list costs the same for ten items as for ten thousand.
+    """
+    
+    def __init__(
+        self,
+        parent,
+        row_height: int,
+        create_row: Callable[[Any], Any],
+        fetch: Callable[[int, int], List[Any]],
+        empty_text: str = "",
+        **kwargs
+    ):
+        """
+        Args:
+            parent: Parent widget
+            row_height: Height of every row in pixels
+            create_row: Creates a row widget inside the given parent; the
+                widget must provide show(item)
+            fetch: Returns up to limit items starting at offset
+            empty_text: Text shown while the list has no items
+        """
+        super().__init__(parent, **kwargs)
+        
+        self.row_height = row_height
+        self._create_row = create_row
+        self._fetch = fetch
+        self._count = 0
+        self._first = 0
+        self._pages: "OrderedDict[int, List[Any]]" = OrderedDict()
+        self._rows = []
+        
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        
+        self._viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self._viewport.grid(row=0, column=0, sticky="nsew")
+        
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.grid(row=0, column=1, sticky="ns")
+        
+        self._empty_label = ctk.CTkLabel(
+            self._viewport,
+            text=empty_text,
+            font=ctk.CTkFont(size=14)
+        )
+        
+        self._viewport.bind("<Configure>", lambda event: self._layout())
+        self._bind_wheel(self)
+    
+    @property
+    def count(self) -> int:
+        """Number of items in the list."""
+        return self._count
+    
+    @property
+    def visible_rows(self) -> int:
+        """Number of rows that fit in the viewport."""
+        return max(1, self._viewport.winfo_height() // self.row_height)
+    
+    def set_count(self, count: int):
+        """Set the number of items and reload the visible rows."""
+        self._count = max(0, count)
+        self._first = min(self._first, self._max_first())
+        self.refresh()
+    
+    def set_empty_text(self, text: str):
+        """Change the text shown while the list has no items."""
+        self._empty_label.configure(text=text)
+    
+    def refresh(self):
+        """Drop cached pages and re-fill the visible rows."""
+        self._pages.clear()
+        self._render()
+    
+    def scroll_to(self, index: int):
+        """Scroll so the item at index is the first visible row."""
+        index = max(0, min(int(index), self._max_first()))
+        if index != self._first:
+            self._first = index
+            self._render()
+    
+    def _max_first(self) -> int:
+        """Largest valid index of the first visible row."""
+        return max(0, self._count - self.visible_rows)
+    
+    def _layout(self):
+        """Create or hide pooled rows to match the viewport height."""
+        needed = self.visible_rows
+        while len(self._rows) < needed:
+            row = self._create_row(self._viewport)
+            self._bind_wheel(row)
+            self._rows.append(row)
+        self._first = min(self._first, self._max_first())
+        self._render()
+    
+    def _render(self):
+        """Fill the pooled rows with the items currently in view."""
+        for position, row in enumerate(self._rows):
+            item = self._item(self._first + position) if position < self.visible_rows else None
+            if item is None:
+                row.place_forget()
+                continue
+            row.show(item)
+            row.place(x=0, y=position * self.row_height, relwidth=1.0, height=self.row_height)
+        
+        if self._count:
+            self._empty_label.place_forget()
+            last = min(self._count, self._first + self.visible_rows)
+            self._scrollbar.set(self._first / self._count, last / self._count)
+        else:
+            self._empty_label.place(relx=0.5, rely=0.3, anchor="center")
+            self._scrollbar.set(0.0, 1.0)
+    
+    def _item(self, index: int) -> Any:
+        """Get an item, fetching its page when it is not cached."""
+        if index >= self._count:
+            return None
+        
+        page_number = index // PAGE_SIZE
+        page = self._pages.get(page_number)
+        if page is None:
+            page = self._fetch(page_number * PAGE_SIZE, PAGE_SIZE)
+            self._pages[page_number] = page
+            if len(self._pages) > MAX_CACHED_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page_number)
+        
+        offset = index % PAGE_SIZE
+        return page[offset] if offset < len(page) else None
+    
+    def _on_scrollbar(self, action: str, value, unit: str = None):
+        """Handle scrollbar drags and clicks."""
+        if action == "moveto":
+            self.scroll_to(round(float(value) * self._count))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_to(self._first + int(float(value)) * step)
+    
+    def _bind_wheel(self, widget):
+        """
+        Scroll the list with the mouse wheel over a widget and its children.
+        
+        Wheel events are delivered to the widget under the pointer, so each
+        one is bound directly; the bindings go away with the widgets.
+        """
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tkinter.Misc.bind(widget, sequence, self._on_mouse_wheel, add="+")
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
+    
+    def _on_mouse_wheel(self, event):
+        """Scroll by three rows per wheel step."""
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self._first - 3)
+        else:
+            self.scroll_to(self._first + 3)
+        # Keep enclosing scrollable frames from scrolling as well
+        return "break"
@@ -40,10 +40,12 @@ def run_service_mode():
     except KeyboardInterrupt:
         logger.info("Received shutdown signal")
         scheduler.stop()
+        job_manager.flush()
         logger.info("Backup Service stopped")
     except Exception as e:
         logger.error(f"Service error: {str(e)}", exc_info=True)
         scheduler.stop()
+        job_manager.flush()
 
 
 def main():
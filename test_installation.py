@@ -29,7 +29,6 @@ print("\n2. Checking required modules...")
 required_modules = [
     "customtkinter",
     "PIL",
-    "schedule",
     "dotenv",
     "psutil"
 ]
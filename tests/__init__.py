@@ -0,0 +1,23 @@
+"""
+Behavior tests.
+
+Run from the project root with ``python -m pytest tests`` or
+``python -m unittest discover -s tests -t .``. The configuration, log and
+catalog singletons point at a temporary folder, so the tests never touch
+the application's data folder.
+"""
+import atexit
+import shutil
+import tempfile
+from pathlib import Path
+
+import utils.config
+import utils.logger
+import core.catalog
+
+_data_dir = Path(tempfile.mkdtemp(prefix="backup_tests_"))
+atexit.register(shutil.rmtree, _data_dir, ignore_errors=True)
+
+utils.config._config_instance = utils.config.Config(str(_data_dir / "config.json"))
+utils.logger._logger_instance = utils.logger.BackupLogger(log_dir=str(_data_dir / "logs"))
+core.catalog._catalog_instance = core.catalog.BackupCatalog(str(_data_dir / "catalog.db"))
@@ -0,0 +1,106 @@
+"""
+Tests for the backup member index and indexed member reads.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+import zipfile
+from pathlib import Path
+
+from core.backup_index import BackupIndex, IndexedMemberReader
+from core.manifest import ManifestWriter
+
+
+CONTENTS = {
+    "docs/report.txt": b"report " * 1000,
+    "docs/notes.md": b"notes",
+    "img/logo.png": os.urandom(5000),
+}
+
+
+class BackupIndexTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.archive = self.tmp / "backup.zip"
+        with zipfile.ZipFile(self.archive, "w") as zipf:
+            for path, data in CONTENTS.items():
+                compression = zipfile.ZIP_STORED if path.endswith(".png") else zipfile.ZIP_DEFLATED
+                zipf.writestr(path, data, compress_type=compression)
+        self.manifest = self.tmp / "backup.manifest"
+        with ManifestWriter(self.manifest) as writer:
+            for path in sorted(CONTENTS):
+                writer.add(path, len(CONTENTS[path]), 1000.0, f"hash-{path}")
+    
+    def open_index(self, backup_path: Path, manifest: Path = None) -> BackupIndex:
+        index_file = self.tmp / "index.db"
+        self.assertEqual(BackupIndex.build(index_file, backup_path, manifest), [])
+        index = BackupIndex(index_file)
+        self.addCleanup(index.close)
+        return index
+    
+    def test_zip_members_get_manifest_details(self):
+        index = self.open_index(self.archive, self.manifest)
+        self.assertEqual(index.count(), 3)
+        member = index.lookup("/docs/notes.md")
+        self.assertEqual((member.size, member.mtime, member.hash), (5, 1000.0, "hash-docs/notes.md"))
+        self.assertIsNotNone(member.header_offset)
+        self.assertIsNone(index.lookup("docs/missing.txt"))
+    
+    def test_match(self):
+        index = self.open_index(self.archive, self.manifest)
+        
+        def paths(*patterns):
+            return [member.path for member in index.match(patterns)]
+        
+        # Members come back in archive order
+        self.assertEqual(paths("docs/"), ["docs/report.txt", "docs/notes.md"])
+        self.assertEqual(paths("*.md", "img/logo.png", "none.txt"), ["docs/notes.md", "img/logo.png"])
+        self.assertEqual(paths("docs\\*.txt"), ["docs/report.txt"])
+    
+    def test_folder_backup_is_indexed_from_manifest(self):
+        index = self.open_index(self.tmp / "folder_backup", self.manifest)
+        self.assertEqual(index.count(), 3)
+        self.assertIsNone(index.lookup("docs/notes.md").header_offset)
+    
+    def test_duplicate_members_are_reported(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            with zipfile.ZipFile(self.archive, "a") as zipf:
+                zipf.writestr("docs/notes.md", b"newer notes")
+        duplicates = BackupIndex.build(self.tmp / "index.db", self.archive, self.manifest)
+        self.assertEqual(duplicates, ["docs/notes.md"])
+        with BackupIndex(self.tmp / "index.db") as index:
+            self.assertEqual(index.lookup("docs/notes.md").size, len(b"newer notes"))
+    
+    def test_reader_returns_member_contents(self):
+        index = self.open_index(self.archive, self.manifest)
+        with open(self.archive, "rb") as f:
+            for member in index.match(["*"]):
+                with self.subTest(path=member.path):
+                    reader = IndexedMemberReader(f, member)
+                    chunks = list(iter(lambda: reader.read(1000), b""))
+                    self.assertEqual(b"".join(chunks), CONTENTS[member.path])
+                    self.assertTrue(all(len(chunk) <= 1000 for chunk in chunks))
+    
+    def test_reader_detects_corruption(self):
+        index = self.open_index(self.archive, self.manifest)
+        member = index.lookup("img/logo.png")
+        data = bytearray(self.archive.read_bytes())
+        # Flip a byte in the stored member's data
+        data[member.header_offset + 30 + len(member.path) + 100] ^= 0xFF
+        self.archive.write_bytes(bytes(data))
+        with open(self.archive, "rb") as f:
+            with self.assertRaises(zipfile.BadZipFile):
+                IndexedMemberReader(f, member).read()
+        
+        with open(self.archive, "rb") as f:
+            with self.assertRaises(zipfile.BadZipFile):
+                IndexedMemberReader(f, member._replace(header_offset=member.header_offset + 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Tests for the backup catalog's file search.
+"""
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.catalog import BackupCatalog
+from core.manifest import ManifestWriter, manifest_path_for
+
+
+class CatalogSearchTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.catalog = BackupCatalog(str(self.tmp / "catalog.db"))
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.addCleanup(self.catalog.close)
+    
+    def record(self, job: str, timestamp: str, files: dict, deleted=()):
+        """Record a backup of a job holding files (path -> hash) and tombstones."""
+        job_folder = self.tmp / job
+        job_folder.mkdir(exist_ok=True)
+        entries = [(path, digest) for path, digest in files.items()] + [(path, None) for path in deleted]
+        with ManifestWriter(manifest_path_for(job_folder, timestamp)) as writer:
+            for path, digest in sorted(entries):
+                if digest is None:
+                    writer.add_deleted(path)
+                else:
+                    writer.add(path, len(digest), 1.0, digest)
+        self.catalog.record_backup(
+            job_folder,
+            {"timestamp": timestamp, "destination": str(job_folder / f"backup_{timestamp}.zip")},
+            job_name=job
+        )
+        return job_folder
+    
+    def test_search_modes(self):
+        self.record("a", "20260301_020000", {"docs/report.txt": "h1", "docs/notes.md": "h2", "img/Report.png": "h3"})
+        
+        def paths(pattern, mode):
+            return sorted({version["path"] for version in self.catalog.search_files(pattern, mode)})
+        
+        self.assertEqual(paths("docs/", "prefix"), ["docs/notes.md", "docs/report.txt"])
+        self.assertEqual(paths("report", "substring"), ["docs/report.txt", "img/Report.png"])
+        self.assertEqual(paths("*.txt", "glob"), ["docs/report.txt"])
+        self.assertEqual(paths("docs/*.md", "glob"), ["docs/notes.md"])
+        with self.assertRaises(ValueError):
+            self.catalog.search_files("x", "regex")
+    
+    def test_versions_newest_first(self):
+        self.record("a", "20260301_020000", {"docs/report.txt": "h1"})
+        self.record("a", "20260302_020000", {"docs/report.txt": "h2"})
+        self.record("a", "20260303_020000", {}, deleted=["docs/report.txt"])
+        versions = self.catalog.search_files("docs/report.txt", "prefix")
+        self.assertEqual([v["timestamp"] for v in versions], ["20260303_020000", "20260302_020000", "20260301_020000"])
+        self.assertEqual([v["deleted"] for v in versions], [True, False, False])
+        self.assertEqual(versions[1]["hash"], "h2")
+    
+    def test_job_scoped_search_limits_only_that_jobs_paths(self):
+        # Job "a" stores many matching paths that sort before job "b"'s
+        self.record("a", "20260301_020000", {f"data/a{i:02d}.txt": f"a{i}" for i in range(20)})
+        folder_b = self.record("b", "20260301_030000", {"data/b1.txt": "b1", "data/b2.txt": "b2"})
+        
+        for mode, pattern in (("prefix", "data/"), ("substring", "data"), ("glob", "data/*.txt"), ("glob", "*.txt")):
+            with self.subTest(mode=mode, pattern=pattern):
+                versions = self.catalog.search_files(pattern, mode, job_folder=folder_b, limit=2)
+                self.assertEqual(sorted(v["path"] for v in versions), ["data/b1.txt", "data/b2.txt"])
+                self.assertEqual({v["job_name"] for v in versions}, {"b"})
+    
+    def test_limit_counts_distinct_paths(self):
+        self.record("a", "20260301_020000", {f"data/{i}.txt": str(i) for i in range(5)})
+        self.record("a", "20260302_020000", {f"data/{i}.txt": f"{i}'" for i in range(5)})
+        versions = self.catalog.search_files("data/", "prefix", limit=3)
+        self.assertEqual(len({v["path"] for v in versions}), 3)
+        self.assertEqual(len(versions), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+"""
+Tests for incremental and differential chains and point-in-time restore.
+"""
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from core.backup_engine import BackupEngine
+from core.catalog import BackupCatalog
+from core.chain import TIMESTAMP_FORMAT, backup_chain, list_backups
+from core.manifest import manifest_path_for, read_manifest
+from core.restore_engine import RestoreEngine
+
+
+def write(path: Path, text: str):
+    """Write a source file with an mtime the next backup will see as newer."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    later = time.time() + 5
+    os.utime(path, (later, later))
+
+
+def read_tree(root: Path) -> dict:
+    """Get the text of every file below a directory by relative path."""
+    return {
+        path.relative_to(root).as_posix(): path.read_text(encoding="utf-8")
+        for path in root.rglob("*") if path.is_file()
+    }
+
+
+class ChainRestoreTests:
+    """
+    Backs up a changing source as full, incremental, incremental and
+    differential backups, then restores every point in time.
+    """
+    
+    COMPRESSION = True
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = Path(tempfile.mkdtemp())
+        cls.source = cls.tmp / "src"
+        cls.job_folder = cls.tmp / "dest" / "j"
+        engine = BackupEngine(catalog=BackupCatalog(str(cls.tmp / "catalog.db")))
+        cls.states = []
+        
+        def backup(backup_type: str) -> str:
+            result = engine.perform_backup(
+                [str(cls.source)], str(cls.tmp / "dest"), backup_type,
+                compression=cls.COMPRESSION, job_name="j"
+            )
+            cls.states.append((result["timestamp"], read_tree(cls.source)))
+            # Backup timestamps have one-second resolution
+            time.sleep(1.1)
+            return result["timestamp"]
+        
+        write(cls.source / "a.txt", "a1")
+        write(cls.source / "docs" / "b.txt", "b1")
+        write(cls.source / "docs" / "c.txt", "c1")
+        cls.full = backup("full")
+        
+        write(cls.source / "docs" / "b.txt", "b2")
+        (cls.source / "docs" / "c.txt").unlink()
+        write(cls.source / "docs" / "d.txt", "d1")
+        cls.first_incremental = backup("incremental")
+        
+        write(cls.source / "a.txt", "a2")
+        cls.second_incremental = backup("incremental")
+        
+        write(cls.source / "docs" / "d.txt", "d2")
+        cls.differential = backup("differential")
+    
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+    
+    def setUp(self):
+        self.out = Path(tempfile.mkdtemp(dir=self.tmp))
+    
+    def restored(self) -> dict:
+        """Get the restored files by their path inside the source."""
+        root = self.out if self.COMPRESSION else self.out / self.source.name
+        return read_tree(root)
+    
+    def test_chains_resolve_to_their_full_backup(self):
+        backups = list_backups(self.job_folder)
+        
+        def chain(timestamp):
+            return [metadata["timestamp"] for metadata in backup_chain(backups, timestamp)]
+        
+        self.assertEqual(chain(self.full), [self.full])
+        self.assertEqual(chain(self.second_incremental), [self.full, self.first_incremental, self.second_incremental])
+        # A differential is based on the full backup, not the latest incremental
+        self.assertEqual(chain(self.differential), [self.full, self.differential])
+    
+    def test_incremental_stores_changes_and_deletions(self):
+        entries = list(read_manifest(manifest_path_for(self.job_folder, self.first_incremental)))
+        stored = {entry["path"].rsplit("/", 1)[-1] for entry in entries if not entry.get("deleted")}
+        deleted = {entry["path"].rsplit("/", 1)[-1] for entry in entries if entry.get("deleted")}
+        self.assertEqual(stored, {"b.txt", "d.txt"})
+        self.assertEqual(deleted, {"c.txt"})
+    
+    def test_restore_every_point_in_time(self):
+        for timestamp, expected in self.states:
+            with self.subTest(timestamp=timestamp):
+                shutil.rmtree(self.out)
+                result = RestoreEngine().restore_point_in_time(
+                    str(self.job_folder),
+                    datetime.strptime(timestamp, TIMESTAMP_FORMAT),
+                    str(self.out),
+                    verify=True
+                )
+                self.assertEqual(result["errors"], [])
+                self.assertEqual(self.restored(), expected)
+    
+    def test_restore_between_backups_uses_the_earlier_one(self):
+        when = datetime.strptime(self.first_incremental, TIMESTAMP_FORMAT).replace(microsecond=500000)
+        result = RestoreEngine().restore_point_in_time(str(self.job_folder), when, str(self.out))
+        self.assertEqual(result["backup_chain"], [self.full, self.first_incremental])
+        self.assertEqual(self.restored(), dict(self.states)[self.first_incremental])
+    
+    def test_point_in_time_restore_of_selected_files(self):
+        prefix = "" if self.COMPRESSION else f"{self.source.name}/"
+        result = RestoreEngine().restore_point_in_time(
+            str(self.job_folder),
+            datetime.strptime(self.second_incremental, TIMESTAMP_FORMAT),
+            str(self.out),
+            verify=True,
+            patterns=[f"{prefix}docs/*"]
+        )
+        self.assertEqual(result["errors"], [])
+        self.assertEqual(self.restored(), {"docs/b.txt": "b2", "docs/d.txt": "d1"})
+    
+    def test_restore_selected_from_full_backup(self):
+        prefix = "" if self.COMPRESSION else f"{self.source.name}/"
+        result = RestoreEngine().restore_selected(
+            self.backup_path(self.full), [f"{prefix}docs/*.txt"], str(self.out), verify=True
+        )
+        self.assertEqual(result["errors"], [])
+        self.assertEqual(self.restored(), {"docs/b.txt": "b1", "docs/c.txt": "c1"})
+    
+    def test_verified_selected_restore_of_incremental(self):
+        prefix = "" if self.COMPRESSION else f"{self.source.name}/"
+        result = RestoreEngine().restore_selected(
+            self.backup_path(self.second_incremental), [f"{prefix}*.txt"], str(self.out), verify=True
+        )
+        self.assertEqual(result["errors"], [])
+        self.assertEqual(self.restored(), {"a.txt": "a2"})
+    
+    def backup_path(self, timestamp: str) -> str:
+        return next(m["destination"] for m in list_backups(self.job_folder) if m["timestamp"] == timestamp)
+    
+    def test_verified_restore_of_incremental_checks_only_its_own_files(self):
+        result = RestoreEngine().restore(self.backup_path(self.first_incremental), str(self.out), verify=True)
+        self.assertEqual(result["errors"], [])
+        self.assertEqual(self.restored(), {"docs/b.txt": "b2", "docs/d.txt": "d1"})
+
+
+class ZipChainRestoreTest(ChainRestoreTests, unittest.TestCase):
+    COMPRESSION = True
+
+
+class FolderChainRestoreTest(ChainRestoreTests, unittest.TestCase):
+    COMPRESSION = False
+
+
+if __name__ == "__main__":
+    unittest.main()
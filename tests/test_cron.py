@@ -0,0 +1,96 @@
+"""
+Tests for cron expression matching and cron schedule validation.
+"""
+import unittest
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from core.cron import CronError, next_fire_cron
+from core.job_manager import BackupJob
+from core.job_schema import JobValidationError
+
+
+def local(zone: str, *fields) -> datetime:
+    """Get a wall-clock time in a zone as naive local time."""
+    return datetime(*fields, tzinfo=ZoneInfo(zone)).astimezone().replace(tzinfo=None)
+
+
+class CronMatchingTest(unittest.TestCase):
+    
+    def test_step_minutes(self):
+        self.assertEqual(
+            next_fire_cron("*/15 * * * *", datetime(2026, 3, 2, 10, 7, 30)),
+            datetime(2026, 3, 2, 10, 15)
+        )
+    
+    def test_fire_time_is_strictly_after_reference(self):
+        self.assertEqual(
+            next_fire_cron("0 2 * * *", datetime(2026, 3, 2, 2, 0)),
+            datetime(2026, 3, 3, 2, 0)
+        )
+    
+    def test_weekday_range_skips_weekend(self):
+        # 6 March 2026 is a Friday
+        self.assertEqual(
+            next_fire_cron("0 2,14 * * mon-fri", datetime(2026, 3, 6, 15, 0)),
+            datetime(2026, 3, 9, 2, 0)
+        )
+    
+    def test_day_of_month_or_weekday(self):
+        # With both day fields restricted, either one matching is enough
+        self.assertEqual(
+            next_fire_cron("0 9 13 * fri", datetime(2026, 3, 1)),
+            datetime(2026, 3, 6, 9, 0)
+        )
+    
+    def test_last_day_of_month(self):
+        self.assertEqual(next_fire_cron("0 0 L * *", datetime(2028, 2, 10)), datetime(2028, 2, 29))
+        self.assertEqual(next_fire_cron("0 0 L * *", datetime(2026, 2, 10)), datetime(2026, 2, 28))
+    
+    def test_leap_day_waits_for_leap_year(self):
+        self.assertEqual(next_fire_cron("0 0 29 2 *", datetime(2026, 3, 1)), datetime(2028, 2, 29))
+    
+    def test_impossible_date_never_fires(self):
+        self.assertIsNone(next_fire_cron("0 0 30 2 *", datetime(2026, 1, 1)))
+    
+    def test_macro(self):
+        self.assertEqual(next_fire_cron("@daily", datetime(2026, 3, 2, 10, 0)), datetime(2026, 3, 3))
+    
+    def test_invalid_expressions(self):
+        for expression in ("61 * * * *", "* * *", "0 0 * 13 *", "0 0 * * funday"):
+            with self.subTest(expression=expression), self.assertRaises(CronError):
+                next_fire_cron(expression, datetime(2026, 1, 1))
+    
+    def test_time_skipped_by_dst_fires_after_the_jump(self):
+        # Clocks in Zagreb jump from 02:00 to 03:00 on 29 March 2026, so
+        # 02:30 becomes the corresponding time after the jump
+        self.assertEqual(
+            next_fire_cron("30 2 * * *", local("Europe/Zagreb", 2026, 3, 28, 12, 0), "Europe/Zagreb"),
+            local("Europe/Zagreb", 2026, 3, 29, 3, 30)
+        )
+    
+    def test_time_repeated_by_dst_fires_once(self):
+        # 02:30 occurs twice in Zagreb on 25 October 2026
+        first = next_fire_cron("30 2 * * *", local("Europe/Zagreb", 2026, 10, 24, 12, 0), "Europe/Zagreb")
+        second = next_fire_cron("30 2 * * *", first, "Europe/Zagreb")
+        self.assertEqual(second, local("Europe/Zagreb", 2026, 10, 26, 2, 30))
+
+
+class CronScheduleValidationTest(unittest.TestCase):
+    
+    def test_valid_schedule_is_accepted(self):
+        job = BackupJob(name="job", schedule={"type": "cron", "expression": "0 2 * * *"})
+        self.assertEqual(job.schedule["expression"], "0 2 * * *")
+    
+    def test_invalid_or_never_firing_schedules_are_rejected(self):
+        for schedule in (
+            {"type": "cron", "expression": "0 0 30 2 *"},
+            {"type": "cron", "expression": "not cron"},
+            {"type": "cron", "expression": "0 2 * * *", "timezone": "Mars/Olympus"},
+        ):
+            with self.subTest(schedule=schedule), self.assertRaises(JobValidationError):
+                BackupJob(name="job", schedule=schedule)
+
+
+if __name__ == "__main__":
+    unittest.main()
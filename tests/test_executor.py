@@ -0,0 +1,278 @@
+"""
+Tests for executor priority ordering and preemption.
+"""
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from core.backup_engine import BackupProgress
+from core.executor import JobExecutor
+from core.job_manager import BackupJob, JobManager
+from core.job_store import JobStore
+from utils.rate_limiter import RateLimiter
+
+
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    """Poll a condition until it holds or the timeout passes."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+class FakeEngine:
+    """
+    Stands in for BackupEngine: a run finishes once its job's gate is
+    opened and the run is not paused.
+    """
+    
+    gates = {}
+    started = []
+    
+    def __init__(self):
+        self.progress = BackupProgress()
+        self.rate_limiter = RateLimiter()
+    
+    def perform_backup(self, **kwargs):
+        name = kwargs["job_name"]
+        FakeEngine.started.append(name)
+        while not self.progress.is_cancelled:
+            if FakeEngine.gates[name].is_set() and not self.progress.is_paused:
+                break
+            time.sleep(0.01)
+        return {
+            "destination": str(Path(kwargs["destination_path"]) / name / "backup"),
+            "cancelled": self.progress.is_cancelled,
+        }
+    
+    def pause_backup(self):
+        self.progress.is_paused = True
+    
+    def resume_backup(self):
+        self.progress.is_paused = False
+    
+    def cancel_backup(self):
+        self.progress.is_cancelled = True
+
+
+class ExecutorTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        FakeEngine.gates = {}
+        FakeEngine.started = []
+        for target, replacement in (
+            ("core.executor.BackupEngine", FakeEngine),
+            ("core.executor.prune_in_background", lambda *args: None),
+        ):
+            patcher = mock.patch(target, replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.manager = JobManager(
+            jobs_file=str(self.tmp / "jobs.json"),
+            store=JobStore(str(self.tmp / "jobs.db")),
+            flush_delay=0
+        )
+        self.executor = None
+    
+    def tearDown(self):
+        for gate in FakeEngine.gates.values():
+            gate.set()
+        if self.executor is not None:
+            wait_until(lambda: not self.executor.get_running() and not self.executor.get_queued())
+        shutil.rmtree(self.tmp, ignore_errors=True)
+    
+    def make_executor(self, preempt: bool = False, max_concurrent_jobs: int = 1, per_device_concurrency: int = 1) -> JobExecutor:
+        self.executor = JobExecutor(
+            self.manager,
+            max_concurrent_jobs=max_concurrent_jobs,
+            per_device_concurrency=per_device_concurrency,
+            preempt=preempt
+        )
+        return self.executor
+    
+    def job(self, name: str, priority: str = "normal") -> BackupJob:
+        """Create a job whose runs wait for its gate."""
+        FakeEngine.gates[name] = threading.Event()
+        job = BackupJob(
+            name=name,
+            source_paths=[str(self.tmp)],
+            destination_path=str(self.tmp / "dest"),
+            priority=priority
+        )
+        self.manager.create_job(job)
+        return job
+    
+    def running(self):
+        return [job.name for job in self.executor.get_running()]
+    
+    def queued(self):
+        return [job.name for job in self.executor.get_queued()]
+
+
+class PriorityTest(ExecutorTestCase):
+    
+    def test_queued_jobs_start_by_priority(self):
+        executor = self.make_executor(preempt=False)
+        executor.submit(self.job("blocker"))
+        self.assertTrue(wait_until(lambda: FakeEngine.started == ["blocker"]))
+        
+        jobs = [self.job(name, name) for name in ("low", "normal", "critical", "high")]
+        for job in jobs:
+            executor.submit(job)
+        self.assertEqual(self.queued(), ["critical", "high", "normal", "low"])
+        
+        FakeEngine.gates["blocker"].set()
+        for name in ("critical", "high", "normal", "low"):
+            self.assertTrue(wait_until(lambda: self.running() == [name]), name)
+            FakeEngine.gates[name].set()
+        self.assertTrue(wait_until(lambda: len(FakeEngine.started) == 5))
+        self.assertEqual(FakeEngine.started, ["blocker", "critical", "high", "normal", "low"])
+    
+    def test_submit_many_starts_by_priority(self):
+        executor = self.make_executor(preempt=False)
+        jobs = [self.job(name, name) for name in ("low", "normal", "high")]
+        for gate in FakeEngine.gates.values():
+            gate.set()
+        self.assertEqual(executor.submit_many(jobs), 3)
+        self.assertTrue(wait_until(lambda: len(FakeEngine.started) == 3))
+        self.assertEqual(FakeEngine.started, ["high", "normal", "low"])
+    
+    def test_job_is_not_queued_twice(self):
+        executor = self.make_executor(preempt=False)
+        job = self.job("once")
+        self.assertTrue(executor.submit(job))
+        self.assertFalse(executor.submit(job))
+
+
+class PreemptionTest(ExecutorTestCase):
+    
+    def test_higher_priority_job_pauses_lower_priority_job(self):
+        executor = self.make_executor(preempt=True)
+        low = self.job("low", "low")
+        executor.submit(low)
+        self.assertTrue(wait_until(lambda: self.running() == ["low"]))
+        engine = executor._runs[low.job_id].engine
+        
+        executor.submit(self.job("high", "high"))
+        self.assertTrue(wait_until(lambda: self.running() == ["high"]))
+        self.assertEqual(self.queued(), ["low"])
+        self.assertTrue(engine.progress.is_paused)
+        
+        # The paused run does not finish while preempted
+        FakeEngine.gates["low"].set()
+        time.sleep(0.1)
+        self.assertTrue(executor.is_active(low.job_id))
+        
+        FakeEngine.gates["high"].set()
+        self.assertTrue(wait_until(lambda: not executor.is_active(low.job_id)))
+        self.assertFalse(engine.progress.is_paused)
+        # The preempted run was continued, not started again
+        self.assertEqual(FakeEngine.started, ["low", "high"])
+        self.assertEqual(self.manager.get_job(low.job_id).status, "completed")
+    
+    def test_equal_priority_does_not_preempt(self):
+        executor = self.make_executor(preempt=True)
+        executor.submit(self.job("first", "high"))
+        self.assertTrue(wait_until(lambda: self.running() == ["first"]))
+        executor.submit(self.job("second", "high"))
+        time.sleep(0.1)
+        self.assertEqual(self.running(), ["first"])
+        self.assertEqual(self.queued(), ["second"])
+    
+    def test_without_preemption_higher_priority_job_waits(self):
+        executor = self.make_executor(preempt=False)
+        low = self.job("low", "low")
+        executor.submit(low)
+        self.assertTrue(wait_until(lambda: self.running() == ["low"]))
+        
+        executor.submit(self.job("high", "high"))
+        time.sleep(0.1)
+        self.assertEqual(self.running(), ["low"])
+        self.assertEqual(self.queued(), ["high"])
+        self.assertFalse(executor._runs[low.job_id].engine.progress.is_paused)
+        
+        FakeEngine.gates["low"].set()
+        self.assertTrue(wait_until(lambda: self.running() == ["high"]))
+
+
+class ConcurrencyTest(ExecutorTestCase):
+    
+    def test_per_device_limit(self):
+        # Every job here reads from and writes to the same device
+        executor = self.make_executor(max_concurrent_jobs=3, per_device_concurrency=1)
+        executor.submit_many([self.job("first"), self.job("second")])
+        self.assertTrue(wait_until(lambda: self.running() == ["first"]))
+        time.sleep(0.1)
+        self.assertEqual(self.queued(), ["second"])
+        FakeEngine.gates["first"].set()
+        self.assertTrue(wait_until(lambda: self.running() == ["second"]))
+    
+    def test_runs_share_a_device_up_to_its_limit(self):
+        executor = self.make_executor(max_concurrent_jobs=3, per_device_concurrency=2)
+        executor.submit_many([self.job("first"), self.job("second"), self.job("third")])
+        self.assertTrue(wait_until(lambda: len(self.running()) == 2))
+        self.assertEqual(self.queued(), ["third"])
+
+
+class CancelTest(ExecutorTestCase):
+    
+    def setUp(self):
+        super().setUp()
+        self.released = []
+    
+    def make_executor(self, **kwargs) -> JobExecutor:
+        executor = super().make_executor(**kwargs)
+        executor.release_listeners.append(lambda job: self.released.append(job.name))
+        return executor
+    
+    def test_cancel_queued_run_records_it_and_notifies_listeners(self):
+        executor = self.make_executor()
+        executor.submit(self.job("running"))
+        self.assertTrue(wait_until(lambda: self.running() == ["running"]))
+        queued = self.job("queued")
+        executor.submit(queued)
+        
+        self.assertTrue(executor.cancel(queued.job_id))
+        self.assertFalse(executor.is_active(queued.job_id))
+        self.assertEqual(self.released, ["queued"])
+        self.assertEqual(self.manager.get_job(queued.job_id).status, "cancelled")
+        self.assertEqual([run["outcome"] for run in self.manager.get_runs(queued.job_id)], ["cancelled"])
+        
+        FakeEngine.gates["running"].set()
+        self.assertTrue(wait_until(lambda: self.released == ["queued", "running"]))
+        self.assertNotIn("queued", FakeEngine.started)
+    
+    def test_cancel_running_run(self):
+        executor = self.make_executor()
+        job = self.job("running")
+        executor.submit(job)
+        self.assertTrue(wait_until(lambda: self.running() == ["running"]))
+        self.assertTrue(executor.cancel(job.job_id))
+        self.assertTrue(wait_until(lambda: self.released == ["running"]))
+        self.assertEqual([run["outcome"] for run in self.manager.get_runs(job.job_id)], ["cancelled"])
+        self.assertFalse(executor.cancel(job.job_id))
+    
+    def test_cancel_all(self):
+        executor = self.make_executor()
+        jobs = [self.job(name) for name in ("running", "queued", "also_queued")]
+        executor.submit(jobs[0])
+        self.assertTrue(wait_until(lambda: self.running() == ["running"]))
+        executor.submit_many(jobs[1:])
+        
+        executor.cancel_all()
+        self.assertTrue(wait_until(lambda: len(self.released) == 3))
+        self.assertEqual(sorted(self.released), ["also_queued", "queued", "running"])
+        for job in jobs:
+            self.assertEqual(self.manager.get_job(job.job_id).status, "cancelled")
+        self.assertEqual(FakeEngine.started, ["running"])
+
+
+if __name__ == "__main__":
+    unittest.main()
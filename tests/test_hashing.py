@@ -0,0 +1,75 @@
+"""
+Tests for file hashing and the parallel hashing helpers.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from core.hashing import SUPPORTED_ALGORITHMS, create_hasher, hash_file, hash_files, parallel_map
+
+
+class HashingTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+    
+    def write(self, name: str, data: bytes) -> Path:
+        path = self.tmp / name
+        path.write_bytes(data)
+        return path
+    
+    def test_digests_match_hashlib(self):
+        data = os.urandom(100_000)
+        path = self.write("file.bin", data)
+        for algorithm in SUPPORTED_ALGORITHMS:
+            with self.subTest(algorithm=algorithm):
+                self.assertEqual(hash_file(path, algorithm), hashlib.new(algorithm, data).hexdigest())
+    
+    def test_memory_mapped_files_hash_alike(self):
+        data = os.urandom(100_000)
+        path = self.write("large.bin", data)
+        # Map every file and slice it unevenly
+        with mock.patch("core.hashing.MMAP_THRESHOLD", 1), mock.patch("core.hashing.MMAP_SLICE_SIZE", 7000):
+            self.assertEqual(hash_file(path), hashlib.sha256(data).hexdigest())
+        self.assertEqual(hash_file(self.write("empty.bin", b"")), hashlib.sha256(b"").hexdigest())
+    
+    def test_unsupported_algorithm(self):
+        with self.assertRaises(ValueError):
+            create_hasher("md5")
+        with self.assertRaises(ValueError):
+            list(hash_files([], "md5"))
+    
+    def test_hash_files_keeps_order_and_reports_errors(self):
+        paths = [self.write(f"{i}.txt", str(i).encode()) for i in range(20)]
+        paths.insert(5, self.tmp / "missing.txt")
+        for workers in (1, 4):
+            with self.subTest(workers=workers):
+                results = list(hash_files(paths, max_workers=workers))
+                self.assertEqual([path for path, _, _ in results], paths)
+                _, digest, error = results[5]
+                self.assertIsNone(digest)
+                self.assertIsNotNone(error)
+                self.assertEqual(results[0][1:], (hashlib.sha256(b"0").hexdigest(), None))
+    
+    def test_parallel_map_streams_in_order(self):
+        consumed = []
+        
+        def items():
+            for i in range(1000):
+                consumed.append(i)
+                yield i
+        
+        results = parallel_map(lambda i: i * 2, items(), max_workers=2)
+        self.assertEqual(next(results), 0)
+        # Only a bounded window is queued ahead of the consumer
+        self.assertLess(len(consumed), 1000)
+        self.assertEqual(list(results), [i * 2 for i in range(1, 1000)])
+
+
+if __name__ == "__main__":
+    unittest.main()
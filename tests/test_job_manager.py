@@ -0,0 +1,186 @@
+"""
+Tests for the job manager and its SQLite job store.
+"""
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from core.job_manager import BackupJob, JobManager
+from core.job_schema import SCHEMA_VERSION, JobValidationError
+from core.job_store import JobStore
+
+
+class JobManagerTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.manager = self.open_manager()
+    
+    def open_manager(self, **kwargs) -> JobManager:
+        manager = JobManager(jobs_file=str(self.tmp / "jobs.json"), store=JobStore(str(self.tmp / "jobs.db")), **kwargs)
+        self.addCleanup(manager.close)
+        return manager
+    
+    def stored(self, job_id: str) -> dict:
+        """Read a job straight from the database, bypassing the manager."""
+        store = JobStore(str(self.tmp / "jobs.db"))
+        try:
+            return store.get(job_id)
+        finally:
+            store.close()
+
+
+class JobStoreTest(JobManagerTestCase):
+    
+    def test_jobs_persist(self):
+        kept = BackupJob(name="kept", source_paths=["/data"], schedule={"type": "daily", "time": "02:00"})
+        removed = BackupJob(name="removed")
+        self.manager.create_job(kept)
+        self.manager.create_job(removed)
+        self.manager.update_job(kept.job_id, name="renamed", enabled=False)
+        self.manager.delete_job(removed.job_id)
+        self.manager.close()
+        
+        reopened = self.open_manager()
+        self.assertEqual(list(reopened.jobs), [kept.job_id])
+        job = reopened.get_job(kept.job_id)
+        self.assertEqual((job.name, job.enabled, job.source_paths), ("renamed", False, ["/data"]))
+        self.assertEqual(job.to_dict(), kept.to_dict())
+    
+    def test_legacy_json_is_imported_once(self):
+        self.manager.close()
+        jobs_file = self.tmp / "jobs.json"
+        legacy = {
+            "old": {"job_id": "old", "name": "old", "source_paths": ["/data"], "status": "completed",
+                    "schedule": {"type": "manual"}, "filters": {}, "created_at": "2024-01-01T00:00:00"},
+        }
+        jobs_file.write_text(json.dumps(legacy), encoding="utf-8")
+        
+        manager = self.open_manager()
+        self.assertEqual(manager.get_job("old").status, "completed")
+        self.assertFalse(jobs_file.exists())
+        self.assertTrue((self.tmp / "jobs.json.migrated").exists())
+        # Loading migrated the job to the current schema in the store
+        self.assertEqual(self.stored("old")["schema_version"], SCHEMA_VERSION)
+    
+    def test_invalid_stored_job_is_quarantined(self):
+        good = BackupJob(name="good")
+        self.manager.create_job(good)
+        self.manager.store.put({**BackupJob(name="bad").to_record(), "job_id": "bad", "priority": "urgent"})
+        self.manager.close()
+        
+        manager = self.open_manager()
+        self.assertEqual(list(manager.jobs), [good.job_id])
+        self.assertIn("bad", manager.quarantined)
+        self.assertEqual(self.stored("bad")["priority"], "urgent")
+    
+    def test_runs_are_logged_newest_first(self):
+        job = BackupJob(name="job")
+        self.manager.create_job(job)
+        self.manager.record_run(job.job_id, datetime(2026, 3, 1, 2, 0), {"total_files": 3})
+        self.manager.record_run(job.job_id, datetime(2026, 3, 2, 2, 0), error="disk full")
+        runs = self.manager.get_runs(job.job_id)
+        self.assertEqual([run["outcome"] for run in runs], ["failed", "completed"])
+        self.assertEqual(runs[0]["error"], "disk full")
+        self.assertEqual(runs[1]["files"], 3)
+
+
+class WriteBehindTest(JobManagerTestCase):
+    
+    def setUp(self):
+        super().setUp()
+        self.manager.close()
+        # A delay no test waits for; writes happen only on flush
+        self.manager = self.open_manager(flush_delay=60)
+        self.job = BackupJob(name="job")
+        self.manager.create_job(self.job)
+    
+    def test_run_state_is_held_until_flush(self):
+        self.manager.update_job(self.job.job_id, status="running")
+        self.manager.update_job(self.job.job_id, status="completed", last_run="2026-03-01T02:00:00")
+        self.assertEqual(self.manager.get_job(self.job.job_id).status, "completed")
+        self.assertEqual(self.stored(self.job.job_id)["status"], "scheduled")
+        
+        self.manager.flush()
+        stored = self.stored(self.job.job_id)
+        self.assertEqual((stored["status"], stored["last_run"]), ("completed", "2026-03-01T02:00:00"))
+    
+    def test_other_updates_write_pending_state_at_once(self):
+        self.manager.update_job(self.job.job_id, status="completed")
+        self.manager.update_job(self.job.job_id, name="renamed")
+        stored = self.stored(self.job.job_id)
+        self.assertEqual((stored["name"], stored["status"]), ("renamed", "completed"))
+    
+    def test_close_flushes(self):
+        self.manager.update_job(self.job.job_id, next_run="2026-03-02T02:00:00")
+        self.manager.close()
+        self.assertEqual(self.stored(self.job.job_id)["next_run"], "2026-03-02T02:00:00")
+    
+    def test_deleted_job_is_not_written_back(self):
+        self.manager.update_job(self.job.job_id, status="completed")
+        self.manager.delete_job(self.job.job_id)
+        self.manager.flush()
+        self.assertIsNone(self.stored(self.job.job_id))
+
+
+class IndexTest(JobManagerTestCase):
+    
+    def job(self, name: str, **fields) -> BackupJob:
+        job = BackupJob(name=name, **fields)
+        self.manager.create_job(job)
+        return job
+    
+    def names(self, jobs) -> list:
+        return [job.name for job in jobs]
+    
+    def test_jobs_due_soonest_first(self):
+        late = self.job("late", next_run="2026-03-01T05:00:00")
+        self.job("early", next_run="2026-03-01T01:00:00")
+        self.job("never")
+        self.assertEqual(self.names(self.manager.get_jobs_due(datetime(2026, 3, 1, 4, 0))), ["early"])
+        
+        self.manager.update_job(late.job_id, next_run="2026-03-01T00:30:00")
+        self.assertEqual(self.names(self.manager.get_jobs_due(datetime(2026, 3, 1, 4, 0))), ["late", "early"])
+        self.manager.update_job(late.job_id, next_run=None)
+        self.assertEqual(self.names(self.manager.get_jobs_due(datetime(2026, 3, 2))), ["early"])
+    
+    def test_status_enabled_and_destination_follow_updates(self):
+        first = self.job("first", destination_path="/a")
+        self.job("second", destination_path="/a")
+        self.manager.update_job(first.job_id, status="running", enabled=False, destination_path="/b")
+        
+        self.assertEqual(self.manager.count_jobs_by_status("running"), 1)
+        self.assertEqual(self.names(self.manager.get_jobs_by_status("scheduled")), ["second"])
+        self.assertEqual(self.names(self.manager.get_enabled_jobs()), ["second"])
+        self.assertEqual(self.manager.count_enabled_jobs(), 1)
+        self.assertEqual(self.names(self.manager.get_jobs_by_destination("/a")), ["second"])
+        self.assertEqual(self.names(self.manager.get_jobs_by_destination("/b")), ["first"])
+    
+    def test_failed_update_leaves_indexes_intact(self):
+        job = self.job("job", status="completed")
+        with self.assertRaises(JobValidationError):
+            self.manager.update_job(job.job_id, status="running", priority="urgent")
+        self.assertEqual(self.names(self.manager.get_jobs_by_status("completed")), ["job"])
+    
+    def test_dependents_follow_updates_and_deletes(self):
+        upstream = self.job("upstream")
+        dependent = self.job("dependent", depends_on=[upstream.job_id])
+        self.assertEqual(self.names(self.manager.get_dependents(upstream.job_id)), ["dependent"])
+        
+        self.manager.delete_job(upstream.job_id)
+        self.assertEqual(self.manager.get_job(dependent.job_id).depends_on, [])
+        self.assertEqual(self.manager.get_dependents(upstream.job_id), [])
+    
+    def test_pages_keep_creation_order(self):
+        jobs = [self.job(f"job{i}") for i in range(5)]
+        self.manager.delete_job(jobs[1].job_id)
+        self.assertEqual(self.names(self.manager.get_jobs_page(1, 2)), ["job2", "job3"])
+        self.assertEqual(self.manager.count_jobs(), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
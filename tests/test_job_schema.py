@@ -0,0 +1,127 @@
+"""
+Tests for the job model, its validation and schema migrations.
+"""
+import unittest
+
+from core.job_manager import BackupJob
+from core.job_schema import SCHEMA_VERSION, JobValidationError, migrate
+
+
+def fields(job: BackupJob) -> dict:
+    data = job.to_dict()
+    del data["schema_version"]
+    return data
+
+
+# Fields that get a fresh value per job unless given
+FIXED = {"job_id": "job-1", "created_at": "2026-03-01T02:00:00", "modified_at": "2026-03-01T02:00:00"}
+
+
+class BackupJobTest(unittest.TestCase):
+    
+    def test_round_trip(self):
+        job = BackupJob(
+            name="docs",
+            source_paths=["/home/docs"],
+            destination_path="/backup",
+            backup_type="incremental",
+            schedule={"type": "cron", "expression": "0 2 * * *"},
+            retention={"keep_daily": 7},
+            priority="high",
+            depends_on=["other"],
+            verify_after="quick",
+            **FIXED
+        )
+        self.assertEqual(fields(BackupJob.from_dict(job.to_dict())), fields(job))
+        self.assertEqual(fields(BackupJob.from_dict(job.to_record())), fields(job))
+    
+    def test_record_leaves_out_defaults(self):
+        record = BackupJob(name="docs", **FIXED).to_record()
+        self.assertNotIn("filters", record)
+        self.assertNotIn("priority", record)
+        self.assertEqual(record["schema_version"], SCHEMA_VERSION)
+    
+    def test_loaded_and_constructed_jobs_are_normalized_alike(self):
+        for data in (
+            {"name": "empty", "filters": {}, "schedule": {}, "source_paths": [], "retention": {}},
+            {"name": "none", "filters": None, "schedule": None, "depends_on": None, "last_run": None},
+            {"name": "set", "filters": {"min_size_mb": 1}, "source_paths": ["/data"]},
+        ):
+            with self.subTest(data=data):
+                data = {**data, **FIXED}
+                loaded = BackupJob.from_dict({**data, "schema_version": SCHEMA_VERSION})
+                self.assertEqual(fields(loaded), fields(BackupJob(**data)))
+        
+        loaded = BackupJob.from_dict({"name": "x", "filters": {}, "schema_version": SCHEMA_VERSION})
+        self.assertEqual(loaded.filters["exclude_patterns"], [])
+        self.assertEqual(loaded.schedule, {"type": "manual"})
+    
+    def test_defaults_are_not_shared(self):
+        first, second = BackupJob(name="a"), BackupJob.from_dict({"name": "b"})
+        first.source_paths.append("/a")
+        first.filters["exclude_patterns"].append("*.tmp")
+        self.assertEqual(second.source_paths, [])
+        self.assertEqual(second.filters["exclude_patterns"], [])
+        self.assertNotEqual(first.job_id, second.job_id)
+    
+    def test_invalid_values_are_rejected_on_every_path(self):
+        for field, value in (
+            ("priority", "urgent"),
+            ("backup_type", "mirror"),
+            ("source_paths", [1]),
+            ("enabled", "yes"),
+            ("retention", {"keep_daily": -1}),
+            ("schedule", {"type": "daily", "catch_up": "sometimes"}),
+        ):
+            with self.subTest(field=field):
+                with self.assertRaises(JobValidationError):
+                    BackupJob(name="job", **{field: value})
+                with self.assertRaises(JobValidationError):
+                    BackupJob.from_dict({"name": "job", field: value, "schema_version": SCHEMA_VERSION})
+                job = BackupJob(name="job")
+                before = fields(job)
+                with self.assertRaises(JobValidationError):
+                    job.update(name="renamed", **{field: value})
+                self.assertEqual(fields(job), before)
+        
+        with self.assertRaises(JobValidationError):
+            BackupJob.from_dict({"name": "job", "colour": "blue"})
+    
+    def test_update_normalizes_like_construction(self):
+        job = BackupJob(name="job", filters={"min_size_mb": 1})
+        job.update(filters={})
+        self.assertEqual(job.filters, BackupJob(name="job").filters)
+
+
+class MigrationTest(unittest.TestCase):
+    
+    def test_version_1_job_is_migrated(self):
+        data = {
+            "job_id": "old", "name": "old", "source_paths": ["/data"], "destination_path": "/backup",
+            "backup_type": "full", "enabled": True, "schedule": {"type": "daily", "time": "02:00"},
+            "filters": {}, "compression": True, "encryption": False,
+            "created_at": "2024-01-01T00:00:00", "modified_at": "2024-01-01T00:00:00",
+            "last_run": None, "next_run": None, "status": "completed",
+        }
+        job = BackupJob.from_dict(data)
+        self.assertEqual(job.hash_algorithm, "sha256")
+        self.assertEqual(job.retention, {})
+        self.assertEqual(job.priority, "normal")
+        self.assertEqual(job.depends_on, [])
+        self.assertEqual(job.verify_after, "none")
+        self.assertEqual(job.to_dict()["schema_version"], SCHEMA_VERSION)
+    
+    def test_migration_keeps_existing_values(self):
+        data = migrate({"schema_version": 2, "name": "job", "retention": {"keep_last": 3}, "priority": "low"})
+        self.assertNotIn("schema_version", data)
+        self.assertEqual(data["retention"], {"keep_last": 3})
+        self.assertEqual(data["priority"], "low")
+        self.assertEqual(data["depends_on"], [])
+    
+    def test_newer_schema_is_rejected(self):
+        with self.assertRaises(JobValidationError):
+            BackupJob.from_dict({"name": "job", "schema_version": SCHEMA_VERSION + 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Tests for grandfather-father-son retention selection.
+"""
+import unittest
+from datetime import datetime, timedelta
+
+from core.chain import TIMESTAMP_FORMAT
+from core.retention import select_backups_to_keep
+
+
+NOW = datetime(2026, 3, 31, 12, 0)
+
+
+def daily_backups(days: int):
+    """Metadata of one full backup per day at 02:00, oldest first, ending today."""
+    first = datetime(2026, 3, 31, 2, 0) - timedelta(days=days - 1)
+    return [
+        {"timestamp": (first + timedelta(days=i)).strftime(TIMESTAMP_FORMAT), "backup_type": "full"}
+        for i in range(days)
+    ]
+
+
+def stamp(*fields) -> str:
+    return datetime(*fields).strftime(TIMESTAMP_FORMAT)
+
+
+class RetentionSelectionTest(unittest.TestCase):
+    
+    def test_keep_daily(self):
+        keep = select_backups_to_keep(daily_backups(60), {"keep_daily": 7}, now=NOW)
+        self.assertEqual(keep, {stamp(2026, 3, day, 2, 0) for day in range(25, 32)})
+    
+    def test_keep_weekly_keeps_newest_backup_of_each_week(self):
+        keep = select_backups_to_keep(daily_backups(60), {"keep_weekly": 4}, now=NOW)
+        # ISO weeks start on Monday; 31 March 2026 is a Tuesday
+        self.assertEqual(keep, {
+            stamp(2026, 3, 31, 2, 0),
+            stamp(2026, 3, 29, 2, 0),
+            stamp(2026, 3, 22, 2, 0),
+            stamp(2026, 3, 15, 2, 0),
+        })
+    
+    def test_keep_monthly_keeps_newest_backup_of_each_month(self):
+        keep = select_backups_to_keep(daily_backups(60), {"keep_monthly": 3}, now=NOW)
+        self.assertEqual(keep, {
+            stamp(2026, 3, 31, 2, 0),
+            stamp(2026, 2, 28, 2, 0),
+            stamp(2026, 1, 31, 2, 0),
+        })
+    
+    def test_rules_combine(self):
+        keep = select_backups_to_keep(
+            daily_backups(60),
+            {"keep_last": 2, "keep_weekly": 2, "keep_monthly": 2},
+            now=NOW
+        )
+        self.assertEqual(keep, {
+            stamp(2026, 3, 31, 2, 0),
+            stamp(2026, 3, 30, 2, 0),
+            stamp(2026, 3, 29, 2, 0),
+            stamp(2026, 2, 28, 2, 0),
+        })
+    
+    def test_keep_within_days(self):
+        keep = select_backups_to_keep(daily_backups(60), {"keep_within_days": 3}, now=NOW)
+        self.assertEqual(keep, {stamp(2026, 3, day, 2, 0) for day in (29, 30, 31)})
+    
+    def test_global_fallback(self):
+        backups = daily_backups(60)
+        self.assertEqual(
+            select_backups_to_keep(backups, {}, retention_days=2, now=NOW),
+            {stamp(2026, 3, 30, 2, 0), stamp(2026, 3, 31, 2, 0)}
+        )
+        # No rule and no fallback age prune nothing
+        self.assertEqual(len(select_backups_to_keep(backups, {}, now=NOW)), 60)
+    
+    def test_cancelled_backups_do_not_represent_a_period(self):
+        backups = daily_backups(3)
+        backups.append({"timestamp": stamp(2026, 3, 31, 11, 0), "cancelled": True})
+        keep = select_backups_to_keep(backups, {"keep_daily": 1}, now=NOW)
+        self.assertEqual(keep, {stamp(2026, 3, 31, 2, 0)})
+    
+    def test_newest_complete_backup_is_always_kept(self):
+        backups = daily_backups(3)
+        keep = select_backups_to_keep(backups, {"keep_within_days": 1}, now=NOW + timedelta(days=30))
+        self.assertEqual(keep, {stamp(2026, 3, 31, 2, 0)})
+    
+    def test_bases_of_kept_backups_are_kept(self):
+        backups = [
+            {"timestamp": stamp(2026, 1, 1, 2, 0), "backup_type": "full"},
+            {"timestamp": stamp(2026, 2, 1, 2, 0), "backup_type": "full"},
+            {"timestamp": stamp(2026, 3, 1, 2, 0), "backup_type": "full"},
+            {"timestamp": stamp(2026, 3, 2, 2, 0), "backup_type": "incremental",
+             "base_backup": stamp(2026, 3, 1, 2, 0)},
+            {"timestamp": stamp(2026, 3, 3, 2, 0), "backup_type": "incremental",
+             "base_backup": stamp(2026, 3, 2, 2, 0)},
+        ]
+        keep = select_backups_to_keep(backups, {"keep_last": 1}, now=NOW)
+        self.assertEqual(keep, {stamp(2026, 3, 1, 2, 0), stamp(2026, 3, 2, 2, 0), stamp(2026, 3, 3, 2, 0)})
+
+
+if __name__ == "__main__":
+    unittest.main()
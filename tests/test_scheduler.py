@@ -0,0 +1,234 @@
+"""
+Tests for the event-driven scheduler, using an executor the tests finish
+runs on explicitly.
+"""
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+from core.job_manager import BackupJob, JobManager
+from core.job_store import JobStore
+from core.scheduler import BackupScheduler
+from utils.config import get_config
+
+
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    """Poll a condition until it holds or the timeout passes."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+class FakeExecutor:
+    """Records submitted runs; a run lasts until finish() is called."""
+    
+    def __init__(self, job_manager: JobManager):
+        self.job_manager = job_manager
+        self.completion_listeners = []
+        self.release_listeners = []
+        self.started = []
+        self._active = {}
+        self._lock = threading.Lock()
+    
+    def submit_many(self, jobs, **callbacks) -> int:
+        queued = 0
+        with self._lock:
+            for job in jobs:
+                if job.job_id in self._active:
+                    continue
+                self._active[job.job_id] = datetime.now()
+                self.started.append(job.name)
+                queued += 1
+        return queued
+    
+    def submit(self, job, **callbacks) -> bool:
+        return self.submit_many([job]) == 1
+    
+    def is_active(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._active
+    
+    def started_before(self, job_id: str, moment: datetime) -> bool:
+        with self._lock:
+            return job_id in self._active and self._active[job_id] < moment
+    
+    def set_throttle(self, bytes_per_second: float):
+        pass
+    
+    def finish(self, job: BackupJob, completed: bool = True):
+        """End a run the way JobExecutor does."""
+        with self._lock:
+            del self._active[job.job_id]
+        job = self.job_manager.get_job(job.job_id)
+        if completed:
+            self.job_manager.update_job(job.job_id, status="completed", last_run=datetime.now().isoformat())
+            for listener in list(self.completion_listeners):
+                listener(job, {"destination": "backup"})
+        for listener in list(self.release_listeners):
+            listener(job)
+
+
+class SchedulerTestCase(unittest.TestCase):
+    
+    CONFIG = {"load_aware_scheduling": False, "catch_up_stagger_seconds": 0}
+    
+    def setUp(self):
+        tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp, True)
+        patcher = mock.patch.dict(get_config().settings, self.CONFIG)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = JobManager(jobs_file=str(tmp / "jobs.json"), store=JobStore(str(tmp / "jobs.db")), flush_delay=0)
+        self.executor = FakeExecutor(self.manager)
+        self.scheduler = BackupScheduler(self.manager, executor=self.executor)
+        self.addCleanup(self.scheduler.stop)
+    
+    def job(self, name: str, schedule: dict = None, **fields) -> BackupJob:
+        job = BackupJob(name=name, schedule=schedule or {"type": "manual"}, **fields)
+        self.manager.create_job(job)
+        return job
+    
+    def started_settles(self, count: int):
+        """Wait for exactly count runs to have started."""
+        self.assertTrue(wait_until(lambda: len(self.executor.started) >= count), self.executor.started)
+        time.sleep(0.1)
+        self.assertEqual(len(self.executor.started), count, self.executor.started)
+
+
+class HeapSchedulingTest(SchedulerTestCase):
+    
+    def soon(self, seconds: float = 1) -> dict:
+        """Get a daily schedule firing a moment from now."""
+        fire_at = datetime.now() + timedelta(seconds=seconds)
+        return {"type": "daily", "time": fire_at.strftime("%H:%M:%S")}
+    
+    def test_due_job_is_submitted_and_rescheduled(self):
+        job = self.job("daily", self.soon())
+        self.scheduler.start()
+        first = self.scheduler.get_next_run_time(job.job_id)
+        self.assertEqual(self.manager.get_job(job.job_id).next_run, first.isoformat(timespec="seconds"))
+        self.started_settles(1)
+        self.assertEqual(self.scheduler.get_next_run_time(job.job_id), first + timedelta(days=1))
+    
+    def test_manual_and_disabled_jobs_are_not_scheduled(self):
+        manual = self.job("manual")
+        disabled = self.job("disabled", self.soon(), enabled=False)
+        self.scheduler.start()
+        self.assertIsNone(self.scheduler.get_next_run_time(manual.job_id))
+        self.assertIsNone(self.scheduler.get_next_run_time(disabled.job_id))
+    
+    def test_refresh_wakes_the_scheduler_for_new_jobs(self):
+        self.job("later", {"type": "daily", "time": (datetime.now() - timedelta(hours=1)).strftime("%H:%M")})
+        self.scheduler.start()
+        self.job("soon", self.soon())
+        self.scheduler.refresh_schedules()
+        self.started_settles(1)
+        self.assertEqual(self.executor.started, ["soon"])
+
+
+class CatchUpTest(SchedulerTestCase):
+    
+    def overdue_job(self, policy: str) -> BackupJob:
+        # Hourly runs were due 3.5, 2.5, 1.5 and 0.5 hours ago
+        missed_at = datetime.now().replace(microsecond=0) - timedelta(hours=3, minutes=30)
+        return self.job(
+            "hourly",
+            {"type": "interval", "interval": 1, "unit": "hours", "catch_up": policy},
+            next_run=missed_at.isoformat()
+        )
+    
+    def test_all_policy_repeats_every_missed_run_one_after_another(self):
+        job = self.overdue_job("all")
+        self.scheduler.start()
+        for run in range(1, 5):
+            self.started_settles(run)
+            self.executor.finish(job)
+        self.started_settles(4)
+        # Back on the regular schedule afterwards
+        self.assertGreater(self.scheduler.get_next_run_time(job.job_id), datetime.now())
+    
+    def test_once_policy_runs_once(self):
+        job = self.overdue_job("once")
+        self.scheduler.start()
+        self.started_settles(1)
+        self.executor.finish(job)
+        self.started_settles(1)
+    
+    def test_skip_policy_waits_for_next_run(self):
+        job = self.overdue_job("skip")
+        self.scheduler.start()
+        self.started_settles(0)
+        self.assertGreater(self.scheduler.get_next_run_time(job.job_id), datetime.now())
+    
+    def test_missed_run_of_running_job_waits_for_it(self):
+        job = self.overdue_job("all")
+        self.assertTrue(self.scheduler.run_job_now(job.job_id))
+        self.scheduler.start()
+        self.started_settles(1)
+        self.executor.finish(job)
+        self.started_settles(2)
+
+
+class DependencyTriggerTest(SchedulerTestCase):
+    
+    def run_and_finish(self, job: BackupJob, completed: bool = True):
+        self.assertTrue(self.scheduler.run_job_now(job.job_id))
+        self.executor.finish(job, completed)
+    
+    def test_completed_job_triggers_its_dependents(self):
+        upstream = self.job("upstream")
+        first = self.job("first", depends_on=[upstream.job_id])
+        second = self.job("second", depends_on=[upstream.job_id])
+        self.scheduler.start()
+        self.run_and_finish(upstream)
+        self.started_settles(3)
+        self.assertEqual(sorted(self.executor.started[1:]), ["first", "second"])
+    
+    def test_dependent_waits_for_all_upstream_jobs(self):
+        a = self.job("a")
+        b = self.job("b")
+        self.job("both", depends_on=[a.job_id, b.job_id])
+        self.scheduler.start()
+        self.run_and_finish(a)
+        self.started_settles(1)
+        self.run_and_finish(b)
+        self.started_settles(3)
+        self.assertEqual(self.executor.started[-1], "both")
+    
+    def test_failed_upstream_does_not_trigger(self):
+        upstream = self.job("upstream")
+        self.job("dependent", depends_on=[upstream.job_id])
+        self.scheduler.start()
+        self.run_and_finish(upstream, completed=False)
+        self.started_settles(1)
+    
+    def test_running_dependent_runs_again_after_its_current_run(self):
+        upstream = self.job("upstream")
+        dependent = self.job("dependent", depends_on=[upstream.job_id])
+        self.scheduler.start()
+        self.assertTrue(self.scheduler.run_job_now(dependent.job_id))
+        time.sleep(0.01)
+        self.run_and_finish(upstream)
+        # The running dependent started before the upstream output existed
+        self.started_settles(2)
+        self.executor.finish(dependent)
+        self.started_settles(3)
+        self.assertEqual(self.executor.started, ["dependent", "upstream", "dependent"])
+    
+    def test_stopped_scheduler_triggers_nothing(self):
+        upstream = self.job("upstream")
+        self.job("dependent", depends_on=[upstream.job_id])
+        self.run_and_finish(upstream)
+        self.started_settles(1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Tests for quick and deep backup verification.
+"""
+import shutil
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from core.backup_engine import BackupEngine
+from core.catalog import BackupCatalog
+from core.verifier import BackupVerifier
+
+
+class VerifierTests:
+    """Verifies a fresh backup, then damages it in different ways."""
+    
+    COMPRESSION = True
+    
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        source = self.tmp / "src"
+        (source / "docs").mkdir(parents=True)
+        (source / "a.txt").write_text("a" * 5000, encoding="utf-8")
+        (source / "docs" / "b.txt").write_text("b" * 5000, encoding="utf-8")
+        catalog = BackupCatalog(str(self.tmp / "catalog.db"))
+        self.addCleanup(catalog.close)
+        result = BackupEngine(catalog=catalog).perform_backup(
+            [str(source)], str(self.tmp / "dest"), "full", compression=self.COMPRESSION, job_name="j"
+        )
+        self.backup = Path(result["destination"])
+    
+    def verify(self, mode: str) -> dict:
+        return BackupVerifier().verify(str(self.backup), mode, max_workers=2)
+    
+    def test_intact_backup_passes(self):
+        for mode in ("quick", "deep"):
+            with self.subTest(mode=mode):
+                result = self.verify(mode)
+                self.assertTrue(result["ok"], result)
+                self.assertTrue(result["has_manifest"])
+                self.assertEqual(result["checked_files"], 2)
+    
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            self.verify("thorough")
+
+
+class ZipVerifierTest(VerifierTests, unittest.TestCase):
+    COMPRESSION = True
+    
+    def test_changed_content_fails_deep_check_only(self):
+        with zipfile.ZipFile(self.backup) as zipf:
+            info = next(info for info in zipf.infolist() if info.filename.endswith("b.txt"))
+        data = bytearray(self.backup.read_bytes())
+        data[info.header_offset + 30 + len(info.filename) + 5] ^= 0xFF
+        self.backup.write_bytes(bytes(data))
+        
+        self.assertTrue(self.verify("quick")["ok"])
+        result = self.verify("deep")
+        self.assertFalse(result["ok"])
+        self.assertEqual([m["path"] for m in result["mismatches"]], [info.filename])
+    
+    def test_truncated_archive(self):
+        data = self.backup.read_bytes()
+        self.backup.write_bytes(data[:len(data) // 2])
+        result = self.verify("quick")
+        self.assertFalse(result["ok"])
+        self.assertTrue(result["errors"])
+
+
+class FolderVerifierTest(VerifierTests, unittest.TestCase):
+    COMPRESSION = False
+    
+    def member(self, name: str) -> Path:
+        return next(path for path in self.backup.rglob(name) if path.is_file())
+    
+    def test_changed_content_fails_deep_check_only(self):
+        self.member("b.txt").write_text("x" * 5000, encoding="utf-8")
+        self.assertTrue(self.verify("quick")["ok"])
+        result = self.verify("deep")
+        self.assertFalse(result["ok"])
+        self.assertEqual(len(result["mismatches"]), 1)
+        self.assertTrue(result["mismatches"][0]["path"].endswith("b.txt"))
+    
+    def test_missing_and_resized_files(self):
+        self.member("a.txt").unlink()
+        self.member("b.txt").write_text("short", encoding="utf-8")
+        result = self.verify("quick")
+        self.assertFalse(result["ok"])
+        self.assertEqual(len(result["missing"]), 1)
+        self.assertEqual(len(result["mismatches"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
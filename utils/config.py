@@ -25,6 +25,21 @@ class Config:
         "log_level": "INFO",
         "max_log_size_mb": 10,
         "backup_retention_days": 30,
+        "retention_max_deletes_per_second": 200,
+        "verify_max_mbps": 0,
+        "verify_restores": True,
+        "max_concurrent_jobs": 4,
+        "per_device_concurrency": 1,
+        "preempt_lower_priority": False,
+        "catch_up_policy": "once",
+        "catch_up_stagger_seconds": 60,
+        "load_aware_scheduling": True,
+        "load_max_cpu_percent": 85,
+        "load_max_disk_percent": 90,
+        "load_max_memory_percent": 90,
+        "load_check_seconds": 60,
+        "load_max_defer_minutes": 120,
+        "load_throttle_mbps": 20,
     }
     
     def __init__(self, config_file: str = None):
@@ -0,0 +1,49 @@
+"""
+Rate limiting for I/O heavy background operations.
+"""
+import time
+import threading
+
+
+class RateLimiter:
+    """Token bucket limiting throughput in bytes per second across threads."""
+    
+    def __init__(self, bytes_per_second: float = 0, burst_seconds: float = 1.0):
+        """
+        Args:
+            bytes_per_second: Allowed throughput, 0 disables limiting
+            burst_seconds: How many seconds of throughput may be used at once
+        """
+        self._lock = threading.Lock()
+        self.set_rate(bytes_per_second, burst_seconds)
+    
+    def set_rate(self, bytes_per_second: float, burst_seconds: float = 1.0):
+        """Change the allowed throughput."""
+        with self._lock:
+            self.bytes_per_second = max(0.0, float(bytes_per_second or 0))
+            self._capacity = self.bytes_per_second * burst_seconds
+            self._tokens = self._capacity
+            self._last = time.monotonic()
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether limiting is active."""
+        return self.bytes_per_second > 0
+    
+    def consume(self, amount: int):
+        """Account for transferred bytes, sleeping if over the limit."""
+        if not self.enabled:
+            return
+        
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._capacity,
+                self._tokens + (now - self._last) * self.bytes_per_second
+            )
+            self._last = now
+            self._tokens -= amount
+            delay = -self._tokens / self.bytes_per_second if self._tokens < 0 else 0
+        
+        if delay > 0:
+            time.sleep(delay)